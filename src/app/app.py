@@ -2,14 +2,30 @@ import flet as ft
 import fitz 
 from dotenv import load_dotenv  # Add this import
 import os
-import base64
+import asyncio
+import threading
+import time
 from db.controller.data_service import DataService
 from ui.components import create_candidate_card
+from utils.profiling import profile_hook
+from utils.prefetch import Prefetcher
+from utils.pdf_render import render_pdf_page, render_first_page
 # from db.models import init_database, test_connection
 
 # Load environment variables from .env file
 load_dotenv()
 
+# result cards are created one page at a time; further pages load on "Load more" or when
+# the results are scrolled near the bottom
+RESULTS_PAGE_SIZE = 12
+SCROLL_LOAD_MARGIN = 200
+
+# profiles and first CV pages of the top results are prepared in the background after a search
+PREFETCH_CANDIDATES = 6
+
+ALL_ROLES = "All roles"
+
+
 # APPLICATION CLASS
 class CVApp:
     def __init__(self, page: ft.Page, data_service: DataService):
@@ -18,6 +34,7 @@ class CVApp:
         self.data_service = data_service
         self.keywords_field = None
         self.algorithm_toggle = None
+        self.role_filter = None
         self.tips_modal_layer = None
         
         # Modal controls
@@ -35,6 +52,16 @@ class CVApp:
             child_aspect_ratio=1.1, 
             spacing=20,
             run_spacing=20,
+            on_scroll=self.on_results_scroll,
+        )
+        self.results_shown = 0
+        self.results_total = 0
+        self.results_lock = threading.Lock()
+        self.load_more_button = ft.TextButton(
+            "Load more",
+            visible=False,
+            style=ft.ButtonStyle(color="white"),
+            on_click=self.load_more_results,
         )
         self.top_matches_input = ft.TextField(
             value="1",
@@ -51,6 +78,11 @@ class CVApp:
         self.exact_time_text = ft.Text(f"{self.exact_time} ms", color="white", weight=ft.FontWeight.BOLD)
         self.fuzzy_time_text = ft.Text(f"{self.fuzzy_time} ms", color="white", weight=ft.FontWeight.BOLD)
 
+        # per-stage breakdown, shown in place of the exact/fuzzy tiles when toggled
+        self.timing_tiles_row = None
+        self.stage_breakdown_container = None
+        self.stage_breakdown_column = ft.Column(spacing=2, scroll=ft.ScrollMode.ADAPTIVE)
+
         # view CV modal
         self.pdf_modal_layer = None
         self.pdf_images_column = ft.Column(spacing=10, scroll=ft.ScrollMode.ADAPTIVE)
@@ -58,6 +90,8 @@ class CVApp:
         self.pdf_loading_indicator = ft.ProgressRing(width=50, height=50, stroke_width=4)
         self.pdf_error_text = ft.Text("", color="red", size=16)
 
+        self.prefetcher = Prefetcher()
+
     # Modal layer
     def open_summary_modal(self, e, candidate_data):
         # print(f"Opening summary for: {candidate_data['name']}") # debug
@@ -68,9 +102,23 @@ class CVApp:
         self.modal_candidate_address.value = f"Address: {candidate_data['address']}"
         self.modal_candidate_phone.value = f"Phone: {candidate_data['phone']}"
         
+        # CV sections are extracted concurrently on the page's event loop
+        self.page.run_task(self.load_summary_details, candidate_data)
+
+    async def load_summary_details(self, candidate_data):
+        details = None
+        prefetched = self.prefetcher.get(('details', candidate_data["application_id"]))
+        if prefetched is not None:
+            try:
+                details = await asyncio.wrap_future(prefetched)
+            except Exception as e:
+                print(f"Prefetched profile unusable, extracting again: {e}")
+        if details is None:
+            details = await self.data_service.get_candidate_details_async(candidate_data["application_id"])
+
         # Skills
         self.modal_skills_list.controls.clear()
-        skills = self.data_service.get_skills_by_application_id(candidate_data["application_id"])
+        skills = details['skills']
         for skill in skills:
             self.modal_skills_list.controls.append(
                 ft.Container(
@@ -83,7 +131,7 @@ class CVApp:
 
         # Summary
         self.modal_summary_text.controls.clear()
-        summaries = self.data_service.get_summary_by_application_id(candidate_data["application_id"])
+        summaries = details['summaries']
         for summary in summaries:
             self.modal_summary_text.controls.append(
                 ft.Column(
@@ -95,7 +143,7 @@ class CVApp:
 
         # Job History
         self.modal_job_history_list.controls.clear()
-        jobs = self.data_service.get_job_history_by_application_id(candidate_data["application_id"])
+        jobs = details['jobs']
         for job in jobs:
              self.modal_job_history_list.controls.append(
                 ft.Column([
@@ -106,7 +154,7 @@ class CVApp:
 
         # Education
         self.modal_education_list.controls.clear()
-        educations = self.data_service.get_education_by_application_id(candidate_data["application_id"])
+        educations = details['educations']
         for edu in educations:
             self.modal_education_list.controls.append(
                 ft.Column([
@@ -154,27 +202,30 @@ class CVApp:
         except Exception as e:
             self.show_pdf_error(f"Error opening CV: {str(e)}")
 
+    @profile_hook('convert_and_display_pdf')
     def convert_and_display_pdf(self, pdf_path):
         """Convert PDF to images and display them"""
         try:
             # Clear loading indicator
             self.pdf_images_column.controls.clear()
             
+            # first page rendered in the background after the search, if it got that far
+            first_page = self.prefetcher.get(('cv_page', pdf_path))
+            if first_page is not None and not (first_page.done() or first_page.running()):
+                first_page = None
+
             # Open PDF with PyMuPDF
             pdf_document = fitz.open(pdf_path)
             
             for page_num in range(len(pdf_document)):
-                page = pdf_document.load_page(page_num)
-                
-                # Convert page to image with high quality
-                mat = fitz.Matrix(2.0, 2.0)  # 2x zoom for better quality
-                pix = page.get_pixmap(matrix=mat)
-                
-                # Convert pixmap to bytes
-                img_data = pix.tobytes("png")
-                
-                # Convert to base64 for display in Flet
-                img_base64 = base64.b64encode(img_data).decode()
+                img_base64 = None
+                if page_num == 0 and first_page is not None:
+                    try:
+                        img_base64 = first_page.result()
+                    except Exception as e:
+                        print(f"Prefetched CV page unusable, rendering again: {e}")
+                if img_base64 is None:
+                    img_base64 = render_pdf_page(pdf_document, page_num)
                 
                 # Create image container
                 image_container = ft.Container(
@@ -302,37 +353,133 @@ class CVApp:
             top_n = 5
 
         selected_algorithm = self.algorithm_toggle.value
+        selected_role = self.role_filter.value
+        filters = {'role': selected_role} if selected_role and selected_role != ALL_ROLES else None
+
+        # prefetches for the previous results would only compete with this search
+        self.prefetcher.cancel_all()
         
         top_candidates, self.exact_time, self.fuzzy_time = self.data_service.search_candidates(
             keywords=keywords,
             top_n=top_n,
-            algorithm=selected_algorithm
+            algorithm=selected_algorithm,
+            limit=RESULTS_PAGE_SIZE,
+            filters=filters
         )
         self.exact_time = int(1000 * self.exact_time)  # Convert to milliseconds
         self.fuzzy_time = int(1000 * self.fuzzy_time)
         self.exact_time_text.value = f"{self.exact_time} ms"
         self.fuzzy_time_text.value = f"{self.fuzzy_time} ms"
-
-        self.results_grid.controls.clear()
-        if not top_candidates:
-            self.results_grid.controls.append(
-                ft.Text(
-                    "No candidates found.", 
-                    color="white", 
-                    size=16, 
-                    text_align=ft.TextAlign.CENTER
-                )
-            )
-        else:
-            for candidate in top_candidates:
-                card = create_candidate_card(
-                    candidate_data=candidate,
-                    on_summary_click_callback=self.open_summary_modal,
-                    on_view_cv_click_callback=self.open_view_cv_modal
+        plan = self.data_service.last_profile.plan
+        if plan is not None:
+            # engine chosen by the 'auto' algorithm
+            self.exact_time_text.value += f" ({plan['method']})"
+
+        render_start = time.perf_counter()
+        with self.results_lock:
+            # results_shown counts ranked entries consumed, including any skipped by hydration
+            self.results_total = self.data_service.get_ranked_count()
+            self.results_shown = min(RESULTS_PAGE_SIZE, self.results_total)
+            self.results_grid.controls.clear()
+            if not top_candidates:
+                self.results_grid.controls.append(
+                    ft.Text(
+                        "No candidates found.", 
+                        color="white", 
+                        size=16, 
+                        text_align=ft.TextAlign.CENTER
+                    )
                 )
-                self.results_grid.controls.append(card)   
+            else:
+                self.append_result_cards(top_candidates)
+            self.update_load_more()
         
         self.page.update()
+        self.data_service.record_render(time.perf_counter() - render_start, len(top_candidates))
+        self.prefetch_candidates(top_candidates[:PREFETCH_CANDIDATES])
+
+        self.update_stage_breakdown()
+        self.page.update()
+
+    def prefetch_candidates(self, candidates):
+        """Extract profiles and render first CV pages in the background so the modals open at once"""
+        for candidate in candidates:
+            self.prefetcher.submit(
+                ('details', candidate['application_id']),
+                self.data_service.get_candidate_details,
+                candidate['application_id']
+            )
+        for candidate in candidates:
+            pdf_path = candidate.get('cv_path')
+            if pdf_path and os.path.exists(pdf_path):
+                self.prefetcher.submit(('cv_page', pdf_path), render_first_page, pdf_path)
+
+    def append_result_cards(self, candidates):
+        for candidate in candidates:
+            card = create_candidate_card(
+                candidate_data=candidate,
+                on_summary_click_callback=self.open_summary_modal,
+                on_view_cv_click_callback=self.open_view_cv_modal
+            )
+            self.results_grid.controls.append(card)
+
+    def update_load_more(self):
+        remaining = self.results_total - self.results_shown
+        self.load_more_button.visible = remaining > 0
+        self.load_more_button.text = f"Load more ({remaining} remaining)"
+
+    def load_more_results(self, e=None):
+        # scroll events arrive on several threads; each page must be taken once
+        with self.results_lock:
+            offset = self.results_shown
+            if offset >= self.results_total:
+                return
+            self.results_shown = min(offset + RESULTS_PAGE_SIZE, self.results_total)
+            candidates = self.data_service.get_candidates_page(offset, RESULTS_PAGE_SIZE)
+            self.append_result_cards(candidates)
+        self.update_load_more()
+        self.page.update()
+
+    def on_results_scroll(self, e: ft.OnScrollEvent):
+        if e.max_scroll_extent and e.pixels >= e.max_scroll_extent - SCROLL_LOAD_MARGIN:
+            self.load_more_results()
+
+    def update_stage_breakdown(self):
+        profile = self.data_service.last_profile
+        self.stage_breakdown_column.controls.clear()
+        if profile.plan is not None:
+            self.stage_breakdown_column.controls.append(
+                ft.Row([
+                    ft.Text(f"Plan: {profile.plan['method']}", color="white", size=12),
+                    ft.Text(
+                        f"est. {profile.plan['estimated_seconds'] * 1000:.1f} ms",
+                        color="white", size=12, weight=ft.FontWeight.BOLD
+                    ),
+                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+            )
+        for stats in profile.breakdown():
+            details = []
+            if stats.bytes_scanned:
+                details.append(f"{stats.bytes_scanned} B")
+            if stats.documents:
+                details.append(f"{stats.documents} docs")
+            if stats.candidates_compared:
+                details.append(f"{stats.candidates_compared} words")
+            self.stage_breakdown_column.controls.append(
+                ft.Row([
+                    ft.Text(stats.name.replace('_', ' ').title(), color="white", size=12),
+                    ft.Text(
+                        f"{stats.seconds * 1000:.1f} ms" + (f" ({', '.join(details)})" if details else ""),
+                        color="white", size=12, weight=ft.FontWeight.BOLD
+                    ),
+                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+            )
+
+    def toggle_stage_breakdown(self, e):
+        show_breakdown = not self.stage_breakdown_container.visible
+        self.stage_breakdown_container.visible = show_breakdown
+        self.timing_tiles_row.visible = not show_breakdown
+        self.page.update()
 
     # Top matches input value
     def change_top_matches(self, value):
@@ -507,7 +654,8 @@ class CVApp:
                             content=ft.Column([
                                 ft.Text("How to Use", color="white", weight=ft.FontWeight.BOLD, size=16),
                                 create_bullet_point("Masukkan Kata Kunci (Keywords): Tulis skill, posisi, atau kriteria lain. Pisahkan dengan koma."),
-                                create_bullet_point("Pilih Algoritma yang diinginkan: Pilih antara KMP, BM, atau AC."),
+                                create_bullet_point("Pilih Algoritma yang diinginkan: Pilih antara KMP, BM, AC, atau Auto."),
+                                create_bullet_point("Auto: Sistem memilih cara pencarian tercepat dari estimasi biaya, lihat rencananya di Stage Breakdown."),
                                 create_bullet_point("Tentukan Top Matches: Atur jumlah CV teratas yang ingin ditampilkan."),
                                 create_bullet_point("Fuzzy Matching: Jika pencarian exact tidak ada, sistem otomatis mencari kata yang mirip."),
                             ], scroll=ft.ScrollMode.ADAPTIVE, spacing=8),
@@ -549,6 +697,16 @@ class CVApp:
             hint_style=ft.TextStyle(color="#888888") 
         )
         
+        self.role_filter = ft.Dropdown(
+            value=ALL_ROLES,
+            options=[ft.dropdown.Option(ALL_ROLES)] + [ft.dropdown.Option(role) for role in self.data_service.get_roles()],
+            border_color="#4E4E6A",
+            border_radius=10,
+            bgcolor="#E5E7EB",
+            text_style=ft.TextStyle(color="black"),
+            expand=True,
+        )
+
         self.algorithm_toggle = ft.RadioGroup(
             value="BM",  # Default algorithm
             content=ft.Row(
@@ -556,6 +714,7 @@ class CVApp:
                     ft.Radio(value="KMP", label="KMP", label_style=ft.TextStyle(color="white"), active_color="#ED6C35"),
                     ft.Radio(value="BM", label="BM", label_style=ft.TextStyle(color="white"), active_color="#ED6C35"),
                     ft.Radio(value="AC", label="AC", label_style=ft.TextStyle(color="white"), active_color="#ED6C35"),
+                    ft.Radio(value="auto", label="Auto", label_style=ft.TextStyle(color="white"), active_color="#ED6C35"),
                 ],
                 alignment=ft.MainAxisAlignment.SPACE_EVENLY
             )
@@ -572,6 +731,7 @@ class CVApp:
             content=ft.Column([
                 ft.Text("10Internship0Job App", size=24, weight=ft.FontWeight.BOLD, color="white"),
                 self.keywords_field,
+                ft.Row([self.role_filter]),
                 ft.Row(
                     controls=[
                         ft.Container(
@@ -602,6 +762,51 @@ class CVApp:
             ], spacing=20)
         )
 
+        self.timing_tiles_row = ft.Row([
+            ft.Container(
+                content=ft.Row(
+                    [
+                        ft.Icon(name=ft.Icons.SEARCH, color="#90EE90", size=24),
+                        ft.Column([
+                            ft.Text("Exact Match", color="white", size=12), 
+                            self.exact_time_text
+                        ], spacing=0, horizontal_alignment=ft.CrossAxisAlignment.START)
+                    ],
+                    vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                    alignment=ft.MainAxisAlignment.START,
+                    spacing=15
+                ),
+                expand=True, bgcolor="#9497AE", border_radius=10, padding=15,
+                on_click=self.toggle_stage_breakdown, ink=True
+            ),
+            ft.Container(
+                content=ft.Row(
+                    [
+                        ft.Icon(name=ft.Icons.WIFI_FIND, color="#FFD700", size=24),
+                        ft.Column([
+                            ft.Text("Fuzzy Match", color="white", size=12), 
+                            self.fuzzy_time_text
+                        ], spacing=0, horizontal_alignment=ft.CrossAxisAlignment.START)
+                    ],
+                    vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                    alignment=ft.MainAxisAlignment.START,
+                    spacing=15
+                ),
+                expand=True, bgcolor="#9497AE", border_radius=10, padding=15,
+                on_click=self.toggle_stage_breakdown, ink=True
+            ),
+        ], spacing=20)
+
+        self.stage_breakdown_container = ft.Container(
+            content=ft.Column([
+                ft.Text("Stage Breakdown", color="white", size=12),
+                self.stage_breakdown_column
+            ], spacing=5),
+            visible=False,
+            bgcolor="#9497AE", border_radius=10, padding=15,
+            on_click=self.toggle_stage_breakdown, ink=True
+        )
+
         # Statistics Panel 
         info_panel = ft.Container(
             expand=True,
@@ -624,38 +829,8 @@ class CVApp:
                     ),
                     bgcolor="#9497AE", border_radius=10, padding=20
                 ),
-                ft.Row([
-                    ft.Container(
-                        content=ft.Row(
-                            [
-                                ft.Icon(name=ft.Icons.SEARCH, color="#90EE90", size=24),
-                                ft.Column([
-                                    ft.Text("Exact Match", color="white", size=12), 
-                                    self.exact_time_text
-                                ], spacing=0, horizontal_alignment=ft.CrossAxisAlignment.START)
-                            ],
-                            vertical_alignment=ft.CrossAxisAlignment.CENTER,
-                            alignment=ft.MainAxisAlignment.START,
-                            spacing=15
-                        ),
-                        expand=True, bgcolor="#9497AE", border_radius=10, padding=15
-                    ),
-                    ft.Container(
-                        content=ft.Row(
-                            [
-                                ft.Icon(name=ft.Icons.WIFI_FIND, color="#FFD700", size=24),
-                                ft.Column([
-                                    ft.Text("Fuzzy Match", color="white", size=12), 
-                                    self.fuzzy_time_text
-                                ], spacing=0, horizontal_alignment=ft.CrossAxisAlignment.START)
-                            ],
-                            vertical_alignment=ft.CrossAxisAlignment.CENTER,
-                            alignment=ft.MainAxisAlignment.START,
-                            spacing=15
-                        ),
-                        expand=True, bgcolor="#9497AE", border_radius=10, padding=15
-                    ),
-                ], spacing=20),
+                self.timing_tiles_row,
+                self.stage_breakdown_container,
                 ft.Container(
                     content=ft.Column([
                         ft.Icon(name=ft.Icons.LIGHTBULB_OUTLINE, color="white"),
@@ -679,8 +854,9 @@ class CVApp:
             col=7,
             content=ft.Column([
                 ft.Text("Result", size=24, weight=ft.FontWeight.BOLD, color="white"),
-                self.results_grid
-            ], scroll=ft.ScrollMode.ADAPTIVE, expand=True),
+                self.results_grid,
+                ft.Row([self.load_more_button], alignment=ft.MainAxisAlignment.CENTER)
+            ], scroll=ft.ScrollMode.ADAPTIVE, expand=True, on_scroll=self.on_results_scroll),
             bgcolor="#1e1e2f", border_radius=10, padding=25
         )
 
@@ -705,6 +881,9 @@ class CVApp:
                 expand=True 
             )
         )
-        total_cvs = self.data_service.get_total_cvs()
+        self.page.run_task(self.load_total_cvs)
+
+    async def load_total_cvs(self):
+        total_cvs = await self.data_service.get_total_cvs_async()
         self.total_cv_text.value = f"{total_cvs} CV"
         self.page.update()
\ No newline at end of file
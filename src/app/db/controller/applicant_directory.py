@@ -0,0 +1,44 @@
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class ApplicantRecord:
+    """ Compact, read-only view of one ApplicantProfile row """
+    __slots__ = ('applicant_id', 'first_name', 'last_name', 'date_of_birth', 'address', 'phone_number')
+
+    def __init__(self, applicant_id: int, first_name: str, last_name: str,
+                 date_of_birth: Optional[date], address: str, phone_number: str):
+        self.applicant_id = applicant_id
+        self.first_name = first_name or ""
+        self.last_name = last_name or ""
+        self.date_of_birth = date_of_birth
+        self.address = address
+        self.phone_number = phone_number
+
+    def __repr__(self):
+        return f"<ApplicantRecord(id={self.applicant_id}, name='{self.first_name} {self.last_name}')>"
+
+
+class ApplicantDirectory:
+    """ In-memory applicant lookup so search results render without DB round-trips """
+
+    def __init__(self):
+        self.records: Dict[int, ApplicantRecord] = {}
+
+    def load(self, rows: Iterable[Tuple]):
+        """ Replace the directory content with (id, first, last, dob, address, phone) rows """
+        records = {}
+        for row in rows:
+            record = ApplicantRecord(*row)
+            records[record.applicant_id] = record
+        # swap in one assignment so readers never see a half-built directory
+        self.records = records
+
+    def get(self, applicant_id: int) -> Optional[ApplicantRecord]:
+        return self.records.get(applicant_id)
+
+    def __contains__(self, applicant_id: int) -> bool:
+        return applicant_id in self.records
+
+    def __len__(self) -> int:
+        return len(self.records)
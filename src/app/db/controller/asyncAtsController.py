@@ -0,0 +1,385 @@
+import asyncio
+from typing import Dict, List
+from datetime import datetime
+from ..repositories.asyncAtsRepository import AsyncApplicantRepository, AsyncApplicationRepository, AsyncCVProfileRepository
+from ..models import DatabaseConfig, init_database_async
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AsyncATSController:
+    """ asyncio variant of ATSController; methods return the same {'success', 'message', 'data'} dicts """
+
+    def __init__(self):
+        # raises ImportError when the async drivers are not installed
+        config = DatabaseConfig()
+        self.engine = config.get_async_engine()
+        self.SessionLocal = config.get_async_session_maker(self.engine)
+        self.applicant_repo = AsyncApplicantRepository(self.SessionLocal)
+        self.application_repo = AsyncApplicationRepository(self.SessionLocal)
+        self.cv_profile_repo = AsyncCVProfileRepository(self.SessionLocal)
+        self.initialized = False
+
+    async def initialize(self):
+        if self.initialized:
+            return
+        try:
+            await init_database_async(self.engine)
+            self.initialized = True
+            logger.info("Async database initialized successfully")
+        except Exception as e:
+            logger.error(f"Error initializing async database: {str(e)}")
+            raise
+
+    async def close(self):
+        await self.engine.dispose()
+
+    async def get_applicant(self, applicant_id: int) -> Dict:
+        try:
+            applicant = await self.applicant_repo.get_applicant_by_id(applicant_id)
+
+            if applicant:
+                return {
+                    'success': True,
+                    'message': 'Applicant found',
+                    'data': applicant
+                }
+            else:
+                return {
+                    'success': False,
+                    'message': f'Applicant with ID {applicant_id} not found',
+                    'data': None
+                }
+        except Exception as e:
+            logger.error(f"Error in get_applicant: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting applicant: {str(e)}',
+                'data': None
+            }
+
+    async def get_applicants_by_ids(self, applicant_ids: List[int]) -> Dict:
+        try:
+            applicants = await self.applicant_repo.get_applicants_by_ids(applicant_ids)
+
+            return {
+                'success': True,
+                'message': f'Found {len(applicants)} applicants',
+                'data': {applicant['applicant_id']: applicant for applicant in applicants}
+            }
+        except Exception as e:
+            logger.error(f"Error in get_applicants_by_ids: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting applicants: {str(e)}',
+                'data': None
+            }
+
+    async def get_all_applicants(self, page: int = 1, page_size: int = 50) -> Dict:
+        try:
+            offset = (page - 1) * page_size
+            applicants, total_count = await asyncio.gather(
+                self.applicant_repo.get_all_applicants(limit=page_size, offset=offset),
+                self.applicant_repo.get_applicants_count()
+            )
+
+            return {
+                'success': True,
+                'message': f'Found {len(applicants)} applicants',
+                'data': {
+                    'applicants': [applicant.to_dict() for applicant in applicants],
+                    'pagination': {
+                        'page': page,
+                        'page_size': page_size,
+                        'total_count': total_count,
+                        'total_pages': (total_count + page_size - 1) // page_size
+                    }
+                }
+            }
+        except Exception as e:
+            logger.error(f"Error in get_all_applicants: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting applicants: {str(e)}',
+                'data': None
+            }
+
+    async def get_applicant_directory(self) -> Dict:
+        try:
+            rows = await self.applicant_repo.get_applicant_directory_rows()
+
+            return {
+                'success': True,
+                'message': f'Loaded {len(rows)} applicant directory rows',
+                'data': {'applicants': rows}
+            }
+        except Exception as e:
+            logger.error(f"Error in get_applicant_directory: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting applicant directory: {str(e)}',
+                'data': None
+            }
+
+    async def search_applicants(self, name_pattern: str) -> Dict:
+        try:
+            applicants = await self.applicant_repo.search_applicants_by_name(name_pattern)
+
+            return {
+                'success': True,
+                'message': f'Found {len(applicants)} applicants matching "{name_pattern}"',
+                'data': [applicant.to_dict() for applicant in applicants]
+            }
+        except Exception as e:
+            logger.error(f"Error in search_applicants: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error searching applicants: {str(e)}',
+                'data': None
+            }
+
+    async def get_application(self, application_id: int) -> Dict:
+        try:
+            application = await self.application_repo.get_application_by_id(application_id)
+
+            if application:
+                return {
+                    'success': True,
+                    'message': 'Application found',
+                    'data': application.to_dict()
+                }
+            else:
+                return {
+                    'success': False,
+                    'message': f'Application with ID {application_id} not found',
+                    'data': None
+                }
+        except Exception as e:
+            logger.error(f"Error in get_application: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting application: {str(e)}',
+                'data': None
+            }
+
+    async def get_applications_by_applicant(self, applicant_id: int) -> Dict:
+        try:
+            applications = await self.application_repo.get_applications_by_applicant(applicant_id)
+
+            return {
+                'success': True,
+                'message': f'Found {len(applications)} applications for applicant {applicant_id}',
+                'data': [application.to_dict() for application in applications]
+            }
+        except Exception as e:
+            logger.error(f"Error in get_applications_by_applicant: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting applications: {str(e)}',
+                'data': None
+            }
+
+    async def get_all_applications(self, page: int = 1, page_size: int = 50) -> Dict:
+        try:
+            applications, total_count = await asyncio.gather(
+                self.application_repo.get_all_applications(),
+                self.application_repo.get_applications_count()
+            )
+
+            return {
+                'success': True,
+                'message': f'Found {len(applications)} applications',
+                'data': {
+                    'applications': applications,
+                    'pagination': {
+                        'page': page,
+                        'page_size': page_size,
+                        'total_count': total_count,
+                        'total_pages': (total_count + page_size - 1) // page_size
+                    }
+                }
+            }
+        except Exception as e:
+            logger.error(f"Error in get_all_applications: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting applications: {str(e)}',
+                'data': None
+            }
+
+    async def get_application_count(self) -> Dict:
+        try:
+            count = await self.application_repo.get_applications_count()
+            return {
+                'success': True,
+                'message': f'Total applications count retrieved',
+                'data': {'count': count}
+            }
+        except Exception as e:
+            logger.error(f"Error in get_application_count: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting application count: {str(e)}',
+                'data': None
+            }
+
+    async def get_applicant_count(self) -> Dict:
+        try:
+            count = await self.applicant_repo.get_applicants_count()
+            return {
+                'success': True,
+                'message': f'Total applicants count retrieved',
+                'data': {'count': count}
+            }
+        except Exception as e:
+            logger.error(f"Error in get_applicant_count: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting applicant count: {str(e)}',
+                'data': None
+            }
+
+    async def get_applicant_with_applications(self, applicant_id: int) -> Dict:
+        try:
+            applicant, applications = await asyncio.gather(
+                self.applicant_repo.get_applicant_by_id(applicant_id),
+                self.application_repo.get_applications_by_applicant(applicant_id)
+            )
+            if not applicant:
+                return {
+                    'success': False,
+                    'message': f'Applicant with ID {applicant_id} not found',
+                    'data': None
+                }
+
+            applicant_data = dict(applicant)
+            applicant_data['applications'] = [app.to_dict() for app in applications]
+
+            return {
+                'success': True,
+                'message': f'Found applicant with {len(applications)} applications',
+                'data': applicant_data
+            }
+        except Exception as e:
+            logger.error(f"Error in get_applicant_with_applications: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting applicant with applications: {str(e)}',
+                'data': None
+            }
+
+    async def get_application_with_applicant(self, application_id: int) -> Dict:
+        try:
+            application = await self.application_repo.get_application_by_id(application_id)
+            if not application:
+                return {
+                    'success': False,
+                    'message': f'Application with ID {application_id} not found',
+                    'data': None
+                }
+
+            applicant = await self.applicant_repo.get_applicant_by_id(application.applicant_id)
+
+            application_data = application.to_dict()
+            application_data['applicant'] = applicant
+
+            return {
+                'success': True,
+                'message': 'Application with applicant details found',
+                'data': application_data
+            }
+        except Exception as e:
+            logger.error(f"Error in get_application_with_applicant: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting application with applicant: {str(e)}',
+                'data': None
+            }
+
+    async def get_dashboard_stats(self) -> Dict:
+        try:
+            total_applicants, total_applications = await asyncio.gather(
+                self.applicant_repo.get_applicants_count(),
+                self.application_repo.get_applications_count()
+            )
+
+            return {
+                'success': True,
+                'message': 'Dashboard statistics retrieved successfully',
+                'data': {
+                    'total_applicants': total_applicants,
+                    'total_applications': total_applications,
+                    'note': 'Status breakdown requires additional repository methods'
+                }
+            }
+        except Exception as e:
+            logger.error(f"Error in get_dashboard_stats: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting dashboard statistics: {str(e)}',
+                'data': None
+            }
+
+    async def test_connection(self) -> Dict:
+        try:
+            count = await self.applicant_repo.get_applicants_count()
+            return {
+                'success': True,
+                'message': f'Database connection successful. Found {count} applicants.',
+                'data': {'applicant_count': count}
+            }
+        except Exception as e:
+            logger.error(f"Error in test_connection: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Database connection failed: {str(e)}',
+                'data': None
+            }
+
+    async def health_check(self) -> Dict:
+        try:
+            db_test, applicant_count, application_count = await asyncio.gather(
+                self.test_connection(),
+                self.applicant_repo.get_applicants_count(),
+                self.application_repo.get_applications_count()
+            )
+
+            return {
+                'success': True,
+                'message': 'ATS system health check completed',
+                'data': {
+                    'database_connection': db_test['success'],
+                    'total_applicants': applicant_count,
+                    'total_applications': application_count,
+                    'timestamp': datetime.now().isoformat()
+                }
+            }
+        except Exception as e:
+            logger.error(f"Error in health_check: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Health check failed: {str(e)}',
+                'data': None
+            }
+
+    async def get_cv_profile(self, application_id: int) -> Dict:
+        try:
+            profile = await self.cv_profile_repo.get_profile(application_id)
+            if not profile:
+                return {
+                    'success': False,
+                    'message': f'No stored CV profile for application {application_id}',
+                    'data': None
+                }
+            return {
+                'success': True,
+                'message': 'CV profile retrieved successfully',
+                'data': profile
+            }
+        except Exception as e:
+            logger.error(f"Error in get_cv_profile: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting CV profile: {str(e)}',
+                'data': None
+            }
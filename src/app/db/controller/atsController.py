@@ -1,6 +1,6 @@
 from typing import Dict, List
 from datetime import date, datetime
-from ..repositories.atsRepository import ApplicantRepository, ApplicationRepository
+from ..repositories.atsRepository import ApplicantRepository, ApplicationRepository, CVProfileRepository
 from ..models import init_database
 import logging
 
@@ -11,6 +11,7 @@ class ATSController:
     def __init__(self):
         self.applicant_repo = ApplicantRepository()
         self.application_repo = ApplicationRepository()
+        self.cv_profile_repo = CVProfileRepository()
         
         try:
             init_database()
@@ -139,6 +140,23 @@ class ATSController:
                 'data': None
             }
     
+    def get_applicant_directory(self) -> Dict:
+        try:
+            rows = self.applicant_repo.get_applicant_directory_rows()
+            
+            return {
+                'success': True,
+                'message': f'Loaded {len(rows)} applicant directory rows',
+                'data': {'applicants': rows}
+            }
+        except Exception as e:
+            logger.error(f"Error in get_applicant_directory: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting applicant directory: {str(e)}',
+                'data': None
+            }
+    
     def search_applicants(self, name_pattern: str) -> Dict:
         try:
             applicants = self.applicant_repo.search_applicants_by_name(name_pattern)
@@ -146,7 +164,7 @@ class ATSController:
             return {
                 'success': True,
                 'message': f'Found {len(applicants)} applicants matching "{name_pattern}"',
-                'data': [applicant.to_dict() for applicant in applicants]
+                'data': applicants
             }
         except Exception as e:
             logger.error(f"Error in search_applicants: {str(e)}")
@@ -380,6 +398,11 @@ class ATSController:
                 year = datetime.now().year
             if not month:
                 month = datetime.now().month
+
+            start = datetime(year, month, 1)
+            end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+            applications_by_role = self.application_repo.count_applications_by_role_between(start, end)
+            new_applicants = self.applicant_repo.count_applicants_created_between(start, end)
             
             return {
                 'success': True,
@@ -387,7 +410,9 @@ class ATSController:
                 'data': {
                     'year': year,
                     'month': month,
-                    'note': 'Implementation pending - requires additional repository methods'
+                    'total_applications': sum(applications_by_role.values()),
+                    'new_applicants': new_applicants,
+                    'applications_by_role': applications_by_role
                 }
             }
         except Exception as e:
@@ -440,3 +465,57 @@ class ATSController:
                 'message': f'Health check failed: {str(e)}',
                 'data': None
             }
+
+    def get_cv_profile(self, application_id: int) -> Dict:
+        try:
+            profile = self.cv_profile_repo.get_profile(application_id)
+            if not profile:
+                return {
+                    'success': False,
+                    'message': f'No stored CV profile for application {application_id}',
+                    'data': None
+                }
+            return {
+                'success': True,
+                'message': 'CV profile retrieved successfully',
+                'data': profile
+            }
+        except Exception as e:
+            logger.error(f"Error in get_cv_profile: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting CV profile: {str(e)}',
+                'data': None
+            }
+
+    def save_cv_profile(self, application_id: int, extractor_version: int, cv_signature: str, profile: Dict) -> Dict:
+        try:
+            saved = self.cv_profile_repo.save_profile(application_id, extractor_version, cv_signature, profile)
+            return {
+                'success': saved,
+                'message': 'CV profile saved successfully' if saved else 'Failed to save CV profile',
+                'data': None
+            }
+        except Exception as e:
+            logger.error(f"Error in save_cv_profile: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error saving CV profile: {str(e)}',
+                'data': None
+            }
+
+    def get_cv_extraction_states(self) -> Dict:
+        try:
+            states = self.cv_profile_repo.get_extraction_states()
+            return {
+                'success': True,
+                'message': f'Found {len(states)} stored CV profiles',
+                'data': {'states': states}
+            }
+        except Exception as e:
+            logger.error(f"Error in get_cv_extraction_states: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Error getting CV extraction states: {str(e)}',
+                'data': None
+            }
@@ -0,0 +1,68 @@
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Sequence
+
+
+def _bitmap(docs: List[int], size: int) -> int:
+    bits = bytearray((size + 7) // 8)
+    for doc in docs:
+        bits[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class AttributeBitmaps:
+    """ Per attribute value, the documents having that value as a bitset (bit i = document i)
+
+    Filters combine with plain integer operations: values of one attribute are OR-ed, different
+    attributes are AND-ed, and only the documents left in the result are searched.
+    """
+
+    def __init__(self, size: int = 0):
+        self.size = size
+        self.bitmaps: Dict[str, Dict[Hashable, int]] = {}
+
+    @classmethod
+    def build(cls, columns: Dict[str, Sequence[Hashable]]) -> "AttributeBitmaps":
+        """ columns: attribute name -> value of every document, in document order; None is not indexed """
+        size = max((len(values) for values in columns.values()), default=0)
+        bitmaps = cls(size)
+        for attribute, values in columns.items():
+            docs_by_value = defaultdict(list)
+            for doc, value in enumerate(values):
+                if value is not None:
+                    docs_by_value[value].append(doc)
+            bitmaps.bitmaps[attribute] = {value: _bitmap(docs, size) for value, docs in docs_by_value.items()}
+        return bitmaps
+
+    def values(self, attribute: str) -> List[Hashable]:
+        return sorted(self.bitmaps.get(attribute, {}), key=str)
+
+    def select(self, filters: Dict[str, object]) -> Optional[int]:
+        """ Bitset of the documents passing filters (attribute -> value or list of values), None without filters """
+        selected = None
+        for attribute, wanted in filters.items():
+            if wanted is None or wanted == []:
+                continue
+            if attribute not in self.bitmaps:
+                raise ValueError(f"Unknown filter attribute: {attribute}")
+            values = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            bitmap = 0
+            for value in values:
+                bitmap |= self.bitmaps[attribute].get(value, 0)
+            selected = bitmap if selected is None else selected & bitmap
+        return selected
+
+    def docs(self, bitmap: int) -> List[int]:
+        """ Sorted document ids of a bitset """
+        docs = []
+        for byte_index, byte in enumerate(bitmap.to_bytes((self.size + 7) // 8, 'little')):
+            if byte:
+                base = byte_index << 3
+                docs.extend(base + bit for bit in range(8) if byte >> bit & 1)
+        return docs
+
+    def pool(self, filters: Optional[Dict[str, object]]) -> Optional[List[int]]:
+        """ Documents to search for filters, None when every document is searched """
+        if not filters:
+            return None
+        selected = self.select(filters)
+        return None if selected is None else self.docs(selected)
@@ -0,0 +1,186 @@
+import bisect
+from array import array
+from collections import Counter
+from itertools import accumulate
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+class CorpusIndex:
+    """ Corpus tokenized once at load time into integer word IDs
+
+    Tokens are exactly what text.split() yields, so counting occurrences of a term id
+    gives the same numbers as scanning the raw words of the text.
+    """
+
+    def __init__(self):
+        # global term dictionary
+        self.term_ids: Dict[str, int] = {}
+        self.terms: List[str] = []
+
+        # per document: word ids in text order + sorted (term id, frequency) pairs
+        self.docs: List[array] = []
+        self.doc_term_ids: List[array] = []
+        self.doc_term_freqs: List[array] = []
+
+        # per term: documents containing it and the frequency in each of them
+        self.term_docs: List[array] = []
+        self.term_freqs: List[array] = []
+
+        # per term: word positions, grouped by document in term_docs order (term_freqs[t][k] per document)
+        self.term_positions: List[array] = []
+
+        # all terms joined by newlines + the offset of each, built on first use for substring lookups
+        self._vocabulary: Tuple[str, List[int]] = None
+
+    @classmethod
+    def from_arrays(cls, terms: List[str], docs: Sequence, doc_term_ids: Sequence, doc_term_freqs: Sequence,
+                    term_docs: Sequence, term_freqs: Sequence, term_positions: Sequence) -> "CorpusIndex":
+        """ Index over prebuilt arrays (e.g. memory-mapped from a snapshot); it is read-only """
+        index = cls()
+        index.terms = terms
+        index.term_ids = {term: term_id for term_id, term in enumerate(terms)}
+        index.docs = docs
+        index.doc_term_ids = doc_term_ids
+        index.doc_term_freqs = doc_term_freqs
+        index.term_docs = term_docs
+        index.term_freqs = term_freqs
+        index.term_positions = term_positions
+        return index
+
+    def build(self, texts: Iterable[str]):
+        for text in texts:
+            self.add_document(text)
+
+    def _term_id(self, term: str) -> int:
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self.term_ids[term] = term_id
+            self.terms.append(term)
+            self.term_docs.append(array('I'))
+            self.term_freqs.append(array('I'))
+            self.term_positions.append(array('I'))
+        return term_id
+
+    def add_document(self, text: str) -> int:
+        doc = len(self.docs)
+        self._vocabulary = None
+        term_id = self._term_id
+        word_ids = array('I', [term_id(word) for word in (text or "").split()])
+        self.docs.append(word_ids)
+
+        frequencies = sorted(Counter(word_ids).items())
+        self.doc_term_ids.append(array('I', [tid for tid, _ in frequencies]))
+        self.doc_term_freqs.append(array('I', [freq for _, freq in frequencies]))
+        for tid, freq in frequencies:
+            self.term_docs[tid].append(doc)
+            self.term_freqs[tid].append(freq)
+        term_positions = self.term_positions
+        for pos, tid in enumerate(word_ids):
+            term_positions[tid].append(pos)
+        return doc
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def doc_length(self, doc: int) -> int:
+        return len(self.docs[doc])
+
+    def tokenize(self, query: str) -> List[int]:
+        """ Word ids of a query; -1 for words that never occur in the corpus """
+        return [self.term_ids.get(word, -1) for word in query.lower().split()]
+
+    def count_terms(self, term_ids: Iterable[int]) -> Dict[int, int]:
+        """ Per document: total occurrences of any of the given terms """
+        counts: Dict[int, int] = {}
+        for term_id in term_ids:
+            for doc, freq in zip(self.term_docs[term_id], self.term_freqs[term_id]):
+                counts[doc] = counts.get(doc, 0) + freq
+        return counts
+
+    def vocabulary(self) -> Tuple[str, List[int]]:
+        if self._vocabulary is None:
+            text = "\n".join(self.terms)
+            starts = list(accumulate((len(term) + 1 for term in self.terms[:-1]), initial=0)) if self.terms else []
+            self._vocabulary = (text, starts)
+        return self._vocabulary
+
+    def substring_terms(self, fragment: str) -> Dict[int, int]:
+        """ Terms containing fragment (which holds no whitespace) and its (possibly overlapping)
+        occurrences in each; one pass of str.find over the joined vocabulary """
+        text, starts = self.vocabulary()
+        found: Dict[int, int] = {}
+        pos = text.find(fragment)
+        while pos != -1:
+            term_id = bisect.bisect_right(starts, pos) - 1
+            found[term_id] = found.get(term_id, 0) + 1
+            pos = text.find(fragment, pos + 1)
+        return found
+
+    def word_counts(self, word: str) -> Dict[int, int]:
+        """ Whole-word occurrences of a single word per document """
+        term_id = self.term_ids.get(word)
+        if term_id is None:
+            return {}
+        return dict(zip(self.term_docs[term_id], self.term_freqs[term_id]))
+
+    def phrase_counts(self, phrase: str) -> Dict[int, int]:
+        """ Occurrences of consecutive words per document, compared as word ids """
+        word_ids = self.tokenize(phrase)
+        if not word_ids or -1 in word_ids:
+            return {}
+        return self.token_phrase_counts([[term_id] for term_id in word_ids])
+
+    def phrase_positions(self, phrase: str) -> Dict[int, List[int]]:
+        """ Start positions of consecutive words per document, compared as word ids """
+        word_ids = self.tokenize(phrase)
+        if not word_ids or -1 in word_ids:
+            return {}
+        return self.token_phrase_positions([[term_id] for term_id in word_ids])
+
+    def token_phrase_counts(self, token_terms: List[Sequence[int]]) -> Dict[int, int]:
+        """ Occurrences per document of consecutive words where the k-th word is any of token_terms[k] """
+        return {doc: len(starts) for doc, starts in self.token_phrase_positions(token_terms).items()}
+
+    def term_positions_by_doc(self, term_ids: Iterable[int]) -> Dict[int, List[int]]:
+        """ Per document: word positions of any of the given terms """
+        positions: Dict[int, List[int]] = {}
+        for term_id in term_ids:
+            term_positions = self.term_positions[term_id]
+            offset = 0
+            for doc, freq in zip(self.term_docs[term_id], self.term_freqs[term_id]):
+                positions.setdefault(doc, []).extend(term_positions[offset:offset + freq])
+                offset += freq
+        return positions
+
+    def token_phrase_positions(self, token_terms: List[Sequence[int]]) -> Dict[int, List[int]]:
+        """ Start positions per document of consecutive words where the k-th word is any of token_terms[k]
+
+        The token with the fewest occurrences anchors the search: only its positions are
+        visited, and the other tokens are checked at their offsets in the document's word ids.
+        """
+        width = len(token_terms)
+        if width == 0 or any(len(terms) == 0 for terms in token_terms):
+            return {}
+        if width == 1:
+            return self.term_positions_by_doc(token_terms[0])
+
+        anchor = min(range(width), key=lambda k: sum(len(self.term_positions[term_id]) for term_id in token_terms[k]))
+        accepted = [set(terms) for terms in token_terms]
+        others = [(k, accepted[k]) for k in range(width) if k != anchor]
+        found: Dict[int, List[int]] = {}
+        for term_id in accepted[anchor]:
+            positions = self.term_positions[term_id]
+            offset = 0
+            for doc, freq in zip(self.term_docs[term_id], self.term_freqs[term_id]):
+                words = self.docs[doc]
+                last_start = len(words) - width
+                starts = None
+                for pos in positions[offset:offset + freq]:
+                    start = pos - anchor
+                    if 0 <= start <= last_start and all(words[start + k] in terms for k, terms in others):
+                        if starts is None:
+                            starts = found.setdefault(doc, [])
+                        starts.append(start)
+                offset += freq
+        return found
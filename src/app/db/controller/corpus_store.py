@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Tuple
+from db.controller.snapshot import SnapshotTexts
+
+# decoded CV texts kept resident, override with ATS_CORPUS_MEMORY_BUDGET (bytes)
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+class CorpusStore(Sequence):
+    """ CV texts of a snapshot under a memory budget
+
+    Texts are decoded a chunk at a time. Decoded chunks stay resident in LRU order while they
+    fit the budget; colder chunks are evicted and decoded again from the memory-mapped
+    snapshot when they are needed. Full scans go through scan(), which streams chunks that
+    are not resident without evicting the ones that are, so a corpus larger than the budget
+    can be scanned without flushing the hot set.
+    """
+
+    def __init__(self, source: SnapshotTexts, memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        self.source = source
+        self.memory_budget = memory_budget
+        self.resident: OrderedDict[int, Tuple[List[str], int]] = OrderedDict()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reload_seconds = 0.0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def _decode(self, k: int) -> Tuple[List[str], int]:
+        start = time.perf_counter()
+        texts, size = self.source.decode_chunk(k)
+        self.reload_seconds += time.perf_counter() - start
+        self.misses += 1
+        return texts, size
+
+    def _chunk(self, k: int) -> List[str]:
+        with self.lock:
+            entry = self.resident.get(k)
+            if entry is not None:
+                self.hits += 1
+                self.resident.move_to_end(k)
+                return entry[0]
+            texts, size = self._decode(k)
+            self.resident[k] = (texts, size)
+            self.resident_bytes += size
+            # the chunk just loaded stays even when it alone exceeds the budget
+            while self.resident_bytes > self.memory_budget and len(self.resident) > 1:
+                _, (_, evicted) = self.resident.popitem(last=False)
+                self.resident_bytes -= evicted
+                self.evictions += 1
+            return texts
+
+    def _scan_chunk(self, k: int) -> List[str]:
+        with self.lock:
+            entry = self.resident.get(k)
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+            texts, size = self._decode(k)
+            # scans only fill free budget, they never evict
+            if self.resident_bytes + size <= self.memory_budget:
+                self.resident[k] = (texts, size)
+                self.resident.move_to_end(k, last=False)
+                self.resident_bytes += size
+            return texts
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("text index out of range")
+        k = self.source.chunk_of(i)
+        return self._chunk(k)[i - self.source.chunk_first(k)]
+
+    def scan(self, docs: Iterable[int] = None) -> Iterator[Tuple[int, str]]:
+        """ (doc, text) for docs in the given order, each chunk decoded at most once per run of docs """
+        docs = range(len(self)) if docs is None else docs
+        current = -1
+        texts = None
+        first = 0
+        for doc in docs:
+            k = self.source.chunk_of(doc)
+            if k != current:
+                current = k
+                texts = self._scan_chunk(k)
+                first = self.source.chunk_first(k)
+            yield doc, texts[doc - first]
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'memory_budget': self.memory_budget,
+            'resident_bytes': self.resident_bytes,
+            'resident_chunks': len(self.resident),
+            'chunks': self.source.chunk_count,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'reloads': self.misses,
+            'evictions': self.evictions,
+            'avg_reload_ms': self.reload_seconds * 1000 / self.misses if self.misses else 0.0,
+        }
@@ -1,8 +1,17 @@
-import datetime
+import os
+import asyncio
+import threading
 from db.controller.atsController import ATSController
-from typing import List, Dict
+from typing import List, Dict, Optional
 from db.controller.matcher import Matcher, AhoCorasick
-from db.controller.infopenting import InfoPentingGacorRealNoHoax
+from db.controller.match_result import MatchResult
+from db.controller.infopenting import EXTRACTOR_VERSION, InfoPentingGacorRealNoHoax
+from db.controller.applicant_directory import ApplicantDirectory
+from db.controller.profiler import SearchProfile
+from db.controller.attribute_bitmaps import AttributeBitmaps
+from db.controller.profile_ingest import ProfileIngestor, cv_signature
+
+PROFILE_SECTIONS = ('skills', 'summaries', 'jobs', 'educations')
 
 class DataService:
     def __init__(self):
@@ -10,10 +19,81 @@ class DataService:
         self.algorithm_toggle = True 
 
         self.app_dict = {}
-        self.matcher = Matcher(self.get_all_text(), [])
+        self.directory = ApplicantDirectory()
+        self.matcher = None
+        self.last_profile = SearchProfile()
+        self.last_ranked = []
+        self.filters = AttributeBitmaps()
+        self.async_controller = None
+        self.async_unavailable = False
+        self.ingest_lock = threading.Lock()
+        self.ingest_thread = None
+        self.ingest_again = False
+        self.refresh()
 
         self.extractor = InfoPentingGacorRealNoHoax()
 
+    def refresh(self):
+        """Reload applications, the applicant directory and the text corpus"""
+        sources = self.get_all_text()
+        self.load_directory()
+        if self.matcher is None:
+            self.matcher = Matcher(sources, [])
+            # cost model of the 'auto' algorithm, measured before the profile ingest loads the machine
+            self.matcher.calibrate()
+        else:
+            self.matcher.refresh(sources)
+        self.build_filters()
+        self.start_profile_ingest()
+
+    def start_profile_ingest(self):
+        """Extract the profiles of new and changed CVs in the background; ATS_PROFILE_INGEST=0 disables it"""
+        if os.getenv('ATS_PROFILE_INGEST', '1') == '0':
+            return
+        with self.ingest_lock:
+            # a refresh during an ingest makes the running thread do another pass
+            self.ingest_again = True
+            if self.ingest_thread is not None:
+                return
+            self.ingest_thread = threading.Thread(target=self._ingest_profiles, name='profile-ingest', daemon=True)
+            self.ingest_thread.start()
+
+    def _ingest_profiles(self):
+        ingestor = ProfileIngestor(self.controller)
+        while True:
+            with self.ingest_lock:
+                if not self.ingest_again:
+                    self.ingest_thread = None
+                    return
+                self.ingest_again = False
+                applications = list(self.app_dict.values())
+            try:
+                stats = ingestor.run(applications)
+                print(f"Profile ingest: {stats['extracted']} extracted, {stats['failed']} failed "
+                      f"of {stats['pending']} pending in {stats['seconds']:.2f}s")
+            except Exception as e:
+                print(f"Profile ingest failed: {e}")
+
+    def build_filters(self):
+        """Bitmaps of the filterable attributes, in the document order of the matcher"""
+        roles = []
+        birth_years = []
+        for detail_id in self.matcher.sources_id:
+            application = self.app_dict.get(detail_id) or {}
+            applicant = self.directory.get(application.get('applicant_id'))
+            roles.append(application.get('application_role'))
+            birth_years.append(applicant.date_of_birth.year if applicant and applicant.date_of_birth else None)
+        self.filters = AttributeBitmaps.build({'role': roles, 'birth_year': birth_years})
+
+    def get_roles(self) -> List[str]:
+        return self.filters.values('role')
+
+    def load_directory(self):
+        directory_result = self.controller.get_applicant_directory()
+        if not directory_result['success']:
+            return
+        self.directory.load(directory_result['data']['applicants'])
+
     def get_all_text(self) -> str:
         app_result = self.controller.get_all_applications()
         if not app_result['success']:
@@ -31,38 +111,162 @@ class DataService:
         result = self.controller.get_dashboard_stats()
         return result['data']['total_applications'] if result['success'] else 0
 
-    def search_candidates(self, keywords: list, top_n: int, algorithm: str):
+    async def get_async_controller(self):
+        """AsyncATSController, or None when the async drivers are not installed or the database
+        cannot be reached through them; callers then use the sync controller"""
+        if self.async_controller is None and not self.async_unavailable:
+            controller = None
+            try:
+                from db.controller.asyncAtsController import AsyncATSController
+                controller = AsyncATSController()
+                await controller.initialize()
+                self.async_controller = controller
+            except ImportError as e:
+                print(f"Async database drivers not available, using the sync controller: {e}")
+                self.async_unavailable = True
+            except Exception as e:
+                print(f"Async database initialization failed, using the sync controller: {e}")
+                self.async_unavailable = True
+                if controller is not None:
+                    try:
+                        await controller.close()
+                    except Exception as close_error:
+                        print(f"Failed to dispose the async engine: {close_error}")
+        return self.async_controller
+
+    async def get_total_cvs_async(self):
+        controller = await self.get_async_controller()
+        if controller is None:
+            return await asyncio.to_thread(self.get_total_cvs)
+        result = await controller.get_dashboard_stats()
+        return result['data']['total_applications'] if result['success'] else 0
+
+    def get_candidate_details(self, application_id: str) -> Dict:
+        """Skills, summary, job history and education of one application, on the calling thread"""
+        profile = self._current_profile(application_id, self.controller.get_cv_profile(application_id))
+        if profile is None:
+            profile = self._extract_profile(application_id)
+        return profile
+
+    async def get_candidate_details_async(self, application_id: str) -> Dict:
+        """Skills, summary, job history and education of one application, read from the stored profile"""
+        controller = await self.get_async_controller()
+        if controller is None:
+            return await asyncio.to_thread(self.get_candidate_details, application_id)
+        profile = self._current_profile(application_id, await controller.get_cv_profile(application_id))
+        if profile is None:
+            profile = await asyncio.to_thread(self._extract_profile, application_id)
+        return profile
+
+    def _current_profile(self, application_id: str, result: Dict) -> Optional[Dict]:
+        """The stored profile, unless it is missing or older than the extractor or the CV file"""
+        application = self.app_dict.get(application_id)
+        if not result['success'] or application is None:
+            return None
+        profile = result['data']
+        if profile['extractor_version'] != EXTRACTOR_VERSION or profile['cv_signature'] != cv_signature(application['cv_path']):
+            return None
+        return {section: profile[section] for section in PROFILE_SECTIONS}
+
+    def _extract_profile(self, application_id: str) -> Dict:
+        """Extract a profile the ingest has not stored yet, and store it for the next read"""
+        application = self.app_dict.get(application_id)
+        signature = cv_signature(application['cv_path'])
+        profile = self.extractor.extract_profile(application['cv_path'])
+        self.controller.save_cv_profile(application_id, EXTRACTOR_VERSION, signature, profile)
+        return profile
+
+    def search_candidates(self, keywords: list, top_n: int, algorithm: str, limit: int = None, filters: Dict = None):
+        """Ranked candidates for keywords; with limit only the first limit are hydrated,
+        the rest stay in last_ranked for get_candidates_page.
+        filters (e.g. {'role': 'Accountant', 'birth_year': [1990, 1991]}) restrict the search to matching CVs"""
         candidates = []
 
         self.matcher.set_keywords(keywords)
-        result, exact_match_calculation_time, fuzzy_match_calculation_time = self.matcher.match(algorithm)
+        pool = self.filters.pool(filters)
+        result, exact_match_calculation_time, fuzzy_match_calculation_time = self.matcher.match(algorithm, pool=pool)
+        profile = self.matcher.profile
+        self.last_profile = profile
+
+        with profile.stage('ranking'):
+            sorted_result = self._rank(result, top_n)
+        profile.count('ranking', documents=len(result))
+        self.last_ranked = sorted_result
+
+        with profile.stage('db_hydration'):
+            candidates = self._hydrate(sorted_result if limit is None else sorted_result[:limit])
+        profile.count('db_hydration', documents=len(candidates))
+
+        return candidates[:top_n], exact_match_calculation_time, fuzzy_match_calculation_time
+
+    def get_ranked_count(self) -> int:
+        """Number of candidates ranked by the last search"""
+        return len(self.last_ranked)
 
-        sorted_result = sorted(result, key=lambda x: x["result"]["total_matched"], reverse=True)[:top_n]   
+    def get_candidates_page(self, offset: int, limit: int, ranked: List[Dict] = None) -> List[Dict]:
+        """Hydrate the next slice of the last search's ranking, or of ranked (kept from an earlier search)"""
+        ranked = self.last_ranked if ranked is None else ranked
+        return self._hydrate(ranked[offset:offset + limit])
 
-        # prune further if total matched is zero
-        sorted_result = [item for item in sorted_result if item['result']['total_matched'] > 0]   
+    def search_candidates_batch(self, keyword_sets: List[List[str]], top_n: int, algorithm: str, filters: Dict = None):
+        """Top candidates for each keyword set, from one scan of the corpus for all of them"""
+        pool = self.filters.pool(filters)
+        results, exact_match_calculation_time, fuzzy_match_calculation_time = self.matcher.match_batch(keyword_sets, algorithm, pool=pool)
+        profile = self.matcher.profile
+        self.last_profile = profile
 
+        with profile.stage('ranking'):
+            sorted_results = [self._rank(result, top_n) for result in results]
+        profile.count('ranking', documents=sum(len(result) for result in results))
+
+        with profile.stage('db_hydration'):
+            batch = [self._hydrate(sorted_result)[:top_n] for sorted_result in sorted_results]
+        profile.count('db_hydration', documents=sum(len(candidates) for candidates in batch))
+
+        return batch, exact_match_calculation_time, fuzzy_match_calculation_time
+
+    def _rank(self, result: MatchResult, top_n: int) -> List[Dict]:
+        # section-weighted BM25 score first, raw match count as the tie-breaker; documents that
+        # matched nothing are pruned, and only the returned rows become dicts
+        return result.rows(result.top(top_n))
+
+    def _hydrate(self, sorted_result: List[Dict]) -> List[Dict]:
+        candidates = []
         for item in sorted_result:
             application = self.app_dict.get(item['id'])
-            datum = self.controller.get_applicant(application['applicant_id'])
-            if (datum['success'] and not datum['data']) or not datum['success']:
+            applicant = self.directory.get(application['applicant_id']) if application else None
+            if applicant is None:
                 print(f"Skipping application {item['id']} due to missing data.")
                 continue
-            datum_data = datum['data']
             candidate = {
                 "application_id": item['id'],
-                "id": datum_data['applicant_id'],
-                "first_name": datum_data['first_name'],
-                "last_name": datum_data['last_name'],
-                "phone": datum_data['phone_number'],
-                "address": datum_data['address'],
-                "birthdate": datetime.datetime.strptime(datum_data['date_of_birth'], "%Y-%m-%d").date() if datum_data['date_of_birth'] else None,
+                "id": applicant.applicant_id,
+                "first_name": applicant.first_name,
+                "last_name": applicant.last_name,
+                "phone": applicant.phone_number,
+                "address": applicant.address,
+                "birthdate": applicant.date_of_birth,
             }
             candidate["matched_keywords"] = item['result']
             candidate["cv_path"] = application['cv_path'] if application else None
             candidates.append(candidate)
+        return candidates
 
-        return candidates[:top_n], exact_match_calculation_time, fuzzy_match_calculation_time
+    def record_render(self, seconds: float, documents: int):
+        """Attach the UI render time to the last search and export it if configured"""
+        self.last_profile.add_time('ui_render', seconds)
+        self.last_profile.count('ui_render', documents=documents)
+        self.export_profile()
+
+    def export_profile(self):
+        # ATS_PROFILE_EXPORT=<path> enables export, ATS_PROFILE_FORMAT=jsonl|prometheus
+        path = os.getenv('ATS_PROFILE_EXPORT')
+        if not path:
+            return
+        try:
+            self.last_profile.export(path, os.getenv('ATS_PROFILE_FORMAT', 'jsonl'))
+        except (OSError, ValueError) as e:
+            print(f"Failed to export search profile: {e}")
     
     def get_skills_by_application_id(self, application_id: str):
         application = self.app_dict.get(application_id)
@@ -0,0 +1,266 @@
+import os
+import struct
+import zlib
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+from db.controller.similarity import levenshtein_distance
+
+FUZZY_INDEX_MAGIC = b'ATSBKT'
+FUZZY_INDEX_VERSION = 1
+QGRAM = 2
+
+
+def max_distance(query_length: int, term_length: int, threshold: float) -> int:
+    """ Largest edit distance that can still give calculate_similarity(...) > threshold """
+    longer = max(query_length, term_length)
+    if longer == 0:
+        return -1
+    # evaluated with the same float expression as calculate_similarity so rounding cannot disagree
+    distance = int(longer * (1 - threshold)) + 1
+    while distance >= 0 and not (longer - distance) / longer > threshold:
+        distance -= 1
+    return distance
+
+
+def qgram_keys(term: str) -> List[Tuple[str, int]]:
+    """ q-grams of term, the n-th occurrence of a q-gram numbered n so that shared keys count the q-gram multiset """
+    occurrences = {}
+    keys = []
+    for i in range(len(term) - QGRAM + 1):
+        gram = term[i:i + QGRAM]
+        n = occurrences.get(gram, 0)
+        occurrences[gram] = n + 1
+        keys.append((gram, n))
+    return keys
+
+
+def min_shared_qgrams(query_length: int, term_length: int, distance: int) -> int:
+    """ q-gram lemma: strings within edit distance d share at least max(|x|, |y|) - q + 1 - q * d q-grams """
+    return max(query_length, term_length) - QGRAM + 1 - QGRAM * distance
+
+
+class BKTree:
+    """ Burkhard-Keller tree over terms, keyed on Levenshtein distance """
+
+    def __init__(self):
+        self.terms: List[str] = []
+        self.children: List[Dict[int, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _new_node(self, term: str) -> int:
+        self.terms.append(term)
+        self.children.append({})
+        return len(self.terms) - 1
+
+    def add(self, term: str):
+        if not self.terms:
+            self._new_node(term)
+            return
+        node = 0
+        while True:
+            distance = levenshtein_distance(term, self.terms[node])
+            if distance == 0:
+                return
+            child = self.children[node].get(distance)
+            if child is None:
+                self.children[node][distance] = self._new_node(term)
+                return
+            node = child
+
+    def search(self, query: str, radius: int) -> Tuple[List[Tuple[str, int]], int]:
+        """ All (term, distance) with distance <= radius, plus the number of distances computed """
+        if not self.terms or radius < 0:
+            return [], 0
+        found = []
+        compared = 0
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            distance = levenshtein_distance(query, self.terms[node])
+            compared += 1
+            if distance <= radius:
+                found.append((self.terms[node], distance))
+            low = distance - radius
+            high = distance + radius
+            for edge, child in self.children[node].items():
+                if low <= edge <= high:
+                    stack.append(child)
+        return found, compared
+
+    def edges(self) -> Tuple[array, array]:
+        """ (parent, edge distance) per node, root has parent 0 and distance 0 """
+        parents = array('I', [0]) * len(self.terms)
+        distances = array('I', [0]) * len(self.terms)
+        for node, children in enumerate(self.children):
+            for edge, child in children.items():
+                parents[child] = node
+                distances[child] = edge
+        return parents, distances
+
+    @classmethod
+    def from_edges(cls, terms: List[str], parents: array, distances: array) -> "BKTree":
+        tree = cls()
+        tree.terms = terms
+        tree.children = [{} for _ in terms]
+        for child in range(1, len(terms)):
+            tree.children[parents[child]][distances[child]] = child
+        return tree
+
+
+class FuzzyTermIndex:
+    """ BK-trees over the corpus vocabulary, one per term length
+
+    A term can only match when its length passes the fuzzy length filter and the
+    length difference does not already exceed the allowed edit distance, so whole
+    buckets are skipped and each tree is searched with the tightest radius for its length.
+
+    Where the q-gram lemma gives a positive bound for a bucket, its terms are counted against
+    the q-grams of the query first and Levenshtein only runs on the terms sharing enough of
+    them; the q-gram postings are built per bucket on first use and not persisted.
+    """
+
+    def __init__(self):
+        self.trees: Dict[int, BKTree] = {}
+        self.known = set()
+        self.dirty = False
+        # term length -> q-gram key -> positions in trees[length].terms
+        self.qgrams: Dict[int, Dict[Tuple[str, int], array]] = {}
+
+    def __len__(self) -> int:
+        return len(self.known)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.known
+
+    def add(self, term: str):
+        if term in self.known:
+            return
+        self.known.add(term)
+        tree = self.trees.setdefault(len(term), BKTree())
+        tree.add(term)
+        postings = self.qgrams.get(len(term))
+        if postings is not None:
+            self._add_qgrams(postings, term, len(tree) - 1)
+        self.dirty = True
+
+    @staticmethod
+    def _add_qgrams(postings: Dict[Tuple[str, int], array], term: str, position: int):
+        for key in qgram_keys(term):
+            posting = postings.get(key)
+            if posting is None:
+                posting = postings[key] = array('I')
+            posting.append(position)
+
+    def _qgram_postings(self, length: int) -> Dict[Tuple[str, int], array]:
+        postings = self.qgrams.get(length)
+        if postings is None:
+            postings = {}
+            for position, term in enumerate(self.trees[length].terms):
+                self._add_qgrams(postings, term, position)
+            self.qgrams[length] = postings
+        return postings
+
+    def _qgram_search(self, length: int, query: str, query_keys: List[Tuple[str, int]], radius: int,
+                      min_shared: int) -> Tuple[List[Tuple[str, int]], int]:
+        """ Same result as trees[length].search(query, radius), Levenshtein only on q-gram candidates """
+        postings = self._qgram_postings(length)
+        shared = Counter()
+        for key in query_keys:
+            posting = postings.get(key)
+            if posting is not None:
+                shared.update(posting)
+        terms = self.trees[length].terms
+        found = []
+        compared = 0
+        for position, count in shared.items():
+            if count < min_shared:
+                continue
+            compared += 1
+            distance = levenshtein_distance(query, terms[position])
+            if distance <= radius:
+                found.append((terms[position], distance))
+        return found, compared
+
+    def update(self, terms: Iterable[str]) -> int:
+        """ Add terms that are not indexed yet; returns how many were added """
+        before = len(self.known)
+        for term in terms:
+            self.add(term)
+        return len(self.known) - before
+
+    def lookup(self, query: str, threshold: float) -> Tuple[List[str], int]:
+        """ Terms t with calculate_similarity(t, query) > threshold that pass the fuzzy length filter """
+        assert 0 <= threshold <= 1, "Threshold must be between 0 and 1"
+        query_length = len(query)
+        query_keys = qgram_keys(query)
+        matched = []
+        compared = 0
+        for length in range((query_length + 1) // 2, query_length * 2 + 1):
+            tree = self.trees.get(length)
+            if tree is None:
+                continue
+            radius = max_distance(query_length, length, threshold)
+            if abs(query_length - length) > radius:
+                continue
+            min_shared = min_shared_qgrams(query_length, length, radius)
+            if min_shared > 0:
+                found, searched = self._qgram_search(length, query, query_keys, radius, min_shared)
+            else:
+                # the lemma cannot rule out any term of this length
+                found, searched = tree.search(query, radius)
+            compared += searched
+            longer = max(query_length, length)
+            for term, distance in found:
+                # same expression as calculate_similarity, so float rounding agrees with it
+                if (longer - distance) / longer > threshold:
+                    matched.append(term)
+        return matched, compared
+
+    def save(self, path: str):
+        """ Versioned binary file: header, then one zlib block per length bucket """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(FUZZY_INDEX_MAGIC)
+            f.write(struct.pack('<II', FUZZY_INDEX_VERSION, len(self.trees)))
+            for length, tree in sorted(self.trees.items()):
+                parents, distances = tree.edges()
+                payload = b''.join([
+                    struct.pack('<II', length, len(tree)),
+                    parents.tobytes(),
+                    distances.tobytes(),
+                    '\n'.join(tree.terms).encode('utf-8'),
+                ])
+                block = zlib.compress(payload)
+                f.write(struct.pack('<I', len(block)))
+                f.write(block)
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str) -> "FuzzyTermIndex":
+        index = cls()
+        with open(path, 'rb') as f:
+            if f.read(len(FUZZY_INDEX_MAGIC)) != FUZZY_INDEX_MAGIC:
+                raise ValueError(f"Not a fuzzy index file: {path}")
+            version, tree_count = struct.unpack('<II', f.read(8))
+            if version != FUZZY_INDEX_VERSION:
+                raise ValueError(f"Unsupported fuzzy index version {version}")
+            for _ in range(tree_count):
+                (block_size,) = struct.unpack('<I', f.read(4))
+                payload = zlib.decompress(f.read(block_size))
+                length, node_count = struct.unpack_from('<II', payload)
+                offset = 8
+                parents = array('I')
+                parents.frombytes(payload[offset:offset + 4 * node_count])
+                offset += 4 * node_count
+                distances = array('I')
+                distances.frombytes(payload[offset:offset + 4 * node_count])
+                offset += 4 * node_count
+                terms = payload[offset:].decode('utf-8').split('\n') if node_count else []
+                index.trees[length] = BKTree.from_edges(terms, parents, distances)
+                index.known.update(terms)
+        return index
@@ -2,28 +2,52 @@ import re
 import json
 from typing import Dict, List, Optional
 import fitz
+from utils.profiling import profile_hook
+
+# Section headers recognised in CVs, the one list used by the extraction patterns below and by
+# the section-aware scoring of the matcher; in regex alternation order (longer variants match after
+# their prefix fails)
+SECTION_HEADERS = {
+    'summary': ('summary', 'career overview', 'professional summary', 'profile'),
+    'education': ('education', 'education and training', 'academic background'),
+    'experience': ('experience', 'professional experience', 'work experience', 'employment history', 'career history'),
+    'skills': ('skills', 'core qualifications', 'technical skills', 'competencies', 'skill highlights', 'core accomplishments'),
+}
+
+# bump whenever the extraction below changes; stored profiles of older versions are re-extracted
+EXTRACTOR_VERSION = 2
+
+
+def _headers(section: str) -> str:
+    """ Regex alternation of the headers of a section """
+    return '|'.join(map(re.escape, SECTION_HEADERS[section]))
+
 
 class InfoPentingGacorRealNoHoax:
     def __init__(self):
         # Define regex patterns for each section
+        summary = _headers('summary')
         self.summary_patterns = [
-            r'(?i)(?:summary|career overview|professional summary|profile)\s*\n(.*?)(?=\n[A-Z][A-Za-z\s]*\n|\n(?:Experience|Education|Skills|Core|Highlights|Professional))',
-            r'(?i)(?:summary|career overview|professional summary|profile)\s*(.*?)(?=(?:Experience|Education|Skills|Core|Highlights|Professional))',
+            r'(?i)(?:' + summary + r')\s*\n(.*?)(?=\n[A-Z][A-Za-z\s]*\n|\n(?:Experience|Education|Skills|Core|Highlights|Professional))',
+            r'(?i)(?:' + summary + r')\s*(.*?)(?=(?:Experience|Education|Skills|Core|Highlights|Professional))',
         ]
         
+        education = _headers('education')
         self.education_patterns = [
-            r'(?i)(?:education|education and training|academic background)\s*\n(.*?)(?=\n[A-Z][A-Za-z\s]*\n|\n(?:Experience|Skills|Professional|Additional|Interests))',
-            r'(?i)(?:education|education and training|academic background)\s*(.*?)(?=(?:Experience|Skills|Professional|Additional|Interests))',
+            r'(?i)(?:' + education + r')\s*\n(.*?)(?=\n[A-Z][A-Za-z\s]*\n|\n(?:Experience|Skills|Professional|Additional|Interests))',
+            r'(?i)(?:' + education + r')\s*(.*?)(?=(?:Experience|Skills|Professional|Additional|Interests))',
         ]
         
+        experience = _headers('experience')
         self.experience_patterns = [
-            r'(?i)(?:experience|professional experience|work experience|employment history|career history)\s*\n(.*?)(?=\n(?:Education|Skills|Additional|Interests|Professional Affiliations))',
-            r'(?i)(?:experience|professional experience|work experience|employment history|career history)\s*(.*?)(?=(?:Education|Skills|Additional|Interests|Professional Affiliations))',
+            r'(?i)(?:' + experience + r')\s*\n(.*?)(?=\n(?:Education|Skills|Additional|Interests|Professional Affiliations))',
+            r'(?i)(?:' + experience + r')\s*(.*?)(?=(?:Education|Skills|Additional|Interests|Professional Affiliations))',
         ]
         
+        skills = _headers('skills')
         self.skills_patterns = [
-            r'(?i)(?:skills|core qualifications|technical skills|competencies|skill highlights|core accomplishments)\s*\n(.*?)(?=\n[A-Z][A-Za-z\s]*\n|\n(?:Additional|Interests|Professional|References)|\Z)',
-            r'(?i)(?:skills|technical skills|competencies|skill highlights|core accomplishments)\s*(.*?)(?=(?:Additional|Interests|Professional|References)|\Z)',
+            r'(?i)(?:' + skills + r')\s*\n(.*?)(?=\n[A-Z][A-Za-z\s]*\n|\n(?:Additional|Interests|Professional|References)|\Z)',
+            r'(?i)(?:' + skills + r')\s*(.*?)(?=(?:Additional|Interests|Professional|References)|\Z)',
         ]
     
     def read_pdf(self, cv_path: str) -> str:
@@ -74,9 +98,12 @@ class InfoPentingGacorRealNoHoax:
                 res += '\n'
         return res if res else None
     
+    @profile_hook('get_summaries')
     def get_summaries(self, cv_path: str) -> List[str]:
         """ Extract summary information from CV """
-        cv_text = self.read_pdf(cv_path)
+        return self.summaries_from_text(self.read_pdf(cv_path))
+
+    def summaries_from_text(self, cv_text: str) -> List[str]:
         if not cv_text:
             return []
         
@@ -105,9 +132,12 @@ class InfoPentingGacorRealNoHoax:
 
         return pattern.sub(repl, text)
     
+    @profile_hook('get_job_histories')
     def get_job_histories(self, cv_path: str) -> List[Dict[str, str]]:
         """ Extract experience information from CV """
-        cv_text = self.read_pdf(cv_path)
+        return self.job_histories_from_text(self.read_pdf(cv_path))
+
+    def job_histories_from_text(self, cv_text: str) -> List[Dict[str, str]]:
         if not cv_text:
             return []
         
@@ -183,9 +213,12 @@ class InfoPentingGacorRealNoHoax:
         
         return job_histories
     
+    @profile_hook('get_educations')
     def get_educations(self, cv_path: str) -> List[Dict[str, str]]:
         """ Extract education information from CV """
-        cv_text = self.read_pdf(cv_path)
+        return self.educations_from_text(self.read_pdf(cv_path))
+
+    def educations_from_text(self, cv_text: str) -> List[Dict[str, str]]:
         if not cv_text:
             return []
         
@@ -252,9 +285,12 @@ class InfoPentingGacorRealNoHoax:
         
         return unique_educations
     
+    @profile_hook('get_skills')
     def get_skills(self, cv_path: str) -> List[str]:
         """ Extract skills information from CV """
-        cv_text = self.read_pdf(cv_path)
+        return self.skills_from_text(self.read_pdf(cv_path))
+
+    def skills_from_text(self, cv_text: str) -> List[str]:
         if not cv_text:
             return []
         
@@ -275,4 +311,15 @@ class InfoPentingGacorRealNoHoax:
                 seen.add(skill.lower())
                 unique_skills.append(skill)
         
-        return unique_skills
\ No newline at end of file
+        return unique_skills
+
+    @profile_hook('extract_profile')
+    def extract_profile(self, cv_path: str) -> Dict[str, List]:
+        """ All four sections of a CV from a single read of the PDF """
+        cv_text = self.read_pdf(cv_path)
+        return {
+            'skills': self.skills_from_text(cv_text),
+            'summaries': self.summaries_from_text(cv_text),
+            'jobs': self.job_histories_from_text(cv_text),
+            'educations': self.educations_from_text(cv_text),
+        }
@@ -0,0 +1,122 @@
+import heapq
+from array import array
+from collections.abc import Sequence
+from typing import Dict, List
+
+try:
+    import numpy
+except ImportError:  # optional: top() falls back to heapq
+    numpy = None
+
+
+def _zeros(typecode: str, size: int) -> array:
+    return array(typecode, bytes(array(typecode).itemsize * size))
+
+
+class MatchResult(Sequence):
+    """ Per-document match counts of one search, held in flat columns
+
+    counts and weights are documents x keywords matrices stored row-major in one array each,
+    totals and scores are vectors; row i is the i-th searched document. Result dicts
+    ({'id', 'result': {'keywords', 'matched_queries', 'total_matched', 'score'}}) are only
+    built for the rows asked for: those returned by top(), or on indexing.
+    """
+
+    def __init__(self, ids: List, keywords: List[str]):
+        self.ids = ids
+        self.keywords = keywords
+        self.width = len(keywords)
+        self.counts = _zeros('q', len(ids) * self.width)
+        self.weights = _zeros('d', len(ids) * self.width)
+        self.totals = _zeros('q', len(ids))
+        self.scores = _zeros('d', len(ids))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return self.rows(range(*row.indices(len(self))))
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("result row out of range")
+        return {
+            "id" : self.ids[row],
+            "result" : {
+                'keywords' : self.keywords,
+                'matched_queries': self.row_counts(row),
+                'total_matched': self.totals[row],
+                'score': self.scores[row],
+            }
+        }
+
+    def rows(self, rows) -> List[Dict]:
+        return [self[row] for row in rows]
+
+    def row_counts(self, row: int) -> List[int]:
+        start = row * self.width
+        return self.counts[start:start + self.width].tolist()
+
+    def row_weights(self, row: int) -> List[float]:
+        start = row * self.width
+        return self.weights[start:start + self.width].tolist()
+
+    def set_row(self, row: int, counts: List[int], weights: List[float]):
+        total = sum(counts)
+        if not total:
+            # rows start zeroed, and most documents match nothing
+            return
+        start = row * self.width
+        self.counts[start:start + self.width] = array('q', counts)
+        self.weights[start:start + self.width] = array('d', weights)
+        self.totals[row] = total
+
+    def set_count(self, row: int, column: int, count: int, weight: float):
+        """ Set a keyword count that is still zero, e.g. from the fuzzy stage """
+        self.counts[row * self.width + column] = count
+        self.weights[row * self.width + column] = weight
+        self.totals[row] += count
+
+    def doc_freqs(self) -> List[int]:
+        """ Number of documents matching each keyword """
+        if numpy is not None and len(self):
+            counts = numpy.frombuffer(self.counts, dtype=numpy.int64).reshape(len(self), self.width)
+            return numpy.count_nonzero(counts, axis=0).tolist()
+        return [len(self) - self.counts[j::self.width].count(0) for j in range(self.width)]
+
+    def project(self, columns: List[int], keywords: List[str]) -> "MatchResult":
+        """ Result of a subset of the keywords (columns, in keywords order), unscored """
+        projected = MatchResult(self.ids, keywords)
+        width = projected.width
+        for k, j in enumerate(columns):
+            projected.counts[k::width] = self.counts[j::self.width]
+            projected.weights[k::width] = self.weights[j::self.width]
+        if numpy is not None and len(self) and width:
+            counts = numpy.frombuffer(projected.counts, dtype=numpy.int64).reshape(len(self), width)
+            projected.totals = array('q', counts.sum(axis=1).tobytes())
+        else:
+            for row in range(len(self)):
+                projected.totals[row] = sum(projected.counts[row * width:(row + 1) * width])
+        return projected
+
+    def top(self, n: int) -> List[int]:
+        """ Rows of the n best documents by (score, total matched), ties in document order,
+        without the documents that matched nothing """
+        size = len(self)
+        n = min(n, size)
+        if n <= 0:
+            return []
+        if numpy is not None and n < size:
+            scores = numpy.frombuffer(self.scores, dtype=numpy.float64)
+            totals = numpy.frombuffer(self.totals, dtype=numpy.int64)
+            # every row scoring at least the n-th best score, so ties at the cut are kept
+            kth = scores[numpy.argpartition(scores, size - n)[size - n]]
+            candidates = numpy.flatnonzero(scores >= kth)
+            order = numpy.lexsort((candidates, -totals[candidates], -scores[candidates]))
+            rows = candidates[order[:n]].tolist()
+        else:
+            scores = self.scores
+            totals = self.totals
+            rows = heapq.nlargest(n, range(size), key=lambda row: (scores[row], totals[row]))
+        return [row for row in rows if self.totals[row] > 0]
@@ -1,52 +1,117 @@
 import os
-import re
 from typing import List, Dict, Union, Tuple
 import fitz
 import time
 import copy
 import concurrent.futures
 from concurrent.futures import ProcessPoolExecutor, as_completed
-
-def levenshtein_distance(s1: str, s2: str) -> int:
-    if len(s1) < len(s2):
-        return levenshtein_distance(s2, s1)
-
-    if len(s2) == 0:
-        return len(s1)
-
-    dp = list(range(len(s2) + 1))
-    for i in range(1, len(s1) + 1):
-        new_dp = [i] * (len(s2) + 1)
-        for j in range(1, len(s2) + 1):
-            cost = 0 if s1[i - 1] == s2[j - 1] else 1
-            new_dp[j] = min(dp[j] + 1, new_dp[j - 1] + 1, dp[j - 1] + cost)
-        dp = new_dp
-    return dp[len(s2)]
-
-
-def calculate_similarity(str1: str, str2: str) -> float:
-    if len(str1) == 0 or len(str2) == 0:
-        return 0.0
-    longer = str1 if len(str1) > len(str2) else str2
-    shorter = str2 if len(str1) > len(str2) else str1
-    if len(longer) == 0:
-        return 1.0
-    return (len(longer) - levenshtein_distance(longer, shorter)) / len(longer)
-
-
-def fuzzy_match_1_query(text: str, query: str, threshold: float) -> int:
-    assert 0 <= threshold <= 1, "Threshold must be between 0 and 1"
+from concurrent.futures.process import BrokenProcessPool
+from db.controller.profiler import SearchProfile
+from utils.profiling import profile_hook
+from db.controller.corpus_index import CorpusIndex
+from db.controller.fuzzy_index import FuzzyTermIndex
+from db.controller.snapshot import SearchSnapshot, SourceSignature, open_snapshot, source_signature, write_snapshot
+from db.controller.corpus_store import DEFAULT_MEMORY_BUDGET, CorpusStore
+from db.controller.trigram_index import TrigramIndex
+from db.controller.match_result import MatchResult
+from db.controller.query_planner import PLAN_METHODS, CostModel, QueryPlan, choose_plan
+from db.controller.text_normalize import normalize_text
+from db.controller.section_scoring import SectionMap, SectionTable, bm25_idf, bm25_score
+
+# persistent search state (fuzzy term index, snapshot, ...) lives here, override with ATS_CACHE_DIR
+DEFAULT_CACHE_DIR = '.ats_cache'
+FUZZY_INDEX_FILE = 'fuzzy_index.bin'
+SNAPSHOT_FILE = 'search_state.snap'
+
+# exact scanning is sharded over worker processes once the corpus is this large;
+# shards aim at SHARDS_PER_WORKER pieces of roughly equal text length per worker
+SHARDED_METHODS = ('exact', 'KMP', 'BM', 'AC')
+PARALLEL_SCAN_MIN_BYTES = 2_000_000
+SHARDS_PER_WORKER = 4
+MIN_SHARD_BYTES = 64_000
+
+# the 'auto' method calibrates its cost model once, timing each engine on a sample of the corpus
+CALIBRATION_SAMPLE_BYTES = 100_000
+CALIBRATION_AC_BYTES = 10_000
+CALIBRATION_KEYWORDS = 8
+CALIBRATION_SHORT_KEYWORD = 4
+CALIBRATION_LONG_KEYWORD = 16
+CALIBRATION_REPEATS = 3
+CALIBRATION_POSTINGS = 20_000
+
+
+def is_phrase_query(query: str) -> bool:
+    return len(query.split()) > 1
+
+def exact_match_weighted(text: str, query: str, sections: SectionMap) -> Tuple[int, float]:
+    """ exact_match_count plus the sum of the section weights of the occurrences """
+    char_starts = sections.char_starts
+    weights = sections.weights
+    last_section = len(char_starts) - 1
+    section = 0
+    count = 0
+    weighted = 0.0
+    start = 0
+    while True:
+        pos = text.find(query, start)
+        if pos == -1:
+            break
+        # occurrences come in text order, so the section only moves forward
+        while section < last_section and char_starts[section + 1] <= pos:
+            section += 1
+        count += 1
+        weighted += weights[section]
+        start = pos + 1
+    return count, weighted
+
+def exact_match_count(text: str, query: str) -> int:
+    """ Number of (possibly overlapping) occurrences of query in text """
     count = 0
-    for word in text.split():
-        if len(query) * 2 < len(word) or len(word) * 2 < len(query):
-            continue
-        if calculate_similarity(word, query) > threshold:
-            count += 1
+    start = 0
+    while True:
+        pos = text.find(query, start)
+        if pos == -1:
+            break
+        count += 1
+        start = pos + 1
     return count
 
-def fuzzy_match_worker(j, i, text, query, threshold):
-    count = fuzzy_match_1_query(text, query, threshold)
-    return (j, i, count)
+# texts and section maps of the scan pool worker process, set once by the pool initializer
+_scan_texts: List[str] = []
+_scan_sections: SectionTable = SectionTable()
+
+def init_scan_worker(texts: List[str], sections: SectionTable, snapshot_path: str = None, file_id: Tuple = None,
+                     memory_budget: int = DEFAULT_MEMORY_BUDGET):
+    """ Workers get the texts themselves, or read them from the parent's snapshot file """
+    global _scan_texts, _scan_sections
+    if snapshot_path is not None:
+        snapshot = open_snapshot(snapshot_path)
+        if snapshot is None or snapshot.file_id != file_id:
+            raise RuntimeError(f"Search snapshot {snapshot_path} changed under the scan pool")
+        texts = CorpusStore(snapshot.texts(), memory_budget)
+    _scan_texts = texts
+    _scan_sections = sections
+
+def scan_shard_worker(shard: int, docs: List[int], method: str, queries: List[str]):
+    """ Per-keyword (counts, section-weighted counts) of the given documents of the worker's corpus """
+    automaton = AhoCorasick(list(queries)) if method == 'AC' else None
+    matches = []
+    for doc, text in iter_texts(_scan_texts, docs):
+        sections = _scan_sections[doc]
+        if automaton is not None:
+            matched = automaton.search_words(text, sections)
+            matches.append((matched['matched_queries'], matched['weighted_queries']))
+        else:
+            pairs = [exact_match_weighted(text, query, sections) for query in queries]
+            matches.append(([count for count, _ in pairs], [weighted for _, weighted in pairs]))
+    return shard, matches
+
+def iter_texts(texts: List[str], docs: List[int] = None):
+    """ (doc, text) pairs; a CorpusStore streams them without evicting its resident texts """
+    if isinstance(texts, CorpusStore):
+        return texts.scan(docs)
+    docs = range(len(texts)) if docs is None else docs
+    return ((doc, texts[doc]) for doc in docs)
 
 # SOURCE : https://www.geeksforgeeks.org/dsa/aho-corasick-algorithm-pattern-searching/
 class AhoCorasick:
@@ -216,7 +281,7 @@ class AhoCorasick:
 
 
     # This function finds all occurrences of all words in text.
-    def search_words(self, text) -> Dict:
+    def search_words(self, text, sections: SectionMap = None) -> Dict:
         # Convert the text to lowercase to make search case insensitive
 
         # Initialize current_state to 0 
@@ -226,6 +291,7 @@ class AhoCorasick:
         # Key here is the found word
         # Value is a list of all occurrences start index
         results = [0] * len(self.words)
+        weighted = [0.0] * len(self.words)
         sum = 0
 
         # Traverse the text through the built machine
@@ -241,26 +307,159 @@ class AhoCorasick:
                 if (self.out[current_state] & (1<<j)) > 0:
                     results[j] += 1
                     sum += 1
+                    if sections is not None:
+                        weighted[j] += sections.weight_at_char(i - len(self.words[j]) + 1)
 
         # Return the final result dictionary
         return {
             'keywords' : self.words,
             'matched_queries': results,
+            'weighted_queries': weighted if sections is not None else results,
             'total_matched': sum
         }
 
 class Matcher:
-    def __init__(self, sources: List[Tuple[str, str]], queries: List[str]):
+    def __init__(self, sources: List[Tuple[str, str]], queries: List[str], cache_dir: str = None, memory_budget: int = None):
         self.sources_id = [source[0] for source in sources]
         self.cv_paths = [source[1] for source in sources]
         self.automaton_trie = None
+        self.cache_dir = cache_dir or os.getenv('ATS_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.memory_budget = memory_budget or int(os.getenv('ATS_CORPUS_MEMORY_BUDGET', DEFAULT_MEMORY_BUDGET))
 
         self.queries = [query.lower() for query in queries]
-        self.texts = self._extract_texts_concurrently()
+        self.snapshot = None
+        self.signatures: Dict[str, SourceSignature] = {}
+        self.fuzzy_index = self._load_fuzzy_index()
+        self._load_state({})
 
         self.exact_match_calculation_time = 0
         self.fuzzy_match_calculation_time = 0
+        self.profile = SearchProfile()
+        self.cost_model: CostModel = None
+        self._scan_pool = None
+
+    def refresh(self, sources: List[Tuple[str, str]]):
+        """Switch to a new source list, extracting only CVs that are new or changed on disk"""
+        # texts served from the snapshot are found there again, without decoding them all here
+        known_texts = {}
+        if not isinstance(self.texts, CorpusStore):
+            known_texts = {path: (self.signatures.get(path), text) for path, text in zip(self.cv_paths, self.texts)}
+        self.sources_id = [source[0] for source in sources]
+        self.cv_paths = [source[1] for source in sources]
+
+        # workers hold a copy of the old texts
+        self.close()
+        self._load_state(known_texts)
+
+    def close(self):
+        """Stop the scan worker processes, they are started again on demand"""
+        if self._scan_pool is not None:
+            self._scan_pool.shutdown(wait=False, cancel_futures=True)
+            self._scan_pool = None
+
+    def _load_state(self, known_texts: Dict[str, Tuple[SourceSignature, str]]):
+        """Texts and corpus index from the snapshot when it is current, otherwise rebuilt and saved"""
+        signatures = {path: source_signature(path) for path in dict.fromkeys(self.cv_paths)}
+        sources = list(zip(self.sources_id, self.cv_paths))
+        self.signatures = signatures
+        self.scan_pool_failed = False
+
+        snapshot = open_snapshot(self._snapshot_path())
+        if snapshot is not None and snapshot.is_current(sources, signatures):
+            self.corpus = snapshot.corpus()
+            self.sections = snapshot.sections()
+            self.trigrams = snapshot.trigrams()
+            self.corpus_bytes = snapshot.corpus_bytes
+            self.corpus_words = sum(self.corpus.doc_length(doc) for doc in range(len(self.corpus)))
+            self._use_snapshot_texts(snapshot)
+            self._update_fuzzy_index()
+            print(f"Loaded search snapshot with {len(self.texts)} CVs")
+            return
+
+        # reuse every text whose file did not change, from the snapshot or from memory
+        reusable = snapshot.reusable_texts(signatures) if snapshot is not None else {}
+        for path, (signature, text) in known_texts.items():
+            if signature is not None and signature == signatures.get(path):
+                reusable[path] = text
+        if snapshot is not None:
+            snapshot.close()
+
+        new_paths = [path for path in signatures if path not in reusable]
+        reusable.update(zip(new_paths, self._extract_texts_concurrently(new_paths)))
+        self.texts = [reusable[path] for path in self.cv_paths]
+        self.corpus = CorpusIndex()
+        self._build_indexes()
+        # the old mapping must be gone before the snapshot file is replaced
+        self._release_snapshot()
+        if self._save_snapshot():
+            # serve the texts from the new snapshot under the memory budget instead of holding them all
+            snapshot = open_snapshot(self._snapshot_path())
+            if snapshot is not None:
+                self._use_snapshot_texts(snapshot)
+
+    def _use_snapshot_texts(self, snapshot: SearchSnapshot):
+        self.texts = CorpusStore(snapshot.texts(), self.memory_budget)
+        self.text_lengths = snapshot.text_lengths()
+        self._release_snapshot()
+        self.snapshot = snapshot
+
+    def _build_indexes(self):
+        self.corpus.build(self.texts)
+        self.trigrams = TrigramIndex.build(self.corpus)
+        self.sections = SectionTable.build(self.texts)
+        self.text_lengths = [len(text) for text in self.texts]
+        self.corpus_bytes = sum(self.text_lengths)
+        self.corpus_words = sum(self.corpus.doc_length(doc) for doc in range(len(self.corpus)))
+        self._update_fuzzy_index()
+
+    def _update_fuzzy_index(self):
+        added = self.fuzzy_index.update(self.corpus.terms)
+        if added:
+            print(f"Added {added} terms to the fuzzy index")
+            self._save_fuzzy_index()
+
+    def _snapshot_path(self) -> str:
+        return os.path.join(self.cache_dir, SNAPSHOT_FILE)
+
+    def _save_snapshot(self) -> bool:
+        sources = [(source_id, path, self.signatures[path]) for source_id, path in zip(self.sources_id, self.cv_paths)]
+        try:
+            write_snapshot(self._snapshot_path(), sources, self.texts, self.corpus, self.sections, self.trigrams)
+            return True
+        except OSError as e:
+            print(f"Failed to save search snapshot: {e}")
+            return False
+
+    def corpus_stats(self) -> Dict:
+        """ Memory use and reload behaviour of the texts """
+        if isinstance(self.texts, CorpusStore):
+            return self.texts.stats()
+        return {'memory_budget': None, 'resident_bytes': self.corpus_bytes, 'hit_ratio': 1.0, 'reloads': 0}
+
+    def _release_snapshot(self):
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+    def _fuzzy_index_path(self) -> str:
+        return os.path.join(self.cache_dir, FUZZY_INDEX_FILE)
+
+    def _load_fuzzy_index(self) -> FuzzyTermIndex:
+        path = self._fuzzy_index_path()
+        if os.path.exists(path):
+            try:
+                return FuzzyTermIndex.load(path)
+            except (OSError, ValueError) as e:
+                print(f"Rebuilding fuzzy index, failed to load {path}: {e}")
+        return FuzzyTermIndex()
+
+    def _save_fuzzy_index(self):
+        try:
+            self.fuzzy_index.save(self._fuzzy_index_path())
+        except OSError as e:
+            print(f"Failed to save fuzzy index: {e}")
 
+    @profile_hook('extract_text')
     def extract_text(self, path: str, case: int) -> str:
         if not os.path.exists(path):
             raise FileNotFoundError(f"File not found: {path}")
@@ -274,8 +473,7 @@ class Matcher:
             else:
                 raise ValueError(f"Unsupported file format: {file_ext}")
             
-            text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
-            result = text.lower() if case == 0 else text
+            result = normalize_text(text, lower=(case == 0))
             print(f"Finished extracting text from {path}")
             return result
             
@@ -283,23 +481,25 @@ class Matcher:
             print(f"Error extracting text: {e}")
             return ""
 
-    def _extract_texts_concurrently(self) -> List[str]:
+    @profile_hook('extract_texts_concurrently')
+    def _extract_texts_concurrently(self, paths: List[str] = None) -> List[str]:
         def worker(path: str) -> str:
             if not os.path.exists(path):
                 raise FileNotFoundError(f"File not found: {path}")
             return self.extract_text(path, 0)
 
-        results = [None] * len(self.cv_paths)
+        paths = self.cv_paths if paths is None else paths
+        results = [None] * len(paths)
 
         with concurrent.futures.ThreadPoolExecutor() as executor:
-            futures = {executor.submit(worker, path): i for i, path in enumerate(self.cv_paths)}
+            futures = {executor.submit(worker, path): i for i, path in enumerate(paths)}
             
             for future in concurrent.futures.as_completed(futures):
                 i = futures[future]
                 try:
                     results[i] = future.result()
                 except Exception as e:
-                    print(f"[Error] Failed to extract from {self.cv_paths[i]}: {e}")
+                    print(f"[Error] Failed to extract from {paths[i]}: {e}")
                     results[i] = ""
 
         return results
@@ -309,120 +509,486 @@ class Matcher:
         if not queries:
             raise ValueError("Queries list cannot be empty")
         self.queries = [query.lower() for query in queries]
-        self.automaton_trie = AhoCorasick(self.queries)
+        # built lazily by match() so its cost shows up in the automaton_build stage
+        self.automaton_trie = None
         self.exact_match_calculation_time = 0
         self.fuzzy_match_calculation_time = 0
 
     def _extract_from_pdf(self, path: str) -> str:
-        text = ""
         with fitz.open(path) as doc:
-            for page in doc:
-                text += page.get_text()
-        return text
+            return "".join([page.get_text() for page in doc])
     
-    def match(self, method: str, threshold: float = 0.7) -> Dict:
+    @profile_hook('match')
+    def match(self, method: str, threshold: float = 0.7, pool: List[int] = None) -> Tuple[MatchResult, float, float]:
+        """ Match self.queries against the corpus, or against the sorted documents of pool only
+
+        With a pool, results cover just those documents, in pool order, and are scored as if
+        they were the whole corpus. Method 'auto' runs the engine the cost model expects to be
+        fastest for these keywords; the plan is reported in self.profile.plan.
+        """
         if not self.queries:
             raise ValueError("Queries list is empty")
 
+        profile = SearchProfile(method, self.queries)
+        self.profile = profile
 
-        result = []    
-        counter = [0] * len(self.queries)  # Counter for each query
+        method = self._resolve_method(method, pool)
+        result = self._match_counts(method, threshold, pool)
+
+        with profile.stage('ranking'):
+            self._score(result, docs=pool)
 
-        # exact matching
-        for i in range(len(self.sources_id)):
-            text = self.texts[i]
-            id = self.sources_id[i]
+        self.exact_match_calculation_time = profile.exact_time
+        self.fuzzy_match_calculation_time = profile.fuzzy_time
 
-            time_start = time.time()
+        return result, self.exact_match_calculation_time, self.fuzzy_match_calculation_time
+
+    @profile_hook('match_batch')
+    def match_batch(self, keyword_sets: List[List[str]], method: str, threshold: float = 0.7,
+                    pool: List[int] = None) -> Tuple[List[MatchResult], float, float]:
+        """ Match several keyword sets (job openings) with a single pass over the corpus
+
+        The union of all keywords is matched once, so 'AC' builds one automaton and every CV is
+        scanned once however many sets there are. The shared per-keyword counts are projected
+        back into one result list per set, scored exactly as match() would score that set alone.
+        """
+        if not keyword_sets or not all(keyword_sets):
+            raise ValueError("Every keyword set must contain at least one keyword")
+
+        set_queries = [[query.lower() for query in keywords] for keywords in keyword_sets]
+        self.set_keywords(list(dict.fromkeys(query for queries in set_queries for query in queries)))
+
+        profile = SearchProfile(method, self.queries)
+        self.profile = profile
+
+        method = self._resolve_method(method, pool)
+        result = self._match_counts(method, threshold, pool)
+        columns = {query: j for j, query in enumerate(self.queries)}
+
+        batch = []
+        with profile.stage('ranking'):
+            # document frequencies do not depend on the set, so neither do the idfs
+            idfs = self._idfs(result)
+            for queries in set_queries:
+                set_columns = [columns[query] for query in queries]
+                set_result = result.project(set_columns, queries)
+                self._score(set_result, [idfs[j] for j in set_columns], pool)
+                batch.append(set_result)
+
+        self.exact_match_calculation_time = profile.exact_time
+        self.fuzzy_match_calculation_time = profile.fuzzy_time
+
+        return batch, self.exact_match_calculation_time, self.fuzzy_match_calculation_time
+
+    def _resolve_method(self, method: str, pool: List[int] = None) -> str:
+        """ The engine to run: method itself, or for 'auto' the cheapest by the cost model """
+        if method != 'auto':
+            return method
+        with self.profile.stage('planning'):
+            plan = self._plan(self.cost_model or self.calibrate(), pool)
+        self.profile.plan = plan.to_dict()
+        return plan.method
+
+    def _plan(self, model: CostModel, pool: List[int] = None) -> QueryPlan:
+        """ Plan for the scanned keywords (phrases always use the positional postings) """
+        scan_queries = [query for query in self.queries if not is_phrase_query(query)]
+        methods = list(PLAN_METHODS)
+        if not all(query.split() == [query] for query in scan_queries):
+            # an occurrence could span words
+            methods.remove('index')
+        if not all(query.isascii() and query.isalnum() for query in scan_queries):
+            # the automaton folds every other character into one symbol
+            methods.remove('AC')
+
+        # the trigram prefilter bounds the text to scan
+        docs = self.trigrams.candidate_docs(scan_queries)
+        if pool is not None:
+            pool_set = set(pool)
+            docs = pool if docs is None else [doc for doc in docs if doc in pool_set]
+        scan_bytes = self.corpus_bytes if docs is None else sum(self.text_lengths[doc] for doc in docs)
+
+        # the vocabulary tells how often the keywords occur and how many postings hold them
+        occurrences = 0
+        postings = 0
+        if 'index' in methods:
+            for query in scan_queries:
+                for term_id, count in self.corpus.substring_terms(query).items():
+                    positions = len(self.corpus.term_positions[term_id])
+                    occurrences += count * positions
+                    postings += positions + len(self.corpus.term_docs[term_id])
+            if pool is not None and len(self.sources_id):
+                occurrences = occurrences * len(pool) // len(self.sources_id)
+
+        parallelism = (os.cpu_count() or 1) if self._should_shard(scan_bytes) else 1
+        vocabulary_bytes = len(self.corpus.vocabulary()[0])
+        return choose_plan(model, scan_queries, scan_bytes, occurrences, vocabulary_bytes, postings,
+                           parallelism, methods)
+
+    def calibrate(self) -> CostModel:
+        """ Time every engine on a sample of the corpus and keep the result as self.cost_model;
+        an empty corpus gives a zero model that is not kept """
+        sample = []
+        sample_bytes = 0
+        for doc, text in iter_texts(self.texts, range(len(self.texts))):
+            if not text:
+                continue
+            sample.append((doc, text))
+            sample_bytes += len(text)
+            if sample_bytes >= CALIBRATION_SAMPLE_BYTES:
+                break
+        if not sample_bytes:
+            return CostModel(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+        # keywords are slices of the longest sampled text, so they occur at least once like real ones
+        text_doc, text = max(sample, key=lambda item: len(item[1]))
+        sections = self.sections[text_doc]
+        step = max(1, len(text) // CALIBRATION_KEYWORDS)
+
+        def keywords(length: int) -> List[str]:
+            return [text[start:start + length] for start in range(0, len(text) - length + 1, step)][:CALIBRATION_KEYWORDS] or [text]
+
+        def best_of(run) -> float:
+            """ Least seconds of CALIBRATION_REPEATS runs, the others were disturbed """
+            timings = []
+            for _ in range(CALIBRATION_REPEATS):
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        def find_seconds(texts: List[Tuple[int, str]], queries: List[str]) -> Tuple[float, int]:
+            """ Seconds and occurrences of scanning texts for queries """
+            def run():
+                for doc, doc_text in texts:
+                    for query in queries:
+                        exact_match_weighted(doc_text, query, self.sections[doc])
+            occurrences = sum(exact_match_count(doc_text, query) for _, doc_text in texts for query in queries)
+            return best_of(run), occurrences
+
+        # per occurrence: a text full of one keyword against the same text without any
+        dense = [(text_doc, "ab " * (CALIBRATION_AC_BYTES // 3))]
+        dense_seconds, dense_hits = find_seconds(dense, ['ab'])
+        hit = max(0.0, dense_seconds - find_seconds(dense, ['ba'])[0]) / dense_hits
+
+        # per byte: find_byte + find_skip / len(keyword), fitted from a short and a long keyword length
+        def byte_seconds(queries: List[str]) -> float:
+            seconds, occurrences = find_seconds(sample, queries)
+            return max(0.0, seconds - hit * occurrences) / (sample_bytes * len(queries))
+
+        short, long = keywords(CALIBRATION_SHORT_KEYWORD), keywords(CALIBRATION_LONG_KEYWORD)
+        short_seconds, long_seconds = byte_seconds(short), byte_seconds(long)
+        short_length = sum(len(query) for query in short) / len(short)
+        long_length = sum(len(query) for query in long) / len(long)
+        find_skip = 0.0
+        if long_length > short_length:
+            find_skip = max(0.0, (short_seconds - long_seconds) / (1 / short_length - 1 / long_length))
+        find_byte = max(0.0, long_seconds - find_skip / long_length)
+
+        ac_queries = [query for query in short + long if query.isascii() and query.isalnum()] or ['a']
+        ac_build_char = best_of(lambda: AhoCorasick(list(ac_queries))) / sum(len(query) for query in ac_queries)
+        automaton = AhoCorasick(list(ac_queries))
+        ac_text = text[:CALIBRATION_AC_BYTES]
+        ac_occurrences = sum(exact_match_count(ac_text, query) for query in ac_queries)
+        ac_seconds = best_of(lambda: automaton.search_words(ac_text, sections))
+        ac_byte = max(0.0, ac_seconds - hit * ac_occurrences) / len(ac_text)
+
+        # per posting expanded by the index engine, net of its pass over the vocabulary;
+        # the rarest fragments of the text that fit in CALIBRATION_POSTINGS, or the rarest one
+        vocabulary_bytes = len(self.corpus.vocabulary()[0])
+        fragment_postings = {}
+        for word in text.split():
+            fragment = word[:CALIBRATION_SHORT_KEYWORD]
+            if len(fragment) == CALIBRATION_SHORT_KEYWORD and fragment not in fragment_postings:
+                fragment_postings[fragment] = sum(
+                    len(self.corpus.term_positions[term_id]) + len(self.corpus.term_docs[term_id])
+                    for term_id in self.corpus.substring_terms(fragment)
+                )
+        fragments = []
+        postings = 0
+        for fragment in sorted(fragment_postings, key=fragment_postings.get)[:CALIBRATION_KEYWORDS]:
+            if fragments and postings + fragment_postings[fragment] > CALIBRATION_POSTINGS:
+                break
+            fragments.append(fragment)
+            postings += fragment_postings[fragment]
+        index_posting = 0.0
+        if postings:
+            seconds = best_of(lambda: self._index_match(fragments))
+            seconds -= len(fragments) * vocabulary_bytes * (find_byte + find_skip / CALIBRATION_SHORT_KEYWORD)
+            index_posting = max(0.0, seconds) / postings
+
+        self.cost_model = CostModel(find_byte, find_skip, hit, ac_byte, ac_build_char, index_posting)
+        print(f"Calibrated search cost model on {sample_bytes} bytes: {self.cost_model.to_dict()}")
+        return self.cost_model
+
+    def _match_counts(self, method: str, threshold: float, pool: List[int] = None) -> MatchResult:
+        """ Per-document counts of self.queries plus their section-weighted counts, unscored """
+        profile = self.profile
+        pool_docs = range(len(self.sources_id)) if pool is None else pool
+        result = MatchResult([self.sources_id[i] for i in pool_docs], self.queries)
+        counter = [0] * len(self.queries)  # Counter for each query
 
+        # multi-word keywords are phrases: counted from the positional postings, not scanned as substrings
+        phrase_indexes = [j for j, query in enumerate(self.queries) if method == 'word' or is_phrase_query(query)]
+        scan_indexes = [j for j in range(len(self.queries)) if j not in phrase_indexes]
+        scan_queries = [self.queries[j] for j in scan_indexes]
+
+        # trigram prefilter: only documents holding every trigram of a keyword can contain it
+        docs = None
+        if scan_queries and method in SHARDED_METHODS:
+            with profile.stage('scan'):
+                docs = self.trigrams.candidate_docs(scan_queries)
+        if scan_queries and pool is not None:
+            if docs is None:
+                docs = list(pool)
+            else:
+                pool_set = set(pool)
+                docs = [doc for doc in docs if doc in pool_set]
+        scan_bytes = self.corpus_bytes if docs is None else sum(self.text_lengths[doc] for doc in docs)
+
+        # exact matching, sharded over the scan pool when there is enough text to scan
+        sharded = bool(scan_queries) and method in SHARDED_METHODS and self._should_shard(scan_bytes)
+
+        with profile.stage('scan'):
+            phrase_positions = [self.corpus.phrase_positions(self.queries[j]) for j in phrase_indexes]
+
+        # per document: (counts, section-weighted counts) of the scanned keywords
+        doc_matches = None
+        if not scan_queries:
+            doc_matches = [([], []) for _ in range(len(self.sources_id))]
+        elif method == 'index':
+            with profile.stage('scan'):
+                doc_matches, expanded = self._index_match(scan_queries, docs)
+        elif sharded:
+            try:
+                with profile.stage('scan'):
+                    doc_matches = self._scan_sharded(method, scan_queries, docs)
+            except BrokenProcessPool as e:
+                # typically the snapshot was replaced by another process; not retried before the next refresh
+                print(f"Scan pool failed, scanning in this process: {e}")
+                self.close()
+                self.scan_pool_failed = True
+
+        if doc_matches is None:
+            if method == 'AC' and self.automaton_trie is None:
+                with profile.stage('automaton_build'):
+                    self.automaton_trie = AhoCorasick(scan_queries)
+            reloaded = self._reload_seconds()
+            doc_matches = []
+            for i, text in iter_texts(self.texts, docs):
+                matched = self._scan_document(i, text, method, threshold, scan_queries)
+                doc_matches.append((matched['matched_queries'], matched['weighted_queries']))
+            profile.add_time('corpus_reload', self._reload_seconds() - reloaded)
+
+        if docs is not None:
+            # documents skipped by the prefilter match none of the scanned keywords
+            candidate_matches = doc_matches
+            doc_matches = [([], [])] * len(self.sources_id)
+            for doc, matches in zip(docs, candidate_matches):
+                doc_matches[doc] = matches
+
+        for row, i in enumerate(pool_docs):
+            scanned, scanned_weights = doc_matches[i]
+            counts = [0] * len(self.queries)
+            weights = [0.0] * len(self.queries)
+            for j, count, weight in zip(scan_indexes, scanned, scanned_weights):
+                counts[j] = count
+                weights[j] = weight
+            for j, by_doc in zip(phrase_indexes, phrase_positions):
+                starts = by_doc.get(i)
+                if starts:
+                    counts[j] = len(starts)
+                    weights[j] = self.sections[i].weight_of_words(starts)
+            result.set_row(row, counts, weights)
+
+            for j in range(len(self.queries)):
+                counter[j] += counts[j]
+
+        if scan_queries and method == 'index':
+            vocabulary_bytes = len(self.corpus.vocabulary()[0])
+            profile.count('scan', bytes_scanned=vocabulary_bytes * len(scan_queries), documents=expanded)
+        elif scan_queries:
+            profile.count('scan', bytes_scanned=scan_bytes, documents=len(self.texts) if docs is None else len(docs))
+
+        # result position of each pool document, for the fuzzy hits found through the indexes
+        slots = None if pool is None else {doc: k for k, doc in enumerate(pool)}
+
+        # fuzzy matching, looked up in the fuzzy term index instead of every word of every CV:
+        # the term lookups are the dispatch, expanding the similar terms' postings the compute
+        for i in range(len(self.queries)):
+            if counter[i] != 0:
+                continue
+            tokens = self.queries[i].split()
+            with profile.stage('fuzzy_dispatch'):
+                compared = 0
+                token_terms = []
+                for token in tokens if len(tokens) > 1 else [self.queries[i]]:
+                    terms, searched = self.fuzzy_index.lookup(token, threshold)
+                    compared += searched
+                    token_terms.append([self.corpus.term_ids[term] for term in terms if term in self.corpus.term_ids])
+            profile.count('fuzzy_dispatch', candidates_compared=compared)
+
+            with profile.stage('fuzzy_compute'):
+                if len(tokens) > 1:
+                    # fuzzy phrase: every token may be replaced by a similar corpus term
+                    doc_positions = self.corpus.token_phrase_positions(token_terms)
+                else:
+                    doc_positions = self.corpus.term_positions_by_doc(token_terms[0])
+                for j, positions in doc_positions.items():
+                    k = j if slots is None else slots.get(j)
+                    if k is None:
+                        continue
+                    result.set_count(k, i, len(positions), self.sections[j].weight_of_words(positions))
+            profile.count('fuzzy_compute', documents=len(doc_positions))
+
+        return result
+
+    def _index_positions(self, query: str) -> Dict[int, List[int]]:
+        """ Per document: sorted word positions of the occurrences of query, once per occurrence
+
+        Words are the whitespace-separated tokens of the text, so every occurrence of a keyword
+        without whitespace lies inside one word, and a word holding it twice counts twice.
+        """
+        by_occurrences: Dict[int, List[int]] = {}
+        for term_id, occurrences in self.corpus.substring_terms(query).items():
+            by_occurrences.setdefault(occurrences, []).append(term_id)
+        positions: Dict[int, List[int]] = {}
+        for occurrences, term_ids in by_occurrences.items():
+            for doc, term_positions in self.corpus.term_positions_by_doc(term_ids).items():
+                positions.setdefault(doc, []).extend(term_positions * occurrences)
+        for doc_positions in positions.values():
+            doc_positions.sort()
+        return positions
+
+    def _index_match(self, queries: List[str], docs: List[int] = None) -> Tuple[List[Tuple[List[int], List[float]]], int]:
+        """ Per-document (counts, section-weighted counts) of single-word keywords in the order of docs,
+        from the term dictionary instead of the texts; plus the number of documents expanded.
+        Counts and weights equal those of scanning the texts with str.find. """
+        width = len(queries)
+        wanted = None if docs is None else set(docs)
+        by_doc: Dict[int, Tuple[List[int], List[float]]] = {}
+        expanded = 0
+        for k, query in enumerate(queries):
+            for doc, positions in self._index_positions(query).items():
+                expanded += 1
+                if wanted is not None and doc not in wanted:
+                    continue
+                matches = by_doc.get(doc)
+                if matches is None:
+                    matches = by_doc[doc] = ([0] * width, [0.0] * width)
+                matches[0][k] = len(positions)
+                # positions in text order add up the weights exactly as the scan does
+                matches[1][k] = self.sections[doc].weight_of_words(positions)
+        docs = range(len(self.sources_id)) if docs is None else docs
+        return [by_doc.get(doc, ([], [])) for doc in docs], expanded
+
+    def _reload_seconds(self) -> float:
+        return self.texts.reload_seconds if isinstance(self.texts, CorpusStore) else 0.0
+
+    def _scan_document(self, i: int, text: str, method: str, threshold: float, queries: List[str]) -> Dict:
+        sections = self.sections[i]
+        with self.profile.stage('scan'):
             if method == 'exact':
-                result.append({
-                    "id" : id,
-                    "result" : self._exact_match(text, self.queries)
-                    })
+                return self._exact_match(text, queries, sections)
             elif method == 'KMP':
-                result.append({
-                    "id" : id,
-                    "result" : self._exact_match(text, self.queries)
-                    })
+                return self._exact_match(text, queries, sections)
             elif method == 'BM':
-                result.append({
-                    "id" : id,
-                    "result" : self._exact_match(text, self.queries)
-                    })
+                return self._exact_match(text, queries, sections)
             elif method == 'AC':
-                automaton_trie = AhoCorasick(self.queries)
-                result.append({
-                    "id" : id,
-                    "result" : automaton_trie.search_words(text)
-                })
+                return self.automaton_trie.search_words(text, sections)
             elif method == 'fuzzy':
-                result.append({
-                    "id" : id,
-                    "result" : self._fuzzy_match(text, self.queries, threshold)
-                })
+                return self._fuzzy_match(text, queries, threshold)
             else:
                 raise ValueError(f"Unsupported matching method: {method}")
 
-            time_end = time.time()
-            self.exact_match_calculation_time += (time_end - time_start)
+    def _idfs(self, result: MatchResult) -> List[float]:
+        doc_count = len(result)
+        return [bm25_idf(doc_freq, doc_count) for doc_freq in result.doc_freqs()]
+
+    def _score(self, result: MatchResult, idfs: List[float] = None, docs: List[int] = None):
+        """ BM25 score from the section-weighted counts, stored in result.scores; docs are the documents of result """
+        if idfs is None:
+            idfs = self._idfs(result)
+        doc_count = len(result)
+        if docs is None:
+            docs = range(doc_count)
+            words = self.corpus_words
+        else:
+            words = sum(self.corpus.doc_length(doc) for doc in docs)
+        avg_length = words / doc_count if doc_count else 0
+
+        for row, doc in enumerate(docs):
+            if result.totals[row]:
+                result.scores[row] = bm25_score(result.row_weights(row), idfs, self.corpus.doc_length(doc), avg_length)
+
+    def _should_shard(self, scan_bytes: int) -> bool:
+        return not self.scan_pool_failed and (os.cpu_count() or 1) > 1 and scan_bytes >= PARALLEL_SCAN_MIN_BYTES
+
+    def _plan_shards(self, docs: List[int], workers: int) -> List[List[int]]:
+        """ Split docs into consecutive ranges of roughly equal text length """
+        total_bytes = sum(self.text_lengths[doc] for doc in docs)
+        target = max(MIN_SHARD_BYTES, total_bytes // (workers * SHARDS_PER_WORKER) + 1)
+        shards = []
+        current = []
+        current_bytes = 0
+        for doc in docs:
+            size = self.text_lengths[doc]
+            # a CV longer than the target gets a shard of its own
+            if size >= target and current:
+                shards.append(current)
+                current = []
+                current_bytes = 0
+            current.append(doc)
+            current_bytes += size
+            if current_bytes >= target:
+                shards.append(current)
+                current = []
+                current_bytes = 0
+        if current:
+            shards.append(current)
+        return shards
+
+    def _scan_sharded(self, method: str, queries: List[str], docs: List[int] = None) -> List[Tuple[List[int], List[float]]]:
+        """ Per-document (counts, section-weighted counts) computed by the scan pool, in the order of docs """
+        docs = list(range(len(self.texts))) if docs is None else docs
+        workers = os.cpu_count() or 1
+        if self._scan_pool is None:
+            if self.snapshot is not None and isinstance(self.texts, CorpusStore):
+                # workers map the snapshot themselves and share the memory budget
+                initargs = ([], self.sections.copy(), self.snapshot.path, self.snapshot.file_id, self.memory_budget // workers)
+            else:
+                initargs = (list(self.texts), self.sections.copy())
+            self._scan_pool = ProcessPoolExecutor(max_workers=workers, initializer=init_scan_worker, initargs=initargs)
 
-            for j in range(len(self.queries)):
-                counter[j] += result[i]['result']['matched_queries'][j]
-
-        # fuzzy matching
-        futures = []
-        total_fuzzy_time = 0.0
-        time_start = time.time()
-
-        with ProcessPoolExecutor() as executor:
-            for i in range(len(self.queries)):
-                if counter[i] == 0:
-                    for j in range(len(self.sources_id)):
-                        futures.append(executor.submit(
-                            fuzzy_match_worker,
-                            j,
-                            i,
-                            self.texts[j],
-                            self.queries[i],
-                            threshold
-                        ))
-
-            for future in as_completed(futures):
-                j, i, count = future.result()
-                result[j]['result']['matched_queries'][i] = count
-                result[j]['result']['total_matched'] += count
-
-        self.fuzzy_match_calculation_time = time.time() - time_start
+        shards = self._plan_shards(docs, workers)
+        futures = [self._scan_pool.submit(scan_shard_worker, k, shard, method, queries) for k, shard in enumerate(shards)]
 
-        return result, self.exact_match_calculation_time, self.fuzzy_match_calculation_time
+        shard_matches = [None] * len(shards)
+        for future in as_completed(futures):
+            k, matches = future.result()
+            shard_matches[k] = matches
+        return [matches for shard in shard_matches for matches in shard]
 
     def _exact_match_1_query(self, text:str, query: str) -> Dict:  
-        matches = []
-        count = 0
-        start = 0
-        
-        while True:
-            pos = text.find(query, start)
-            if pos == -1:
-                break
-            matches.append(pos)
-            count += 1
-            start = pos + 1
-        
-        return count
+        return exact_match_count(text, query)
     
-    def _exact_match(self, text:str, queries: List[str]) -> Dict:
+    def _exact_match(self, text:str, queries: List[str], sections: SectionMap = None) -> Dict:
         results = []
+        weighted = []
         result_sum = 0
         for query in queries:
-            result = self._exact_match_1_query(text, query)
+            if sections is None:
+                result = self._exact_match_1_query(text, query)
+                weighted.append(result)
+            else:
+                result, weight = exact_match_weighted(text, query, sections)
+                weighted.append(weight)
             results.append(result)
             result_sum += result
 
         return {
             'keywords' : queries,
             'matched_queries': results,
+            'weighted_queries': weighted,
             'total_matched': result_sum
         }
     
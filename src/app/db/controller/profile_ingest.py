@@ -0,0 +1,92 @@
+import os
+import time
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+from db.controller.atsController import ATSController
+from db.controller.infopenting import EXTRACTOR_VERSION, InfoPentingGacorRealNoHoax
+from db.controller.snapshot import source_signature
+
+# CVs are extracted in worker processes, profiles are written by the calling process;
+# override with ATS_PROFILE_WORKERS
+DEFAULT_PROFILE_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+_worker_extractor = None
+
+
+def cv_signature(cv_path: str) -> str:
+    """ Stored with a profile; the profile is stale once the CV file no longer has it """
+    mtime, size = source_signature(cv_path)
+    return f"{mtime}:{size}"
+
+
+def extract_profile_worker(cv_path: str) -> Dict:
+    global _worker_extractor
+    if _worker_extractor is None:
+        _worker_extractor = InfoPentingGacorRealNoHoax()
+    # the extractor prints its intermediate text, which is noise in a batch
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return _worker_extractor.extract_profile(cv_path)
+
+
+class ProfileIngestor:
+    """ Extracts the structured profile (skills, summary, jobs, education) of every CV once
+
+    A stored profile is current while its extractor version equals EXTRACTOR_VERSION and its
+    signature equals the one of the CV file; only the other applications are extracted.
+    """
+
+    def __init__(self, controller: ATSController, workers: int = None):
+        self.controller = controller
+        self.workers = workers or int(os.getenv('ATS_PROFILE_WORKERS', DEFAULT_PROFILE_WORKERS))
+
+    def pending(self, applications: List[Dict], force: bool = False) -> List[Tuple[int, str, str]]:
+        """ (detail_id, cv_path, signature) of the applications whose profile is missing or stale """
+        states = {}
+        if not force:
+            result = self.controller.get_cv_extraction_states()
+            if not result['success']:
+                raise RuntimeError(result['message'])
+            states = result['data']['states']
+
+        pending = []
+        for application in applications:
+            cv_path = application.get('cv_path')
+            if not cv_path:
+                continue
+            signature = cv_signature(cv_path)
+            if force or states.get(application['detail_id']) != (EXTRACTOR_VERSION, signature):
+                pending.append((application['detail_id'], cv_path, signature))
+        return pending
+
+    def run(self, applications: List[Dict], force: bool = False) -> Dict:
+        start = time.perf_counter()
+        pending = self.pending(applications, force)
+        stats = {'applications': len(applications), 'pending': len(pending), 'extracted': 0, 'failed': 0}
+        if not pending:
+            stats['seconds'] = time.perf_counter() - start
+            return stats
+
+        workers = min(self.workers, len(pending))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(extract_profile_worker, cv_path): (detail_id, cv_path, signature)
+                for detail_id, cv_path, signature in pending
+            }
+            for future in as_completed(futures):
+                detail_id, cv_path, signature = futures[future]
+                try:
+                    profile = future.result()
+                except Exception as e:
+                    print(f"[Error] Failed to extract profile from {cv_path}: {e}")
+                    stats['failed'] += 1
+                    continue
+                result = self.controller.save_cv_profile(detail_id, EXTRACTOR_VERSION, signature, profile)
+                if result['success']:
+                    stats['extracted'] += 1
+                else:
+                    print(f"[Error] Failed to store profile of application {detail_id}: {result['message']}")
+                    stats['failed'] += 1
+
+        stats['seconds'] = time.perf_counter() - start
+        return stats
@@ -0,0 +1,163 @@
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Stages of one search, in pipeline order
+STAGES = (
+    'planning',
+    'automaton_build',
+    'corpus_reload',
+    'scan',
+    'fuzzy_dispatch',
+    'fuzzy_compute',
+    'ranking',
+    'db_hydration',
+    'ui_render',
+)
+
+EXACT_STAGES = ('planning', 'automaton_build', 'corpus_reload', 'scan')
+FUZZY_STAGES = ('fuzzy_dispatch', 'fuzzy_compute')
+
+
+class StageStats:
+    __slots__ = ('name', 'seconds', 'bytes_scanned', 'documents', 'candidates_compared')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+        self.bytes_scanned = 0
+        self.documents = 0
+        self.candidates_compared = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'stage': self.name,
+            'seconds': self.seconds,
+            'bytes_scanned': self.bytes_scanned,
+            'documents': self.documents,
+            'candidates_compared': self.candidates_compared,
+        }
+
+
+class SearchProfile:
+    """ Per-stage timings and counters of a single search """
+
+    def __init__(self, method: str = "", keywords: Optional[List[str]] = None):
+        self.method = method
+        self.keywords = list(keywords or [])
+        self.started_at = time.time()
+        self.stages: Dict[str, StageStats] = {name: StageStats(name) for name in STAGES}
+        # engine chosen by the 'auto' method and its estimated cost (QueryPlan.to_dict())
+        self.plan: Optional[Dict] = None
+
+    def _get(self, name: str) -> StageStats:
+        if name not in self.stages:
+            self.stages[name] = StageStats(name)
+        return self.stages[name]
+
+    @contextmanager
+    def stage(self, name: str):
+        """ Time a block of code; time accumulates if the stage is entered again """
+        stats = self._get(name)
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds += time.perf_counter() - start
+
+    def add_time(self, name: str, seconds: float):
+        self._get(name).seconds += seconds
+
+    def count(self, name: str, bytes_scanned: int = 0, documents: int = 0, candidates_compared: int = 0):
+        stats = self._get(name)
+        stats.bytes_scanned += bytes_scanned
+        stats.documents += documents
+        stats.candidates_compared += candidates_compared
+
+    @property
+    def exact_time(self) -> float:
+        return sum(self.stages[name].seconds for name in EXACT_STAGES)
+
+    @property
+    def fuzzy_time(self) -> float:
+        return sum(self.stages[name].seconds for name in FUZZY_STAGES)
+
+    @property
+    def total_time(self) -> float:
+        return sum(stats.seconds for stats in self.stages.values())
+
+    def breakdown(self) -> List[StageStats]:
+        return list(self.stages.values())
+
+    def to_dict(self) -> Dict:
+        data = {
+            'timestamp': self.started_at,
+            'method': self.method,
+            'keywords': self.keywords,
+            'total_seconds': self.total_time,
+            'stages': [stats.to_dict() for stats in self.stages.values()],
+        }
+        if self.plan is not None:
+            data['plan'] = self.plan
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SearchProfile":
+        """ Inverse of to_dict, e.g. for a profile received from the search service """
+        profile = cls(data.get('method', ""), data.get('keywords'))
+        profile.started_at = data.get('timestamp', profile.started_at)
+        profile.plan = data.get('plan')
+        for record in data.get('stages', []):
+            stats = profile._get(record['stage'])
+            stats.seconds = record.get('seconds', 0.0)
+            stats.bytes_scanned = record.get('bytes_scanned', 0)
+            stats.documents = record.get('documents', 0)
+            stats.candidates_compared = record.get('candidates_compared', 0)
+        return profile
+
+    def to_json_lines(self) -> str:
+        """ One JSON object per stage, each tagged with the search it belongs to """
+        lines = []
+        for stats in self.stages.values():
+            record = stats.to_dict()
+            record['timestamp'] = self.started_at
+            record['method'] = self.method
+            if self.plan is not None:
+                record['plan'] = self.plan['method']
+            lines.append(json.dumps(record))
+        return "\n".join(lines) + "\n"
+
+    def to_prometheus(self) -> str:
+        """ Prometheus text exposition format, one gauge family per counter """
+        families = (
+            ('ats_search_stage_seconds', 'seconds', 'Wall-clock seconds spent in the stage'),
+            ('ats_search_stage_bytes_scanned', 'bytes_scanned', 'Bytes of CV text scanned in the stage'),
+            ('ats_search_stage_documents', 'documents', 'Documents processed in the stage'),
+            ('ats_search_stage_candidates_compared', 'candidates_compared', 'Candidate words compared in the stage'),
+        )
+        method = self.method.replace('\\', '\\\\').replace('"', '\\"')
+        lines = []
+        for metric, attribute, description in families:
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} gauge")
+            for stats in self.stages.values():
+                lines.append(f'{metric}{{stage="{stats.name}",method="{method}"}} {getattr(stats, attribute)}')
+        if self.plan is not None:
+            lines.append("# HELP ats_search_plan_estimated_seconds Estimated seconds of each engine considered by the 'auto' method")
+            lines.append("# TYPE ats_search_plan_estimated_seconds gauge")
+            for engine, seconds in self.plan['estimates'].items():
+                chosen = int(engine == self.plan['method'])
+                lines.append(f'ats_search_plan_estimated_seconds{{engine="{engine}",chosen="{chosen}",method="{method}"}} {seconds}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str, fmt: str = 'jsonl'):
+        """ Append (jsonl) or overwrite (prometheus) the profile at path """
+        if fmt == 'jsonl':
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(self.to_json_lines())
+        elif fmt == 'prometheus':
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+        else:
+            raise ValueError(f"Unsupported profile export format: {fmt}")
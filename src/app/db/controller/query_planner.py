@@ -0,0 +1,74 @@
+from typing import Dict, List, Sequence
+
+# engines the 'auto' method chooses from: the term dictionary, one automaton pass, str.find per keyword
+PLAN_METHODS = ('index', 'AC', 'exact')
+
+
+class CostModel:
+    """ Seconds per unit of work of each exact-match engine, measured by Matcher.calibrate()
+
+    exact: str.find per keyword and byte (it skips ahead further the longer the keyword),
+        plus counting and section-weighting per occurrence
+    AC: automaton build per keyword character, one pass per byte for all keywords, per occurrence as exact
+    index: str.find over the vocabulary per keyword, then per posting (word position or document) expanded
+    """
+    __slots__ = ('find_byte', 'find_skip', 'hit', 'ac_byte', 'ac_build_char', 'index_posting')
+
+    def __init__(self, find_byte: float, find_skip: float, hit: float, ac_byte: float, ac_build_char: float,
+                 index_posting: float):
+        self.find_byte = find_byte
+        self.find_skip = find_skip
+        self.hit = hit
+        self.ac_byte = ac_byte
+        self.ac_build_char = ac_build_char
+        self.index_posting = index_posting
+
+    def exact_cost(self, keywords: List[str], scan_bytes: int, occurrences: int = 0) -> float:
+        scan = sum(scan_bytes * (self.find_byte + self.find_skip / max(1, len(keyword))) for keyword in keywords)
+        return scan + self.hit * occurrences
+
+    def ac_cost(self, keywords: List[str], scan_bytes: int, occurrences: int = 0) -> float:
+        build = self.ac_build_char * sum(len(keyword) for keyword in keywords)
+        return build + self.ac_byte * scan_bytes + self.hit * occurrences
+
+    def index_cost(self, keywords: List[str], vocabulary_bytes: int, postings: int) -> float:
+        return self.exact_cost(keywords, vocabulary_bytes) + self.index_posting * postings
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class QueryPlan:
+    """ Engine chosen for one search, with the estimated seconds of every engine considered """
+    __slots__ = ('method', 'estimated_seconds', 'estimates')
+
+    def __init__(self, method: str, estimated_seconds: float, estimates: Dict[str, float]):
+        self.method = method
+        self.estimated_seconds = estimated_seconds
+        self.estimates = estimates
+
+    def to_dict(self) -> Dict:
+        return {
+            'method': self.method,
+            'estimated_seconds': self.estimated_seconds,
+            'estimates': dict(self.estimates),
+        }
+
+
+def choose_plan(model: CostModel, keywords: List[str], scan_bytes: int, occurrences: int,
+                vocabulary_bytes: int, postings: int, parallelism: int = 1,
+                methods: Sequence[str] = PLAN_METHODS) -> QueryPlan:
+    """ Cheapest of methods for finding the occurrences of keywords in scan_bytes of text, or in
+    the vocabulary and then postings of the matching terms. Scans are divided over parallelism
+    workers; ties go to the earlier engine of PLAN_METHODS """
+    if not keywords:
+        return QueryPlan('index', 0.0, {'index': 0.0})
+
+    estimates = {}
+    if 'index' in methods:
+        estimates['index'] = model.index_cost(keywords, vocabulary_bytes, postings)
+    if 'AC' in methods:
+        estimates['AC'] = model.ac_cost(keywords, scan_bytes, occurrences) / parallelism
+    estimates['exact'] = model.exact_cost(keywords, scan_bytes, occurrences) / parallelism
+    method = min(estimates, key=lambda name: (estimates[name], PLAN_METHODS.index(name)))
+    return QueryPlan(method, estimates[method], estimates)
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date
+from typing import Dict, List
+from db.controller.profiler import SearchProfile
+
+
+class RemoteDataService:
+    """ Thin client with the DataService interface used by CVApp, backed by the search service (server.py) """
+
+    def __init__(self, base_url: str, timeout: float = 300):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.last_profile = SearchProfile()
+        # the ranking stays on the service; pages of it are fetched by search id
+        self.last_search_id = None
+        self.last_ranked_count = 0
+
+    def _request(self, path: str, payload: Dict = None) -> Dict:
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=data,
+            headers={'Content-Type': 'application/json'} if data is not None else {}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get('error', e.reason)
+            except ValueError:
+                message = e.reason
+            raise RuntimeError(f"Search service error {e.code}: {message}") from e
+
+    def get_total_cvs(self):
+        try:
+            return self._request('/stats')['total_cvs']
+        except (OSError, RuntimeError) as e:
+            print(f"Failed to get total CVs from the search service: {e}")
+            return 0
+
+    async def get_total_cvs_async(self):
+        return await asyncio.to_thread(self.get_total_cvs)
+
+    def get_roles(self) -> List[str]:
+        try:
+            return self._request('/roles')['roles']
+        except (OSError, RuntimeError) as e:
+            print(f"Failed to get roles from the search service: {e}")
+            return []
+
+    def _candidates(self, candidates: List[Dict]) -> List[Dict]:
+        for candidate in candidates:
+            # dates travel as ISO strings
+            if isinstance(candidate.get('birthdate'), str):
+                candidate['birthdate'] = date.fromisoformat(candidate['birthdate'])
+        return candidates
+
+    def search_candidates(self, keywords: list, top_n: int, algorithm: str, limit: int = None, filters: Dict = None):
+        """Ranked candidates; with limit only the first limit are hydrated and sent, the rest are
+        fetched with get_candidates_page"""
+        response = self._request('/search', {
+            'keywords': keywords, 'top_n': top_n, 'algorithm': algorithm, 'filters': filters, 'limit': limit
+        })
+        self.last_profile = SearchProfile.from_dict(response['profile'])
+        self.last_search_id = response['search_id']
+        self.last_ranked_count = response['total']
+        return self._candidates(response['candidates']), response['exact_time'], response['fuzzy_time']
+
+    def get_ranked_count(self) -> int:
+        return self.last_ranked_count
+
+    def get_candidates_page(self, offset: int, limit: int) -> List[Dict]:
+        """Hydrate the next slice of the last search's ranking, on the service"""
+        if self.last_search_id is None:
+            return []
+        query = urllib.parse.urlencode({'search_id': self.last_search_id, 'offset': offset, 'limit': limit})
+        try:
+            return self._candidates(self._request(f'/page?{query}'))
+        except (OSError, RuntimeError) as e:
+            print(f"Failed to get candidates {offset}-{offset + limit} from the search service: {e}")
+            return []
+
+    def record_render(self, seconds: float, documents: int):
+        """Attach the UI render time to the last search and export it if configured"""
+        self.last_profile.add_time('ui_render', seconds)
+        self.last_profile.count('ui_render', documents=documents)
+        self.export_profile()
+
+    def export_profile(self):
+        path = os.getenv('ATS_PROFILE_EXPORT')
+        if not path:
+            return
+        try:
+            self.last_profile.export(path, os.getenv('ATS_PROFILE_FORMAT', 'jsonl'))
+        except (OSError, ValueError) as e:
+            print(f"Failed to export search profile: {e}")
+
+    def get_candidate_details(self, application_id) -> Dict:
+        return self._request(f'/applications/{int(application_id)}/details')
+
+    async def get_candidate_details_async(self, application_id) -> Dict:
+        return await asyncio.to_thread(self.get_candidate_details, application_id)
+
+    def get_skills_by_application_id(self, application_id) -> List:
+        return self.get_candidate_details(application_id)['skills']
+
+    def get_summary_by_application_id(self, application_id) -> List:
+        return self.get_candidate_details(application_id)['summaries']
+
+    def get_job_history_by_application_id(self, application_id) -> List:
+        return self.get_candidate_details(application_id)['jobs']
+
+    def get_education_by_application_id(self, application_id) -> List:
+        return self.get_candidate_details(application_id)['educations']
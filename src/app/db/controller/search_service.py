@@ -0,0 +1,127 @@
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional
+from db.controller.data_service import DataService
+
+# rankings of the latest searches kept for paging, the least recently used dropped first
+RANKING_CACHE_SIZE = 256
+
+
+class ServiceBusy(Exception):
+    """ Raised when the request queue of the search service is full """
+
+
+class SearchService:
+    """ One warm DataService shared by many clients
+
+    Requests run on a bounded worker pool; at most max_workers + queue_size requests are
+    accepted at a time and the rest are rejected with ServiceBusy. Identical requests that
+    arrive while one is in flight share its result instead of running again (single-flight).
+    Searches are serialized because the Matcher keeps per-search state; profile extraction
+    runs in parallel. Each search keeps its ranking under a search id, so that clients fetch
+    further pages of it without the next search of another client replacing it.
+    """
+
+    def __init__(self, data_service: DataService, max_workers: int = 4, queue_size: int = 64):
+        self.data_service = data_service
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='search-service')
+        self.slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self.search_lock = threading.Lock()
+        self.inflight: Dict[Hashable, Future] = {}
+        self.inflight_lock = threading.Lock()
+        self.coalesced = 0
+        self.rankings: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self.rankings_lock = threading.Lock()
+
+    def _submit(self, key: Hashable, func: Callable, *args) -> Future:
+        with self.inflight_lock:
+            future = self.inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            if not self.slots.acquire(blocking=False):
+                raise ServiceBusy("Search service queue is full")
+            future = self.executor.submit(func, *args)
+            self.inflight[key] = future
+
+        def done(_):
+            with self.inflight_lock:
+                self.inflight.pop(key, None)
+            self.slots.release()
+        future.add_done_callback(done)
+        return future
+
+    def _search(self, keywords: List[str], top_n: int, algorithm: str, filters: Dict = None, limit: int = None) -> Dict:
+        with self.search_lock:
+            candidates, exact_time, fuzzy_time = self.data_service.search_candidates(
+                keywords=keywords,
+                top_n=top_n,
+                algorithm=algorithm,
+                limit=limit,
+                filters=filters
+            )
+            ranked = self.data_service.last_ranked
+            profile = self.data_service.last_profile.to_dict()
+
+        search_id = uuid.uuid4().hex
+        with self.rankings_lock:
+            self.rankings[search_id] = ranked
+            while len(self.rankings) > RANKING_CACHE_SIZE:
+                self.rankings.popitem(last=False)
+        return {
+            'search_id': search_id,
+            'total': len(ranked),
+            'candidates': candidates,
+            'exact_time': exact_time,
+            'fuzzy_time': fuzzy_time,
+            'profile': profile,
+        }
+
+    def _details(self, application_id: int) -> Dict:
+        return self.data_service.get_candidate_details(application_id)
+
+    def search(self, keywords: List[str], top_n: int, algorithm: str, filters: Dict = None, limit: int = None) -> Future:
+        """ Ranked candidates; with limit only the first limit are hydrated, the rest are fetched with page() """
+        filter_key = tuple(sorted(
+            (attribute, tuple(value) if isinstance(value, list) else value) for attribute, value in (filters or {}).items()
+        ))
+        key = ('search', tuple(keywords), top_n, algorithm, filter_key, limit)
+        return self._submit(key, self._search, list(keywords), top_n, algorithm, filters, limit)
+
+    def ranking(self, search_id: str) -> Optional[List[Dict]]:
+        """ Ranking of a recent search, None once it was dropped from the cache """
+        with self.rankings_lock:
+            ranked = self.rankings.get(search_id)
+            if ranked is not None:
+                self.rankings.move_to_end(search_id)
+            return ranked
+
+    def page(self, ranked: List[Dict], search_id: str, offset: int, limit: int) -> Future:
+        """ Hydrated candidates offset .. offset + limit of a ranking returned by ranking() """
+        return self._submit(('page', search_id, offset, limit), self.data_service.get_candidates_page, offset, limit, ranked)
+
+    def roles(self) -> List[str]:
+        return self.data_service.get_roles()
+
+    def candidate_details(self, application_id: int) -> Future:
+        return self._submit(('details', application_id), self._details, application_id)
+
+    def total_cvs(self) -> Future:
+        return self._submit(('total_cvs',), self.data_service.get_total_cvs)
+
+    def stats(self) -> Dict:
+        with self.inflight_lock:
+            inflight = len(self.inflight)
+        return {
+            'inflight': inflight,
+            'coalesced': self.coalesced,
+            'rankings': len(self.rankings),
+            'documents': len(self.data_service.matcher.texts),
+            'corpus': self.data_service.matcher.corpus_stats(),
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.data_service.matcher.close()
@@ -0,0 +1,125 @@
+import bisect
+import math
+import re
+from array import array
+from typing import Dict, Iterable, List, Sequence, Tuple
+from db.controller.infopenting import SECTION_HEADERS
+
+# Section kinds; 0 is everything before the first recognised header (contact details, boilerplate)
+SECTION_KINDS = ('other', 'summary', 'experience', 'education', 'skills')
+
+# How much one keyword hit counts in each section
+SECTION_WEIGHTS = {
+    'other': 1.0,
+    'summary': 1.5,
+    'experience': 2.0,
+    'education': 1.2,
+    'skills': 2.5,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_KIND_WEIGHTS = tuple(SECTION_WEIGHTS[kind] for kind in SECTION_KINDS)
+_HEADER_KINDS = {
+    header: SECTION_KINDS.index(kind)
+    for kind, headers in SECTION_HEADERS.items()
+    for header in headers
+}
+# a header is a line of its own in the normalized (lowercase, punctuation-free) text
+_HEADER_RE = re.compile(
+    r'^[ \t]*(' + '|'.join(re.escape(header) for header in sorted(_HEADER_KINDS, key=len, reverse=True)) + r')[ \t]*$',
+    re.MULTILINE
+)
+
+
+class SectionMap:
+    """ Section boundaries of one CV, as character offsets and as word offsets """
+    __slots__ = ('char_starts', 'word_starts', 'weights')
+
+    def __init__(self, char_starts: Sequence[int], word_starts: Sequence[int], kinds: Sequence[int]):
+        self.char_starts = char_starts
+        self.word_starts = word_starts
+        self.weights = [_KIND_WEIGHTS[kind] for kind in kinds]
+
+    def weight_at_char(self, pos: int) -> float:
+        return self.weights[bisect.bisect_right(self.char_starts, pos) - 1]
+
+    def weight_at_word(self, pos: int) -> float:
+        return self.weights[bisect.bisect_right(self.word_starts, pos) - 1]
+
+    def weight_of_words(self, positions: Iterable[int]) -> float:
+        word_starts = self.word_starts
+        weights = self.weights
+        return sum(weights[bisect.bisect_right(word_starts, pos) - 1] for pos in positions)
+
+
+def find_sections(text: str) -> Tuple[array, array, array]:
+    """ (char starts, word starts, kinds) of the sections of a normalized CV text """
+    char_starts = array('I', [0])
+    word_starts = array('I', [0])
+    kinds = array('I', [0])
+    previous = 0
+    words = 0
+    for match in _HEADER_RE.finditer(text):
+        start = match.start(1)
+        words += len(text[previous:start].split())
+        previous = start
+        kind = _HEADER_KINDS[match.group(1)]
+        if start == char_starts[-1]:
+            kinds[-1] = kind
+            continue
+        char_starts.append(start)
+        word_starts.append(words)
+        kinds.append(kind)
+    return char_starts, word_starts, kinds
+
+
+class SectionTable(Sequence):
+    """ Section maps of all CVs of a corpus, stored as three lists of arrays """
+
+    def __init__(self, char_starts: Sequence = None, word_starts: Sequence = None, kinds: Sequence = None):
+        self.char_starts = [] if char_starts is None else char_starts
+        self.word_starts = [] if word_starts is None else word_starts
+        self.kinds = [] if kinds is None else kinds
+
+    @classmethod
+    def build(cls, texts: Iterable[str]) -> "SectionTable":
+        table = cls()
+        for text in texts:
+            char_starts, word_starts, kinds = find_sections(text or "")
+            table.char_starts.append(char_starts)
+            table.word_starts.append(word_starts)
+            table.kinds.append(kinds)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, doc: int) -> SectionMap:
+        return SectionMap(self.char_starts[doc], self.word_starts[doc], self.kinds[doc])
+
+    def copy(self) -> "SectionTable":
+        """ Plain in-memory arrays, e.g. to send a memory-mapped table to worker processes """
+        return SectionTable(
+            [array('I', values) for values in self.char_starts],
+            [array('I', values) for values in self.word_starts],
+            [array('I', values) for values in self.kinds],
+        )
+
+
+def bm25_idf(doc_freq: int, doc_count: int) -> float:
+    return math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+
+def bm25_score(weighted_tfs: Sequence[float], idfs: Sequence[float], doc_length: int, avg_length: float) -> float:
+    """ BM25 with section-weighted term frequencies """
+    if avg_length > 0:
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_length / avg_length)
+    else:
+        norm = BM25_K1
+    score = 0.0
+    for tf, idf in zip(weighted_tfs, idfs):
+        if tf:
+            score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+    return score
@@ -0,0 +1,25 @@
+def levenshtein_distance(s1: str, s2: str) -> int:
+    if len(s1) < len(s2):
+        return levenshtein_distance(s2, s1)
+
+    if len(s2) == 0:
+        return len(s1)
+
+    dp = list(range(len(s2) + 1))
+    for i in range(1, len(s1) + 1):
+        new_dp = [i] * (len(s2) + 1)
+        for j in range(1, len(s2) + 1):
+            cost = 0 if s1[i - 1] == s2[j - 1] else 1
+            new_dp[j] = min(dp[j] + 1, new_dp[j - 1] + 1, dp[j - 1] + cost)
+        dp = new_dp
+    return dp[len(s2)]
+
+
+def calculate_similarity(str1: str, str2: str) -> float:
+    if len(str1) == 0 or len(str2) == 0:
+        return 0.0
+    longer = str1 if len(str1) > len(str2) else str2
+    shorter = str2 if len(str1) > len(str2) else str1
+    if len(longer) == 0:
+        return 1.0
+    return (len(longer) - levenshtein_distance(longer, shorter)) / len(longer)
@@ -0,0 +1,307 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+from db.controller.corpus_index import CorpusIndex
+from db.controller.section_scoring import SectionTable
+from db.controller.trigram_index import TrigramIndex
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# File layout:
+#   header   magic, format version, manifest offset and length
+#   blocks   zlib/zstd compressed (texts, terms) or raw 8-byte aligned arrays (word ids, postings, positions, sections)
+#   manifest compressed JSON: sources with their mtime/size, block table, corpus totals
+SNAPSHOT_MAGIC = b'ATSSNAP\0'
+SNAPSHOT_VERSION = 5
+HEADER = struct.Struct('<8sIIQQ')
+ALIGNMENT = 8
+TEXT_CHUNK_BYTES = 1 << 20
+
+SourceSignature = Tuple[int, int]
+
+
+def source_signature(path: str) -> SourceSignature:
+    """ (mtime in ns, size) of a CV file, (0, -1) when it is missing """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (0, -1)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _compress(data: bytes) -> Tuple[str, bytes]:
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=3).compress(data)
+    return 'zlib', zlib.compress(data, 6)
+
+
+def _decompress(codec: str, data) -> bytes:
+    if codec == 'zlib':
+        return zlib.decompress(data)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError("Snapshot is zstd compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(bytes(data))
+    raise ValueError(f"Unknown snapshot codec: {codec}")
+
+
+class PackedArrays(Sequence):
+    """ Read-only list of uint32 arrays stored back to back, sliced without copying """
+
+    def __init__(self, values: memoryview, offsets: memoryview):
+        self.values = values
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+
+class SnapshotTexts(Sequence):
+    """ CV texts kept as compressed chunks; every access decompresses, caching is up to CorpusStore """
+
+    def __init__(self, buffer, chunks: List[Dict]):
+        self.buffer = buffer
+        self.chunks = chunks
+        self.chunk_starts = [chunk['first'] for chunk in chunks]
+        self.count = chunks[-1]['first'] + chunks[-1]['count'] if chunks else 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self.chunks)
+
+    def chunk_of(self, i: int) -> int:
+        return bisect.bisect_right(self.chunk_starts, i) - 1
+
+    def chunk_first(self, k: int) -> int:
+        return self.chunks[k]['first']
+
+    def decode_chunk(self, k: int) -> Tuple[List[str], int]:
+        """ Texts of chunk k and their size in bytes """
+        chunk = self.chunks[k]
+        raw = _decompress(chunk['codec'], self.buffer[chunk['offset']:chunk['offset'] + chunk['length']])
+        return (raw.decode('utf-8').split('\0') if chunk['count'] else []), len(raw)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < self.count:
+            raise IndexError("text index out of range")
+        k = self.chunk_of(i)
+        return self.decode_chunk(k)[0][i - self.chunks[k]['first']]
+
+    def __iter__(self):
+        for k in range(len(self.chunks)):
+            yield from self.decode_chunk(k)[0]
+
+
+class _SnapshotWriter:
+    def __init__(self, f):
+        self.f = f
+        self.blocks: Dict[str, Dict] = {}
+
+    def _pad(self):
+        padding = -self.f.tell() % ALIGNMENT
+        if padding:
+            self.f.write(b'\0' * padding)
+
+    def raw(self, name: str, typecode: str, data):
+        self._pad()
+        offset = self.f.tell()
+        self.f.write(data)
+        self.blocks[name] = {'offset': offset, 'length': self.f.tell() - offset, 'typecode': typecode}
+
+    def compressed(self, data: bytes) -> Dict:
+        codec, payload = _compress(data)
+        offset = self.f.tell()
+        self.f.write(payload)
+        return {'offset': offset, 'length': len(payload), 'codec': codec}
+
+    def packed(self, name: str, arrays: Sequence):
+        offsets = array('Q', [0])
+        total = 0
+        for values in arrays:
+            total += len(values)
+            offsets.append(total)
+        self.raw(name + '_values', 'I', b''.join(arrays))
+        self.raw(name + '_offsets', 'Q', offsets.tobytes())
+
+
+def write_snapshot(path: str, sources: List[Tuple[int, str, SourceSignature]], texts: Sequence[str], corpus: CorpusIndex,
+                   sections: SectionTable, trigrams: TrigramIndex):
+    """ Write the complete search state of a Matcher; the file is replaced atomically """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, 0, 0))
+        writer = _SnapshotWriter(f)
+
+        # texts: independently compressed chunks so loading never decompresses them up front
+        text_chunks = []
+        first = 0
+        while first < len(texts):
+            size = 0
+            last = first
+            while last < len(texts) and (last == first or size < TEXT_CHUNK_BYTES):
+                size += len(texts[last])
+                last += 1
+            chunk = writer.compressed('\0'.join(texts[first:last]).encode('utf-8'))
+            chunk.update(first=first, count=last - first)
+            text_chunks.append(chunk)
+            first = last
+
+        writer.raw('text_lengths', 'I', array('I', [len(text) for text in texts]).tobytes())
+        terms_block = writer.compressed('\n'.join(corpus.terms).encode('utf-8'))
+        writer.packed('docs', corpus.docs)
+        writer.packed('doc_term_ids', corpus.doc_term_ids)
+        writer.packed('doc_term_freqs', corpus.doc_term_freqs)
+        writer.packed('term_docs', corpus.term_docs)
+        writer.packed('term_freqs', corpus.term_freqs)
+        writer.packed('term_positions', corpus.term_positions)
+        writer.packed('section_char_starts', sections.char_starts)
+        writer.packed('section_word_starts', sections.word_starts)
+        writer.packed('section_kinds', sections.kinds)
+        trigrams_block = writer.compressed('\n'.join(trigrams.grams).encode('utf-8'))
+        writer.packed('trigram_docs', trigrams.gram_docs)
+
+        manifest = {
+            'sources': [[source_id, cv_path, list(signature)] for source_id, cv_path, signature in sources],
+            'text_chunks': text_chunks,
+            'terms': terms_block,
+            'term_count': len(corpus.terms),
+            'trigrams': trigrams_block,
+            'trigram_count': len(trigrams.grams),
+            'corpus_bytes': sum(len(text) for text in texts),
+            'blocks': writer.blocks,
+        }
+        manifest_block = writer.compressed(json.dumps(manifest).encode('utf-8'))
+
+        f.seek(0)
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 1 if manifest_block['codec'] == 'zstd' else 0,
+                            manifest_block['offset'], manifest_block['length']))
+    os.replace(tmp_path, path)
+
+
+class SearchSnapshot:
+    """ Memory-mapped view of a snapshot file written by write_snapshot """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            # identifies this very file, even after path is replaced by a newer snapshot
+            self.file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, manifest_codec, manifest_offset, manifest_length = HEADER.unpack_from(self.mm, 0)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"Not a search snapshot: {path}")
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot version {version}")
+            codec = 'zstd' if manifest_codec == 1 else 'zlib'
+            raw = _decompress(codec, self.mm[manifest_offset:manifest_offset + manifest_length])
+            self.manifest = json.loads(raw)
+        except Exception:
+            self.mm.close()
+            raise
+        self.view = memoryview(self.mm)
+        self.sources = [(source_id, cv_path, tuple(signature)) for source_id, cv_path, signature in self.manifest['sources']]
+
+    def close(self):
+        try:
+            self.view.release()
+            self.mm.close()
+        except BufferError:
+            # arrays of this snapshot are still referenced; the mapping goes away with them
+            pass
+
+    def is_current(self, sources: List[Tuple[int, str]], signatures: Dict[str, SourceSignature]) -> bool:
+        """ Same applications in the same order, and no CV file changed since the snapshot """
+        if len(sources) != len(self.sources):
+            return False
+        for (source_id, cv_path), (snap_id, snap_path, snap_signature) in zip(sources, self.sources):
+            if source_id != snap_id or cv_path != snap_path or signatures.get(cv_path) != snap_signature:
+                return False
+        return True
+
+    def reusable_texts(self, signatures: Dict[str, SourceSignature]) -> Dict[str, str]:
+        """ Texts of CV files that did not change since the snapshot was written """
+        reusable = {}
+        for (_, cv_path, signature), text in zip(self.sources, self.texts()):
+            if signatures.get(cv_path) == signature and signature[1] >= 0:
+                reusable[cv_path] = text
+        return reusable
+
+    def texts(self) -> SnapshotTexts:
+        return SnapshotTexts(self.view, self.manifest['text_chunks'])
+
+    @property
+    def corpus_bytes(self) -> int:
+        return self.manifest['corpus_bytes']
+
+    def text_lengths(self) -> memoryview:
+        """ Length of every text, without decompressing any """
+        return self._raw('text_lengths')
+
+    def _raw(self, name: str) -> memoryview:
+        block = self.manifest['blocks'][name]
+        return self.view[block['offset']:block['offset'] + block['length']].cast(block['typecode'])
+
+    def _packed(self, name: str) -> PackedArrays:
+        return PackedArrays(self._raw(name + '_values'), self._raw(name + '_offsets'))
+
+    def _strings(self, name: str, count: str) -> List[str]:
+        block = self.manifest[name]
+        raw = _decompress(block['codec'], self.view[block['offset']:block['offset'] + block['length']])
+        return raw.decode('utf-8').split('\n') if self.manifest[count] else []
+
+    def corpus(self) -> CorpusIndex:
+        terms = self._strings('terms', 'term_count')
+        return CorpusIndex.from_arrays(
+            terms,
+            self._packed('docs'),
+            self._packed('doc_term_ids'),
+            self._packed('doc_term_freqs'),
+            self._packed('term_docs'),
+            self._packed('term_freqs'),
+            self._packed('term_positions'),
+        )
+
+    def trigrams(self) -> TrigramIndex:
+        return TrigramIndex.from_arrays(self._strings('trigrams', 'trigram_count'), self._packed('trigram_docs'))
+
+    def sections(self) -> SectionTable:
+        return SectionTable(
+            self._packed('section_char_starts'),
+            self._packed('section_word_starts'),
+            self._packed('section_kinds'),
+        )
+
+
+def open_snapshot(path: str) -> Optional[SearchSnapshot]:
+    if not os.path.exists(path):
+        return None
+    try:
+        return SearchSnapshot(path)
+    except (OSError, ValueError, KeyError, struct.error, zlib.error) as e:
+        print(f"Ignoring unreadable snapshot {path}: {e}")
+        return None
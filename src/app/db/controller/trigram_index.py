@@ -0,0 +1,83 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence
+from db.controller.corpus_index import CorpusIndex
+
+TRIGRAM = 3
+
+
+def word_trigrams(word: str) -> set:
+    return {word[i:i + TRIGRAM] for i in range(len(word) - TRIGRAM + 1)}
+
+
+class TrigramIndex:
+    """ Character trigrams of the corpus words -> sorted ids of the documents containing them
+
+    A keyword without whitespace can only occur inside a single word of a text, so every
+    document in which it occurs as a substring contains all of its trigrams. Intersecting
+    their postings gives a superset of the matching documents; counting is still done by
+    the exact engines on those documents only.
+    """
+
+    def __init__(self):
+        self.gram_ids: Dict[str, int] = {}
+        self.grams: List[str] = []
+        self.gram_docs: List[array] = []
+
+    @classmethod
+    def from_arrays(cls, grams: List[str], gram_docs: Sequence) -> "TrigramIndex":
+        """ Index over prebuilt postings (e.g. memory-mapped from a snapshot); it is read-only """
+        index = cls()
+        index.grams = grams
+        index.gram_ids = {gram: gram_id for gram_id, gram in enumerate(grams)}
+        index.gram_docs = gram_docs
+        return index
+
+    @classmethod
+    def build(cls, corpus: CorpusIndex) -> "TrigramIndex":
+        """ Trigrams come from the distinct terms of each document, not from every character """
+        index = cls()
+        term_grams = [[index._gram_id(gram) for gram in word_trigrams(term)] for term in corpus.terms]
+        for doc in range(len(corpus)):
+            grams = set()
+            for term_id in corpus.doc_term_ids[doc]:
+                grams.update(term_grams[term_id])
+            for gram_id in grams:
+                index.gram_docs[gram_id].append(doc)
+        return index
+
+    def _gram_id(self, gram: str) -> int:
+        gram_id = self.gram_ids.get(gram)
+        if gram_id is None:
+            gram_id = len(self.grams)
+            self.gram_ids[gram] = gram_id
+            self.grams.append(gram)
+            self.gram_docs.append(array('I'))
+        return gram_id
+
+    def candidates(self, keyword: str) -> Optional[set]:
+        """ Documents that may contain keyword, None when the index cannot tell (short keyword, whitespace) """
+        if len(keyword) < TRIGRAM or any(char.isspace() for char in keyword):
+            return None
+        postings = []
+        for gram in word_trigrams(keyword):
+            gram_id = self.gram_ids.get(gram)
+            if gram_id is None:
+                return set()
+            postings.append(self.gram_docs[gram_id])
+        postings.sort(key=len)
+        docs = set(postings[0])
+        for other in postings[1:]:
+            if not docs:
+                break
+            docs.intersection_update(other)
+        return docs
+
+    def candidate_docs(self, keywords: Iterable[str]) -> Optional[List[int]]:
+        """ Sorted documents that may contain any of keywords, None when every document may """
+        docs = set()
+        for keyword in keywords:
+            keyword_docs = self.candidates(keyword)
+            if keyword_docs is None:
+                return None
+            docs.update(keyword_docs)
+        return sorted(docs)
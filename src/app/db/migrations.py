@@ -0,0 +1,125 @@
+"""Schema migrations run by init_database after Base.metadata.create_all.
+
+create_all only creates missing tables, so columns and indexes added to existing tables are
+migrated here. Each migration runs once per database, in version order, and is recorded in
+SchemaMigration. Migrations check what already exists first: on a database just created by
+create_all most of their work is already done.
+"""
+from typing import Callable, List, Tuple
+from sqlalchemy import inspect, insert, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from .models import APPLICANT_NAME_FTS_TABLE, FullNameExpression, SchemaMigration
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _columns(connection: Connection, table: str) -> set:
+    return {column['name'] for column in inspect(connection).get_columns(table)}
+
+
+def _has_index(connection: Connection, table: str, columns: List[str]) -> bool:
+    return any(index['column_names'] == columns for index in inspect(connection).get_indexes(table))
+
+
+def _add_index(connection: Connection, table: str, column: str):
+    if not _has_index(connection, table, [column]):
+        connection.execute(text(f"CREATE INDEX ix_{table}_{column} ON {table} ({column})"))
+
+
+def _add_created_at(connection: Connection, table: str):
+    if 'created_at' in _columns(connection, table):
+        return
+    if connection.dialect.name == 'sqlite':
+        # SQLite cannot add a column with a non-constant default; existing rows get the migration time
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN created_at DATETIME"))
+        connection.execute(text(f"UPDATE {table} SET created_at = CURRENT_TIMESTAMP"))
+    else:
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN created_at DATETIME DEFAULT CURRENT_TIMESTAMP"))
+
+
+def add_applicant_id_index(connection: Connection):
+    # MySQL already indexes the foreign key, other databases do not
+    _add_index(connection, 'ApplicationDetail', 'applicant_id')
+
+
+def add_created_at(connection: Connection):
+    _add_created_at(connection, 'ApplicantProfile')
+    _add_created_at(connection, 'ApplicationDetail')
+    _add_index(connection, 'ApplicationDetail', 'created_at')
+
+
+def add_full_name(connection: Connection):
+    """ Generated full_name column with a full-text index: ngram FULLTEXT on MySQL, FTS5 on SQLite """
+    dialect = connection.dialect.name
+    expression = FullNameExpression().compile(dialect=connection.dialect)
+    if 'full_name' not in _columns(connection, 'ApplicantProfile'):
+        # InnoDB only full-text indexes stored columns; SQLite can only add virtual ones
+        storage = 'STORED' if dialect == 'mysql' else 'VIRTUAL'
+        connection.execute(text(
+            f"ALTER TABLE ApplicantProfile ADD COLUMN full_name VARCHAR(101) GENERATED ALWAYS AS ({expression}) {storage}"
+        ))
+
+    if dialect == 'mysql':
+        if not _has_index(connection, 'ApplicantProfile', ['full_name']):
+            connection.execute(text(
+                "CREATE FULLTEXT INDEX ix_ApplicantProfile_full_name ON ApplicantProfile (full_name) WITH PARSER ngram"
+            ))
+        return
+
+    _add_index(connection, 'ApplicantProfile', 'full_name')
+    if dialect == 'sqlite':
+        _add_name_fts(connection)
+
+
+def _add_name_fts(connection: Connection):
+    """ Trigram FTS5 index over full_name, kept in sync by triggers """
+    if inspect(connection).has_table(APPLICANT_NAME_FTS_TABLE):
+        return
+    fts = APPLICANT_NAME_FTS_TABLE
+    try:
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"full_name, content='ApplicantProfile', content_rowid='applicant_id', tokenize='trigram')"
+        ))
+    except OperationalError as e:
+        # name search falls back to LIKE
+        logger.warning(f"SQLite has no FTS5 trigram support, name search stays a table scan: {str(e)}")
+        return
+    connection.execute(text(
+        f"CREATE TRIGGER {fts}_insert AFTER INSERT ON ApplicantProfile BEGIN "
+        f"INSERT INTO {fts} (rowid, full_name) VALUES (new.applicant_id, new.full_name); END"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER {fts}_delete AFTER DELETE ON ApplicantProfile BEGIN "
+        f"INSERT INTO {fts} ({fts}, rowid, full_name) VALUES ('delete', old.applicant_id, old.full_name); END"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER {fts}_update AFTER UPDATE OF first_name, last_name ON ApplicantProfile BEGIN "
+        f"INSERT INTO {fts} ({fts}, rowid, full_name) VALUES ('delete', old.applicant_id, old.full_name); "
+        f"INSERT INTO {fts} (rowid, full_name) VALUES (new.applicant_id, new.full_name); END"
+    ))
+    connection.execute(text(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')"))
+
+
+# (version, name, migration); append only, never renumber
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, 'applicant_id index', add_applicant_id_index),
+    (2, 'created_at columns', add_created_at),
+    (3, 'full_name column and full-text index', add_full_name),
+]
+
+
+def run_migrations(connection: Connection) -> List[int]:
+    """ Apply the pending migrations; returns their versions """
+    applied = set(connection.execute(select(SchemaMigration.version)).scalars())
+    done = []
+    for version, name, migration in MIGRATIONS:
+        if version in applied:
+            continue
+        migration(connection)
+        connection.execute(insert(SchemaMigration).values(version=version, name=name))
+        logger.info(f"Applied schema migration {version}: {name}")
+        done.append(version)
+    return done
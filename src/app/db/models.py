@@ -1,16 +1,39 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, Date, DateTime, Enum, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Text, Date, DateTime, Enum, ForeignKey, Computed, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import relationship, sessionmaker, Session
 from sqlalchemy.sql import func
+from sqlalchemy.sql.expression import ColumnElement
 from datetime import datetime, date
 import os
 from typing import Optional
-from sqlalchemy import text
+from sqlalchemy import text, inspect, and_, column
+from sqlalchemy.engine import make_url
 
 Base = declarative_base()
 
+# full-text index of ApplicantProfile.full_name on SQLite (FTS5, see migrations.py)
+APPLICANT_NAME_FTS_TABLE = 'ApplicantProfile_fts'
+
+class FullNameExpression(ColumnElement):
+    """ first_name and last_name joined by a space, skipping missing parts, in the SQL of each dialect """
+    inherit_cache = True
+    type = String()
+
+@compiles(FullNameExpression)
+def _full_name_sql(element, compiler, **kw):
+    return "trim(coalesce(first_name, '') || ' ' || coalesce(last_name, ''))"
+
+@compiles(FullNameExpression, 'mysql')
+def _full_name_mysql(element, compiler, **kw):
+    return "CONCAT_WS(' ', first_name, last_name)"
+
 class ApplicantProfile(Base):
     __tablename__ = 'ApplicantProfile'
+    __table_args__ = (
+        # FULLTEXT with the ngram parser on MySQL, a plain index elsewhere
+        Index('ix_ApplicantProfile_full_name', 'full_name', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+    )
     
     applicant_id = Column(Integer, primary_key=True, autoincrement=True)
     first_name = Column(String(50), nullable=True)
@@ -18,6 +41,8 @@ class ApplicantProfile(Base):
     date_of_birth = Column(Date, nullable=True)
     address = Column(String(255), nullable=True)
     phone_number = Column(String(20), nullable=True)
+    full_name = Column(String(101), Computed(FullNameExpression(), persisted=True))
+    created_at = Column(DateTime, nullable=True, default=func.now(), server_default=func.now())
     
     applications = relationship("ApplicationDetail", back_populates="applicant", cascade="all, delete-orphan")
     
@@ -34,15 +59,40 @@ class ApplicantProfile(Base):
             'phone_number': self.phone_number
         }
 
+def applicant_name_condition(session: Session, name_pattern: str):
+    """ Filter for applicants whose full name contains name_pattern, through the full-text index where possible
+
+    SQLite uses the trigram FTS5 table (patterns of 3+ characters), MySQL the ngram FULLTEXT index
+    (2+ characters, re-checked with LIKE since it works on ngrams); otherwise LIKE scans the table.
+    """
+    like = ApplicantProfile.full_name.like(f"%{name_pattern}%")
+    bind = session.get_bind()
+    dialect = bind.dialect.name
+    if dialect == 'sqlite' and len(name_pattern) >= 3 and inspect(session.connection()).has_table(APPLICANT_NAME_FTS_TABLE):
+        fts = APPLICANT_NAME_FTS_TABLE
+        matches = text(f"SELECT rowid FROM {fts} WHERE {fts} MATCH :name_query").bindparams(
+            name_query='"' + name_pattern.replace('"', '""') + '"'
+        ).columns(column('rowid', Integer))
+        return ApplicantProfile.applicant_id.in_(matches)
+    if dialect == 'mysql' and len(name_pattern.strip()) >= 2:
+        # a boolean mode phrase cannot contain double quotes
+        matches = text("MATCH (full_name) AGAINST (:name_query IN BOOLEAN MODE)").bindparams(
+            name_query='"' + name_pattern.replace('"', ' ') + '"'
+        )
+        return and_(matches, like)
+    return like
+
 class ApplicationDetail(Base):
     __tablename__ = 'ApplicationDetail'
     
     detail_id = Column(Integer, primary_key=True, autoincrement=True)
-    applicant_id = Column(Integer, ForeignKey('ApplicantProfile.applicant_id'), nullable=False)
+    applicant_id = Column(Integer, ForeignKey('ApplicantProfile.applicant_id'), nullable=False, index=True)
     application_role = Column(String(100), nullable=True)
     cv_path = Column(Text)
+    created_at = Column(DateTime, nullable=True, default=func.now(), server_default=func.now(), index=True)
     
     applicant = relationship("ApplicantProfile", back_populates="applications")
+    cv_profile = relationship("CVProfile", back_populates="application", uselist=False, cascade="all, delete-orphan")
     
     def __repr__(self):  # Fixed: double underscores
         return f"<ApplicationDetail(id={self.detail_id}, role='{self.application_role}')>"
@@ -55,6 +105,79 @@ class ApplicationDetail(Base):
             'cv_path': self.cv_path
         }
 
+# Structured CV profile, extracted once per CV file and extractor version (see profile_ingest.py)
+class CVProfile(Base):
+    __tablename__ = 'CVProfile'
+
+    detail_id = Column(Integer, ForeignKey('ApplicationDetail.detail_id'), primary_key=True)
+    extractor_version = Column(Integer, nullable=False)
+    cv_signature = Column(String(64), nullable=False)  # mtime and size of the CV file when it was extracted
+    extracted_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    application = relationship("ApplicationDetail", back_populates="cv_profile")
+    skills = relationship("CVSkill", order_by="CVSkill.ordinal", cascade="all, delete-orphan")
+    summaries = relationship("CVSummary", order_by="CVSummary.ordinal", cascade="all, delete-orphan")
+    jobs = relationship("CVJobHistory", order_by="CVJobHistory.ordinal", cascade="all, delete-orphan")
+    educations = relationship("CVEducation", order_by="CVEducation.ordinal", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<CVProfile(id={self.detail_id}, version={self.extractor_version})>"
+
+    def to_dict(self):
+        """ Same shape as the on-demand extraction of InfoPentingGacorRealNoHoax """
+        return {
+            'skills': [skill.skill for skill in self.skills],
+            'summaries': [{'text': summary.text} for summary in self.summaries],
+            'jobs': [{'position': job.position, 'company': job.company, 'period': job.period} for job in self.jobs],
+            'educations': [
+                {'degree': education.degree, 'institution': education.institution, 'period': education.period}
+                for education in self.educations
+            ],
+        }
+
+class CVSkill(Base):
+    __tablename__ = 'CVSkill'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    detail_id = Column(Integer, ForeignKey('CVProfile.detail_id'), nullable=False, index=True)
+    ordinal = Column(Integer, nullable=False)
+    skill = Column(String(255), nullable=False)
+
+class CVSummary(Base):
+    __tablename__ = 'CVSummary'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    detail_id = Column(Integer, ForeignKey('CVProfile.detail_id'), nullable=False, index=True)
+    ordinal = Column(Integer, nullable=False)
+    text = Column(Text, nullable=False)
+
+class CVJobHistory(Base):
+    __tablename__ = 'CVJobHistory'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    detail_id = Column(Integer, ForeignKey('CVProfile.detail_id'), nullable=False, index=True)
+    ordinal = Column(Integer, nullable=False)
+    position = Column(String(255), nullable=False)
+    company = Column(String(255), nullable=True)
+    period = Column(String(100), nullable=True)
+
+class CVEducation(Base):
+    __tablename__ = 'CVEducation'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    detail_id = Column(Integer, ForeignKey('CVProfile.detail_id'), nullable=False, index=True)
+    ordinal = Column(Integer, nullable=False)
+    degree = Column(String(255), nullable=False)
+    institution = Column(String(255), nullable=True)
+    period = Column(String(100), nullable=True)
+
+class SchemaMigration(Base):
+    __tablename__ = 'SchemaMigration'
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(100), nullable=False)
+    applied_at = Column(DateTime, nullable=False, server_default=func.now())
+
 class DatabaseConfig:
     def __init__(self):  # Fixed: double underscores
         self.MYSQL_HOST = os.getenv('MYSQL_HOST', 'localhost')
@@ -64,8 +187,18 @@ class DatabaseConfig:
         self.MYSQL_PASSWORD = os.getenv('MYSQL_PASSWORD', 'asepjajang123')
         
         self.DATABASE_URL = f"mysql+pymysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_HOST}:{self.MYSQL_PORT}/{self.MYSQL_DATABASE}"
+        # DATABASE_URL overrides the MySQL settings, e.g. sqlite:///ats_local.db for local testing
+        self.database_url_override = os.getenv('DATABASE_URL')
+        self.DATABASE_URL = self.database_url_override or self.DATABASE_URL
     
     def get_engine(self):
+        if self.DATABASE_URL.startswith('sqlite'):
+            # the search service uses the engine from several worker threads
+            return create_engine(
+                self.DATABASE_URL,
+                echo=False,
+                connect_args={'check_same_thread': False}
+            )
         return create_engine(
             self.DATABASE_URL,
             echo=False, 
@@ -77,10 +210,59 @@ class DatabaseConfig:
         engine = self.get_engine()
         return sessionmaker(bind=engine)
 
+    def get_async_database_url(self) -> str:
+        # ASYNC_DATABASE_URL overrides everything, e.g. sqlite+aiosqlite:///ats_local.db for local testing
+        url = os.getenv('ASYNC_DATABASE_URL')
+        if url:
+            return url
+        driver = os.getenv('MYSQL_ASYNC_DRIVER', 'aiomysql')  # aiomysql or asyncmy
+        if self.database_url_override:
+            # the same database as the sync engine, through its async driver
+            sync_url = make_url(self.database_url_override)
+            backend = sync_url.get_backend_name()
+            if backend == 'sqlite':
+                return sync_url.set(drivername='sqlite+aiosqlite').render_as_string(hide_password=False)
+            if backend == 'mysql':
+                return sync_url.set(drivername=f'mysql+{driver}').render_as_string(hide_password=False)
+            return self.database_url_override
+        return f"mysql+{driver}://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_HOST}:{self.MYSQL_PORT}/{self.MYSQL_DATABASE}"
+
+    def get_async_engine(self):
+        # needs the optional async drivers, imported here so the sync app runs without them
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        url = self.get_async_database_url()
+        if url.startswith('sqlite'):
+            return create_async_engine(url, echo=False)
+        return create_async_engine(
+            url,
+            echo=False,
+            pool_pre_ping=True,
+            pool_recycle=300
+        )
+
+    def get_async_session_maker(self, engine=None):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        engine = engine or self.get_async_engine()
+        return async_sessionmaker(bind=engine, expire_on_commit=False)
+
 def init_database():
+    from .migrations import run_migrations
+
     config = DatabaseConfig()
     engine = config.get_engine()
     Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        run_migrations(connection)
+    return engine
+
+async def init_database_async(engine):
+    from .migrations import run_migrations
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.run_sync(run_migrations)
     return engine
 
 def test_connection():
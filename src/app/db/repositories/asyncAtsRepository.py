@@ -0,0 +1,251 @@
+from sqlalchemy import select, func
+from sqlalchemy.exc import SQLAlchemyError
+from typing import List, Dict, Optional, Tuple
+from contextlib import asynccontextmanager
+
+from sqlalchemy.orm import selectinload
+from ..models import applicant_name_condition, ApplicantProfile, ApplicationDetail, CVProfile, DatabaseConfig
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AsyncBaseRepository:
+
+    def __init__(self, session_maker=None):
+        self.config = DatabaseConfig()
+        # repositories of one controller share a session maker, so they share one engine and pool
+        self.SessionLocal = session_maker or self.config.get_async_session_maker()
+
+    @asynccontextmanager
+    async def get_session(self):
+        session = self.SessionLocal()
+        try:
+            yield session
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Database error: {str(e)}")
+            raise
+        finally:
+            await session.close()
+
+class AsyncApplicantRepository(AsyncBaseRepository):
+
+    async def create_applicant(self, applicant_data: Dict) -> Optional[ApplicantProfile]:
+        try:
+            async with self.get_session() as session:
+                applicant = ApplicantProfile(
+                    first_name=applicant_data.get('first_name'),
+                    last_name=applicant_data.get('last_name'),
+                    date_of_birth=applicant_data.get('date_of_birth'),
+                    address=applicant_data.get('address'),
+                    phone_number=applicant_data.get('phone_number')
+                )
+                session.add(applicant)
+                await session.flush()
+                await session.refresh(applicant)
+                logger.info(f"Created applicant: {applicant.first_name} {applicant.last_name} (ID: {applicant.applicant_id})")
+                return applicant
+        except SQLAlchemyError as e:
+            logger.error(f"Error creating applicant: {str(e)}")
+            return None
+
+    async def get_applicant_by_id(self, applicant_id: int) -> Optional[Dict]:
+        try:
+            async with self.get_session() as session:
+                applicant = await session.get(ApplicantProfile, applicant_id)
+                return applicant.to_dict() if applicant else None
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting applicant by ID {applicant_id}: {str(e)}")
+            return None
+
+    async def get_applicants_by_ids(self, applicant_ids: List[int]) -> List[Dict]:
+        if not applicant_ids:
+            return []
+        try:
+            async with self.get_session() as session:
+                result = await session.execute(
+                    select(ApplicantProfile).where(ApplicantProfile.applicant_id.in_(applicant_ids))
+                )
+                return [applicant.to_dict() for applicant in result.scalars().all()]
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting applicants by IDs: {str(e)}")
+            return []
+
+    async def get_all_applicants(self, limit: Optional[int] = None, offset: Optional[int] = None) -> List[ApplicantProfile]:
+        try:
+            async with self.get_session() as session:
+                query = select(ApplicantProfile).order_by(ApplicantProfile.applicant_id.desc())
+
+                if offset:
+                    query = query.offset(offset)
+                if limit:
+                    query = query.limit(limit)
+
+                result = await session.execute(query)
+                return list(result.scalars().all())
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting all applicants: {str(e)}")
+            return []
+
+    async def delete_applicant(self, applicant_id: int) -> bool:
+        try:
+            async with self.get_session() as session:
+                applicant = await session.get(ApplicantProfile, applicant_id)
+
+                if not applicant:
+                    logger.warning(f"Applicant with ID {applicant_id} not found")
+                    return False
+
+                applicant_name = f"{applicant.first_name} {applicant.last_name}"
+                await session.delete(applicant)
+                logger.info(f"Deleted applicant: {applicant_name} (ID: {applicant_id})")
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error deleting applicant {applicant_id}: {str(e)}")
+            return False
+
+    async def search_applicants_by_name(self, name_pattern: str) -> List[ApplicantProfile]:
+        try:
+            async with self.get_session() as session:
+                condition = await session.run_sync(applicant_name_condition, name_pattern)
+                result = await session.execute(
+                    select(ApplicantProfile).where(condition).order_by(ApplicantProfile.full_name)
+                )
+                return list(result.scalars().all())
+        except SQLAlchemyError as e:
+            logger.error(f"Error searching applicants by name '{name_pattern}': {str(e)}")
+            return []
+
+    async def get_applicant_directory_rows(self) -> List[Tuple]:
+        try:
+            async with self.get_session() as session:
+                result = await session.execute(
+                    select(
+                        ApplicantProfile.applicant_id,
+                        ApplicantProfile.first_name,
+                        ApplicantProfile.last_name,
+                        ApplicantProfile.date_of_birth,
+                        ApplicantProfile.address,
+                        ApplicantProfile.phone_number
+                    ).order_by(ApplicantProfile.applicant_id)
+                )
+                return [tuple(row) for row in result.all()]
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting applicant directory rows: {str(e)}")
+            return []
+
+    async def get_applicants_count(self) -> int:
+        try:
+            async with self.get_session() as session:
+                count = await session.scalar(select(func.count()).select_from(ApplicantProfile))
+                return count or 0
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting applicants count: {str(e)}")
+            return 0
+
+class AsyncApplicationRepository(AsyncBaseRepository):
+
+    async def create_application(self, application_data: Dict) -> Optional[ApplicationDetail]:
+        try:
+            async with self.get_session() as session:
+                application = ApplicationDetail(
+                    applicant_id=application_data.get('applicant_id'),
+                    cv_path=application_data.get('cv_path'),
+                    application_role=application_data.get('application_role')
+                )
+                session.add(application)
+                await session.flush()
+                await session.refresh(application)
+                logger.info(f"Created application: {application.application_role} (ID: {application.detail_id})")
+                return application
+        except SQLAlchemyError as e:
+            logger.error(f"Error creating application: {str(e)}")
+            return None
+
+    async def get_application_by_id(self, application_id: int) -> Optional[ApplicationDetail]:
+        try:
+            async with self.get_session() as session:
+                return await session.get(ApplicationDetail, application_id)
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting application by ID {application_id}: {str(e)}")
+            return None
+
+    async def get_applications_by_applicant(self, applicant_id: int) -> List[ApplicationDetail]:
+        try:
+            async with self.get_session() as session:
+                result = await session.execute(
+                    select(ApplicationDetail).where(
+                        ApplicationDetail.applicant_id == applicant_id
+                    ).order_by(ApplicationDetail.detail_id.desc())
+                )
+                return list(result.scalars().all())
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting applications for applicant {applicant_id}: {str(e)}")
+            return []
+
+    async def get_all_applications(self, limit: Optional[int] = None, offset: Optional[int] = None) -> List[Dict]:
+        try:
+            async with self.get_session() as session:
+                query = select(ApplicationDetail).order_by(ApplicationDetail.detail_id.desc())
+
+                if offset:
+                    query = query.offset(offset)
+                if limit:
+                    query = query.limit(limit)
+
+                result = await session.execute(query)
+                return [app.to_dict() for app in result.scalars().all()]
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting all applications: {str(e)}")
+            return []
+
+    async def delete_application(self, application_id: int) -> bool:
+        try:
+            async with self.get_session() as session:
+                application = await session.get(ApplicationDetail, application_id)
+
+                if not application:
+                    logger.warning(f"Application with ID {application_id} not found")
+                    return False
+
+                role = application.application_role
+                await session.delete(application)
+                logger.info(f"Deleted application: {role} (ID: {application_id})")
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error deleting application {application_id}: {str(e)}")
+            return False
+
+    async def get_applications_count(self) -> int:
+        try:
+            async with self.get_session() as session:
+                count = await session.scalar(select(func.count()).select_from(ApplicationDetail))
+                return count or 0
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting applications count: {str(e)}")
+            return 0
+
+class AsyncCVProfileRepository(AsyncBaseRepository):
+
+    async def get_profile(self, detail_id: int) -> Optional[Dict]:
+        try:
+            async with self.get_session() as session:
+                result = await session.execute(
+                    select(CVProfile).options(
+                        selectinload(CVProfile.skills),
+                        selectinload(CVProfile.summaries),
+                        selectinload(CVProfile.jobs),
+                        selectinload(CVProfile.educations)
+                    ).where(CVProfile.detail_id == detail_id)
+                )
+                profile = result.scalar_one_or_none()
+                if not profile:
+                    return None
+                data = profile.to_dict()
+                data['extractor_version'] = profile.extractor_version
+                data['cv_signature'] = profile.cv_signature
+                return data
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting CV profile {detail_id}: {str(e)}")
+            return None
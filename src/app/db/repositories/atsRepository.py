@@ -1,12 +1,14 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, Date, DateTime, Enum, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Text, Date, DateTime, Enum, ForeignKey, func
 from sqlalchemy.orm import Session
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.exc import SQLAlchemyError
 from typing import List, Dict, Optional, Tuple
 from datetime import date, datetime
 from contextlib import contextmanager
 
-from ..models import ApplicantProfile, ApplicationDetail, DatabaseConfig
+from ..models import (
+    applicant_name_condition, ApplicantProfile, ApplicationDetail, CVProfile, CVSkill, CVSummary, CVJobHistory, CVEducation, DatabaseConfig
+)
 import logging
 
 # Setup logging
@@ -110,17 +112,33 @@ class ApplicantRepository(BaseRepository):
             logger.error(f"Error deleting applicant {applicant_id}: {str(e)}")
             return False
     
-    def search_applicants_by_name(self, name_pattern: str) -> List[ApplicantProfile]:
+    def search_applicants_by_name(self, name_pattern: str) -> List[Dict]:
         try:
             with self.get_session() as session:
                 applicants = session.query(ApplicantProfile).filter(
-                    ApplicantProfile.full_name.like(f"%{name_pattern}%")
+                    applicant_name_condition(session, name_pattern)
                 ).order_by(ApplicantProfile.full_name).all()
-                return applicants
+                return [applicant.to_dict() for applicant in applicants]
         except SQLAlchemyError as e:
             logger.error(f"Error searching applicants by name '{name_pattern}': {str(e)}")
             return []
     
+    def get_applicant_directory_rows(self) -> List[Tuple]:
+        try:
+            with self.get_session() as session:
+                rows = session.query(
+                    ApplicantProfile.applicant_id,
+                    ApplicantProfile.first_name,
+                    ApplicantProfile.last_name,
+                    ApplicantProfile.date_of_birth,
+                    ApplicantProfile.address,
+                    ApplicantProfile.phone_number
+                ).order_by(ApplicantProfile.applicant_id).all()
+                return [tuple(row) for row in rows]
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting applicant directory rows: {str(e)}")
+            return []
+    
     def get_applicants_count(self) -> int:
         try:
             with self.get_session() as session:
@@ -130,6 +148,17 @@ class ApplicantRepository(BaseRepository):
             logger.error(f"Error getting applicants count: {str(e)}")
             return 0
 
+    def count_applicants_created_between(self, start: datetime, end: datetime) -> int:
+        try:
+            with self.get_session() as session:
+                return session.query(func.count(ApplicantProfile.applicant_id)).filter(
+                    ApplicantProfile.created_at >= start,
+                    ApplicantProfile.created_at < end
+                ).scalar() or 0
+        except SQLAlchemyError as e:
+            logger.error(f"Error counting applicants created between {start} and {end}: {str(e)}")
+            return 0
+
 class ApplicationRepository(BaseRepository):
     
     def create_application(self, application_data: Dict) -> Optional[ApplicationDetail]:
@@ -214,4 +243,84 @@ class ApplicationRepository(BaseRepository):
                 return count
         except SQLAlchemyError as e:
             logger.error(f"Error getting applications count: {str(e)}")
-            return 0  # Fixed: added missing return statement
\ No newline at end of file
+            return 0  # Fixed: added missing return statement
+
+    def count_applications_by_role_between(self, start: datetime, end: datetime) -> Dict[str, int]:
+        """ Applications created in [start, end), per role """
+        try:
+            with self.get_session() as session:
+                rows = session.query(
+                    ApplicationDetail.application_role,
+                    func.count(ApplicationDetail.detail_id)
+                ).filter(
+                    ApplicationDetail.created_at >= start,
+                    ApplicationDetail.created_at < end
+                ).group_by(ApplicationDetail.application_role).all()
+                return {role: count for role, count in rows}
+        except SQLAlchemyError as e:
+            logger.error(f"Error counting applications created between {start} and {end}: {str(e)}")
+            return {}
+
+class CVProfileRepository(BaseRepository):
+
+    def get_extraction_states(self) -> Dict[int, Tuple[int, str]]:
+        """ detail_id -> (extractor version, CV signature) of every stored profile """
+        try:
+            with self.get_session() as session:
+                rows = session.query(CVProfile.detail_id, CVProfile.extractor_version, CVProfile.cv_signature).all()
+                return {detail_id: (version, signature) for detail_id, version, signature in rows}
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting CV extraction states: {str(e)}")
+            return {}
+
+    def get_profile(self, detail_id: int) -> Optional[Dict]:
+        try:
+            with self.get_session() as session:
+                profile = session.query(CVProfile).options(
+                    selectinload(CVProfile.skills),
+                    selectinload(CVProfile.summaries),
+                    selectinload(CVProfile.jobs),
+                    selectinload(CVProfile.educations)
+                ).filter(CVProfile.detail_id == detail_id).first()
+                if not profile:
+                    return None
+                data = profile.to_dict()
+                data['extractor_version'] = profile.extractor_version
+                data['cv_signature'] = profile.cv_signature
+                return data
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting CV profile {detail_id}: {str(e)}")
+            return None
+
+    def save_profile(self, detail_id: int, extractor_version: int, cv_signature: str, profile_data: Dict) -> bool:
+        """ Replace the stored profile of an application """
+        try:
+            with self.get_session() as session:
+                existing = session.get(CVProfile, detail_id)
+                if existing:
+                    session.delete(existing)
+                    session.flush()
+
+                profile = CVProfile(detail_id=detail_id, extractor_version=extractor_version, cv_signature=cv_signature)
+                profile.skills = [
+                    CVSkill(ordinal=i, skill=skill[:255]) for i, skill in enumerate(profile_data.get('skills', []))
+                ]
+                profile.summaries = [
+                    CVSummary(ordinal=i, text=summary['text']) for i, summary in enumerate(profile_data.get('summaries', []))
+                ]
+                profile.jobs = [
+                    CVJobHistory(ordinal=i, position=job['position'][:255], company=(job.get('company') or '')[:255],
+                                 period=(job.get('period') or '')[:100])
+                    for i, job in enumerate(profile_data.get('jobs', []))
+                ]
+                profile.educations = [
+                    CVEducation(ordinal=i, degree=education['degree'][:255],
+                                institution=(education.get('institution') or '')[:255],
+                                period=(education.get('period') or '')[:100])
+                    for i, education in enumerate(profile_data.get('educations', []))
+                ]
+                session.add(profile)
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error saving CV profile {detail_id}: {str(e)}")
+            return False
@@ -0,0 +1,313 @@
+"""Load test: concurrent simulated recruiters against one warm DataService.
+
+Every simulated user loops over a weighted mix of operations, sleeping a random think time
+(exponential, --think-ms on average) between them:
+
+    search   DataService.search_candidates with a random keyword set
+    details  DataService.get_candidate_details of a candidate from the user's last search
+    render   first page of that candidate's CV rendered as in the CV viewer
+
+Searches hold a lock like the search service does, because the Matcher keeps per-search
+state; their latency includes the wait for that lock.
+
+The corpus is synthetic: --cvs generated PDFs and a SQLite database in --workdir, reused on
+later runs with the same size. The database settings of the environment are overridden.
+
+    uv run ./app/loadtest.py --users 8 --duration 60 --mix search=5,details=3,render=2
+
+Latency percentiles and throughput per operation go to stderr, and to --output as JSON.
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Dict, List
+
+DEFAULT_WORKDIR = '.ats_loadtest'
+OPERATIONS = ('search', 'details', 'render')
+ALGORITHMS = ('KMP', 'BM', 'AC', 'exact', 'word', 'auto')
+PERCENTILES = (50, 95, 99)
+
+ROLES = ('Accountant', 'Data Analyst', 'Software Engineer', 'HR', 'Sales', 'Designer')
+SKILLS = ("python java javascript sql excel react docker kubernetes accounting finance audit payroll "
+          "marketing sales negotiation recruitment design figma photoshop communication leadership "
+          "analysis reporting tableau linux networking testing agile scrum management").split()
+FILLER = ("experienced team player responsible for projects customers reports budgets clients "
+          "delivered improved managed developed supported coordinated the and with of for in").split()
+# keyword sets of the searches; typos go through the fuzzy stage
+DEFAULT_QUERIES = [
+    ['python', 'sql'], ['react', 'javascript'], ['accounting', 'audit'], ['marketing'],
+    ['docker', 'kubernetes', 'linux'], ['recruitment', 'payroll'], ['pyhton'], ['managment', 'excel'],
+    ['figma', 'design'], ['tableau', 'reporting', 'analysis'],
+]
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation '{name}', expected one of {', '.join(OPERATIONS)}")
+        try:
+            mix[name] = int(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"weight of '{name}' must be an integer")
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("the mix needs at least one operation with a positive weight")
+    return mix
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Simulate concurrent recruiters against the search backend")
+    parser.add_argument('-u', '--users', type=int, default=4, help="concurrent simulated users (default: 4)")
+    parser.add_argument('-d', '--duration', type=float, default=30, help="seconds of load (default: 30)")
+    parser.add_argument('-t', '--think-ms', type=float, default=500, help="mean think time between operations (default: 500)")
+    parser.add_argument('-m', '--mix', type=parse_mix, default=parse_mix('search=5,details=3,render=2'),
+                        help="operation weights (default: search=5,details=3,render=2)")
+    parser.add_argument('-a', '--algorithm', default='AC', choices=ALGORITHMS, help="matching algorithm (default: AC)")
+    parser.add_argument('-n', '--top', type=int, default=10, help="candidates per search (default: 10)")
+    parser.add_argument('-q', '--queries', help="file with one comma-separated keyword set per line (default: built-in set)")
+    parser.add_argument('--cvs', type=int, default=500, help="synthetic CVs in the corpus (default: 500)")
+    parser.add_argument('--workdir', default=DEFAULT_WORKDIR, help=f"corpus, database and cache directory (default: {DEFAULT_WORKDIR})")
+    parser.add_argument('--cold-profiles', action='store_true',
+                        help="drop stored profiles and skip the ingest, so details are extracted on demand")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the corpus and the users (default: 0)")
+    parser.add_argument('-o', '--output', help="write the report as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def read_queries(path: str) -> List[List[str]]:
+    with open(path, encoding='utf-8') as f:
+        queries = [[k.strip() for k in line.split(',') if k.strip()] for line in f if not line.startswith('#')]
+    return [keywords for keywords in queries if keywords]
+
+
+def write_cv(path: str, rnd: random.Random):
+    import fitz
+
+    def words(count: int, vocabulary: List[str]) -> str:
+        return ' '.join(rnd.choice(vocabulary) for _ in range(count))
+
+    lines = ["Summary", words(40, FILLER + SKILLS), "", "Skills", ', '.join(rnd.sample(SKILLS, 8)), "", "Experience"]
+    for _ in range(rnd.randint(1, 4)):
+        start = rnd.randint(2008, 2020)
+        lines.append(f"{rnd.randint(1, 12):02d}/{start} to {rnd.randint(1, 12):02d}/{start + rnd.randint(1, 4)} "
+                     f"Company Name {rnd.choice(ROLES)}")
+        lines.append(words(30, FILLER + SKILLS))
+    lines += ["", "Education", f"Bachelor of Science {rnd.choice(['Computer Science', 'Economics', 'Design'])} {rnd.randint(2000, 2018)}"]
+
+    document = fitz.open()
+    # about 50 lines fit on a page
+    for first in range(0, len(lines), 50):
+        page = document.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 545, 800), '\n'.join(lines[first:first + 50]), fontsize=9)
+    document.save(path)
+    document.close()
+
+
+def prepare_corpus(workdir: str, cvs: int, seed: int) -> str:
+    """ SQLite database URL of a synthetic corpus with cvs applications, generated unless present """
+    from db.models import init_database, DatabaseConfig, ApplicantProfile, ApplicationDetail
+
+    os.makedirs(os.path.join(workdir, 'cvs'), exist_ok=True)
+    db_path = os.path.abspath(os.path.join(workdir, f'loadtest-{cvs}.db'))
+    url = f"sqlite:///{db_path}"
+    os.environ['DATABASE_URL'] = url
+    os.environ['ATS_CACHE_DIR'] = os.path.join(workdir, 'cache')
+    if os.path.exists(db_path):
+        return url
+
+    print(f"Generating {cvs} synthetic CVs in {workdir}")
+    rnd = random.Random(seed)
+    init_database()
+    session = DatabaseConfig().get_session_maker()()
+    try:
+        for i in range(1, cvs + 1):
+            cv_path = os.path.abspath(os.path.join(workdir, 'cvs', f'cv{i}.pdf'))
+            write_cv(cv_path, rnd)
+            session.add(ApplicantProfile(
+                applicant_id=i, first_name=f'User{i}', last_name='Loadtest',
+                date_of_birth=datetime.date(rnd.randint(1970, 2003), rnd.randint(1, 12), rnd.randint(1, 28)),
+                address=f'Jl. Uji No. {i}', phone_number=f'08{rnd.randint(10 ** 9, 10 ** 10 - 1)}'
+            ))
+            session.add(ApplicationDetail(detail_id=i, applicant_id=i, application_role=rnd.choice(ROLES), cv_path=cv_path))
+        session.commit()
+    except Exception:
+        session.close()
+        # a partial database would be reused by the next run
+        os.remove(db_path)
+        raise
+    session.close()
+    return url
+
+
+def clear_profiles():
+    """ Drop the stored CV profiles so that every details request extracts its CV """
+    from db.models import DatabaseConfig, CVProfile, CVSkill, CVSummary, CVJobHistory, CVEducation
+
+    session = DatabaseConfig().get_session_maker()()
+    try:
+        for model in (CVSkill, CVSummary, CVJobHistory, CVEducation, CVProfile):
+            session.query(model).delete()
+        session.commit()
+    finally:
+        session.close()
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """ Nearest-rank percentile """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class LoadTest:
+    def __init__(self, data_service, args: argparse.Namespace, queries: List[List[str]]):
+        self.data_service = data_service
+        self.args = args
+        self.queries = queries
+        self.operations = [name for name in OPERATIONS if args.mix.get(name)]
+        self.weights = [args.mix[name] for name in self.operations]
+        self.search_lock = threading.Lock()
+        self.results_lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {name: [] for name in self.operations}
+        self.errors: Dict[str, int] = {name: 0 for name in self.operations}
+        self.application_ids = list(data_service.app_dict)
+
+    def _search(self, rnd: random.Random, state: Dict):
+        with self.search_lock:
+            candidates, _, _ = self.data_service.search_candidates(
+                keywords=rnd.choice(self.queries), top_n=self.args.top, algorithm=self.args.algorithm
+            )
+        if candidates:
+            state['candidates'] = candidates
+
+    def _candidate(self, rnd: random.Random, state: Dict) -> Dict:
+        """ A candidate of the user's last search, or any application before the first search hit """
+        if state.get('candidates'):
+            return rnd.choice(state['candidates'])
+        application_id = rnd.choice(self.application_ids)
+        return {'application_id': application_id, 'cv_path': self.data_service.app_dict[application_id]['cv_path']}
+
+    def _details(self, rnd: random.Random, state: Dict):
+        self.data_service.get_candidate_details(self._candidate(rnd, state)['application_id'])
+
+    def _render(self, rnd: random.Random, state: Dict):
+        from utils.pdf_render import render_first_page
+        render_first_page(self._candidate(rnd, state)['cv_path'])
+
+    def _user(self, user: int, deadline: float):
+        rnd = random.Random(self.args.seed * 1000 + user)
+        state = {}
+        handlers = {'search': self._search, 'details': self._details, 'render': self._render}
+        while time.perf_counter() < deadline:
+            name = rnd.choices(self.operations, self.weights)[0]
+            start = time.perf_counter()
+            try:
+                handlers[name](rnd, state)
+                failed = False
+            except Exception as e:
+                print(f"[Error] {name}: {e}")
+                failed = True
+            elapsed = time.perf_counter() - start
+            with self.results_lock:
+                if failed:
+                    self.errors[name] += 1
+                else:
+                    self.latencies[name].append(elapsed)
+            if self.args.think_ms > 0:
+                time.sleep(min(rnd.expovariate(1000 / self.args.think_ms), max(0.0, deadline - time.perf_counter())))
+
+    def run(self) -> Dict:
+        start = time.perf_counter()
+        deadline = start + self.args.duration
+        users = [
+            threading.Thread(target=self._user, args=(user, deadline), name=f'loadtest-user-{user}')
+            for user in range(self.args.users)
+        ]
+        for thread in users:
+            thread.start()
+        for thread in users:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict:
+        operations = {}
+        for name in self.operations:
+            latencies = sorted(self.latencies[name])
+            operations[name] = {
+                'count': len(latencies),
+                'errors': self.errors[name],
+                'throughput': len(latencies) / elapsed if elapsed > 0 else 0.0,
+                'mean_ms': sum(latencies) * 1000 / len(latencies) if latencies else 0.0,
+                **{f'p{p}_ms': percentile(latencies, p) * 1000 for p in PERCENTILES},
+                'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+            }
+        return {
+            'users': self.args.users,
+            'duration': elapsed,
+            'think_ms': self.args.think_ms,
+            'mix': self.args.mix,
+            'algorithm': self.args.algorithm,
+            'documents': len(self.application_ids),
+            'operations': operations,
+        }
+
+
+def print_report(report: Dict):
+    print(f"{report['users']} users, {report['duration']:.1f}s, {report['documents']} CVs, "
+          f"algorithm {report['algorithm']}, think time {report['think_ms']:.0f} ms")
+    print(f"{'operation':<10}{'count':>8}{'errors':>8}{'ops/s':>9}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, stats in report['operations'].items():
+        print(f"{name:<10}{stats['count']:>8}{stats['errors']:>8}{stats['throughput']:>9.2f}"
+              f"{stats['mean_ms']:>10.1f}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+              f"{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+    print("latencies in ms")
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    queries = read_queries(args.queries) if args.queries else DEFAULT_QUERIES
+    if not queries:
+        print("No keyword sets to search for", file=sys.stderr)
+        return 1
+
+    # extraction and matching print diagnostics; keep stdout quiet
+    with contextlib.redirect_stdout(sys.stderr):
+        prepare_corpus(args.workdir, args.cvs, args.seed)
+        if args.cold_profiles:
+            os.environ['ATS_PROFILE_INGEST'] = '0'
+            clear_profiles()
+
+        from db.controller.data_service import DataService
+
+        load_start = time.perf_counter()
+        data_service = DataService()
+        ingest = data_service.ingest_thread
+        if ingest is not None:
+            # measure the steady state: profiles stored before the load starts
+            ingest.join()
+        print(f"Corpus loaded in {time.perf_counter() - load_start:.2f}s")
+
+        try:
+            report = LoadTest(data_service, args, queries).run()
+        finally:
+            data_service.matcher.close()
+        print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0 if not any(stats['errors'] for stats in report['operations'].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
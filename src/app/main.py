@@ -1,8 +1,10 @@
 import flet as ft
+import os
 import threading
 import time
 from app import CVApp
 from db.controller.data_service import DataService
+from db.controller.remote_data_service import RemoteDataService
 from ui.pages import setup_page
 from ui.loading_page import create_loading_view
 
@@ -12,7 +14,9 @@ def main(page: ft.Page):
     app_context = {"data_service": None}
 
     def initialize_data():
-        service = DataService()
+        # ATS_SEARCH_SERVICE_URL runs the UI as a thin client of a shared search service (server.py)
+        service_url = os.getenv('ATS_SEARCH_SERVICE_URL')
+        service = RemoteDataService(service_url) if service_url else DataService()
         app_context["data_service"] = service
 
     def build_main_app():
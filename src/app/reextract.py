@@ -0,0 +1,47 @@
+"""Extract the structured CV profiles (skills, summary, job history, education) into the database.
+
+The app does this in the background after every corpus refresh, for new and changed CVs and
+for profiles of an older extractor version. Run it by hand after bumping EXTRACTOR_VERSION
+in db/controller/infopenting.py, or with --force to extract every CV again:
+
+    uv run ./app/reextract.py --workers 8
+    uv run ./app/reextract.py --force
+
+Progress and the summary go to stderr.
+"""
+import argparse
+import contextlib
+import sys
+from typing import List
+from db.controller.atsController import ATSController
+from db.controller.infopenting import EXTRACTOR_VERSION
+from db.controller.profile_ingest import ProfileIngestor
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extract CV profiles into the database")
+    parser.add_argument('-f', '--force', action='store_true', help="extract every CV, not only missing or stale profiles")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="extraction processes (default: ATS_PROFILE_WORKERS or CPUs - 1)")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        controller = ATSController()
+        app_result = controller.get_all_applications()
+        if not app_result['success']:
+            print(f"Failed to load applications: {app_result['message']}")
+            return 1
+
+        applications = app_result['data']['applications']
+        ingestor = ProfileIngestor(controller, workers=args.workers)
+        stats = ingestor.run(applications, force=args.force)
+        print(f"Extractor version {EXTRACTOR_VERSION}: {stats['pending']} of {stats['applications']} applications "
+              f"to extract, {stats['extracted']} extracted, {stats['failed']} failed in {stats['seconds']:.2f}s")
+    return 0 if stats['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Headless batch screening over the warm corpus.
+
+Each input line is one job opening: comma-separated keywords, as typed in the search field
+of the GUI. Blank lines and lines starting with '#' are skipped.
+
+    uv run ./app/screen.py --algorithm AC --top 10 --input openings.txt > results.jsonl
+
+Openings are screened in batches of --batch: the keywords of a batch are matched in a single
+pass over the corpus, so every CV is scanned once per batch rather than once per opening.
+exact_ms and fuzzy_ms of a record are those of its whole batch.
+
+Results are written as one JSON object per opening; progress and the throughput summary
+go to stderr.
+"""
+import argparse
+import contextlib
+import json
+import sys
+import itertools
+import time
+from typing import Iterator, List, Tuple
+from db.controller.data_service import DataService
+
+ALGORITHMS = ('KMP', 'BM', 'AC', 'exact', 'word', 'auto')
+
+
+def read_openings(stream) -> Iterator[Tuple[int, List[str]]]:
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        keywords = [k.strip() for k in line.split(',') if k.strip()]
+        if keywords:
+            yield line_number, keywords
+
+
+def batched(openings: Iterator[Tuple[int, List[str]]], size: int) -> Iterator[List[Tuple[int, List[str]]]]:
+    while True:
+        batch = list(itertools.islice(openings, size))
+        if not batch:
+            return
+        yield batch
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Screen the CV corpus against many job openings without the GUI")
+    parser.add_argument('-i', '--input', default='-', help="file with one comma-separated keyword set per line (default: stdin)")
+    parser.add_argument('-o', '--output', default='-', help="JSON lines output file (default: stdout)")
+    parser.add_argument('-a', '--algorithm', default='AC', choices=ALGORITHMS, help="matching algorithm (default: AC)")
+    parser.add_argument('-n', '--top', type=int, default=10, help="candidates per opening (default: 10)")
+    parser.add_argument('-b', '--batch', type=int, default=32, help="openings matched per corpus pass (default: 32)")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+
+    # extraction and matching print diagnostics; keep stdout for the results
+    with contextlib.redirect_stdout(sys.stderr):
+        load_start = time.perf_counter()
+        data_service = DataService()
+        print(f"Corpus loaded in {time.perf_counter() - load_start:.2f}s")
+
+        queries = 0
+        search_start = time.perf_counter()
+        try:
+            for batch in batched(read_openings(source), max(1, args.batch)):
+                batch_candidates, exact_time, fuzzy_time = data_service.search_candidates_batch(
+                    keyword_sets=[keywords for _, keywords in batch],
+                    top_n=args.top,
+                    algorithm=args.algorithm
+                )
+                # engine chosen for the batch by the 'auto' algorithm
+                plan = data_service.last_profile.plan
+                for (line_number, keywords), candidates in zip(batch, batch_candidates):
+                    record = {
+                        'line': line_number,
+                        'keywords': keywords,
+                        'algorithm': args.algorithm,
+                        'exact_ms': round(exact_time * 1000, 3),
+                        'fuzzy_ms': round(fuzzy_time * 1000, 3),
+                        'candidates': candidates,
+                    }
+                    if plan is not None:
+                        record['plan'] = plan
+                    output.write(json.dumps(record, default=str) + "\n")
+                output.flush()
+                queries += len(batch)
+        finally:
+            elapsed = time.perf_counter() - search_start
+            if source is not sys.stdin:
+                source.close()
+            if output is not sys.stdout:
+                output.close()
+            data_service.matcher.close()
+
+        rate = queries / elapsed if elapsed > 0 else 0.0
+        print(f"Screened {queries} openings in {elapsed:.2f}s ({rate:.1f} queries/s)")
+        corpus = data_service.matcher.corpus_stats()
+        print(f"Corpus store: {corpus['resident_bytes']} bytes resident, hit ratio {corpus['hit_ratio']:.2f}, {corpus['reloads']} reloads")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Local search service: one warm corpus shared by many recruiters.
+
+    uv run ./app/server.py --port 8765
+    ATS_SEARCH_SERVICE_URL=http://127.0.0.1:8765 uv run ./app/main.py
+
+Endpoints (JSON):
+    POST /search                          {"keywords": [...], "top_n": 5, "algorithm": "BM", "filters": {"role": "..."}, "limit": 20}
+                                          the ranking's search_id and total, with its first limit candidates
+    GET  /page?search_id=&offset=&limit=  further candidates of a recent search's ranking
+    GET  /roles                           application roles available as a filter
+    GET  /applications/<id>/details       skills, summaries, jobs and educations of a CV
+    GET  /stats                           total CVs and service counters
+"""
+import argparse
+import json
+import re
+import sys
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from db.controller.data_service import DataService
+from db.controller.search_service import SearchService, ServiceBusy
+
+DETAILS_PATH = re.compile(r'^/applications/(\d+)/details$')
+REQUEST_TIMEOUT = 300
+
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    service: SearchService = None
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _wait(self, future):
+        try:
+            self._send_json(200, future.result(timeout=REQUEST_TIMEOUT))
+        except (ValueError, TypeError) as e:
+            # raised for bad arguments, e.g. an unknown filter attribute or matching algorithm
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+
+    def _page(self, query: str):
+        params = parse_qs(query)
+        try:
+            search_id = params['search_id'][0]
+            offset = int(params.get('offset', ['0'])[0])
+            limit = int(params['limit'][0])
+            if offset < 0 or limit < 0:
+                raise ValueError("offset and limit must not be negative")
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {'error': f"Bad page request: {e}"})
+            return
+        ranked = self.service.ranking(search_id)
+        if ranked is None:
+            self._send_json(404, {'error': f"Unknown or expired search {search_id}"})
+            return
+        self._wait(self.service.page(ranked, search_id, offset, limit))
+
+    def do_GET(self):
+        try:
+            url = urlsplit(self.path)
+            match = DETAILS_PATH.match(self.path)
+            if match:
+                self._wait(self.service.candidate_details(int(match.group(1))))
+            elif url.path == '/page':
+                self._page(url.query)
+            elif self.path == '/roles':
+                self._send_json(200, {'roles': self.service.roles()})
+            elif self.path == '/stats':
+                future = self.service.total_cvs()
+                try:
+                    total_cvs = future.result(timeout=REQUEST_TIMEOUT)
+                except Exception as e:
+                    self._send_json(500, {'error': str(e)})
+                    return
+                stats = self.service.stats()
+                stats['total_cvs'] = total_cvs
+                self._send_json(200, stats)
+            else:
+                self._send_json(404, {'error': f'Unknown path {self.path}'})
+        except ServiceBusy as e:
+            self._send_json(503, {'error': str(e)})
+
+    def do_POST(self):
+        if self.path != '/search':
+            self._send_json(404, {'error': f'Unknown path {self.path}'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(request.get('keywords', []), list):
+                raise ValueError("keywords must be a list")
+            keywords = [str(k).strip() for k in request.get('keywords', []) if str(k).strip()]
+            if not keywords:
+                self._send_json(400, {'error': 'keywords must not be empty'})
+                return
+            filters = request.get('filters') or None
+            if filters is not None and not isinstance(filters, dict):
+                raise ValueError("filters must be an object")
+            limit = request.get('limit')
+            limit = None if limit is None else int(limit)
+            future = self.service.search(keywords, int(request.get('top_n', 5)), request.get('algorithm', 'BM'), filters, limit)
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except ServiceBusy as e:
+            self._send_json(503, {'error': str(e)})
+            return
+        self._wait(future)
+
+    def log_message(self, format, *args):
+        print(f"{self.address_string()} {format % args}", file=sys.stderr)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve CV searches from one warm corpus")
+    parser.add_argument('--host', default='127.0.0.1', help="bind address (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=4, help="worker threads (default: 4)")
+    parser.add_argument('--queue', type=int, default=64, help="requests waiting beyond the workers before 503 (default: 64)")
+    args = parser.parse_args(argv)
+
+    service = SearchService(DataService(), max_workers=args.workers, queue_size=args.queue)
+    SearchRequestHandler.service = service
+    server = ThreadingHTTPServer((args.host, args.port), SearchRequestHandler)
+    server.daemon_threads = True
+    print(f"Search service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
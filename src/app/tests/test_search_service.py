@@ -0,0 +1,186 @@
+"""Search service against a SQLite database and real CV PDFs, over HTTP on localhost"""
+import json
+import threading
+import urllib.error
+import urllib.request
+from datetime import date
+from http.server import ThreadingHTTPServer
+
+import pymupdf
+import pytest
+
+from db.controller.data_service import PROFILE_SECTIONS, DataService
+from db.controller.remote_data_service import RemoteDataService
+from db.controller.search_service import SearchService
+from db.models import ApplicantProfile, ApplicationDetail, DatabaseConfig, init_database
+from server import SearchRequestHandler
+
+# (name, role, python mentions); the ranking by BM25 follows the number of mentions
+APPLICANTS = [
+    ("Ana Putri", "Data Engineer", 4),
+    ("Budi Santoso", "Data Engineer", 3),
+    ("Citra Lestari", "Backend Developer", 2),
+    ("Dewi Anggraini", "Backend Developer", 1),
+    ("Eko Prasetyo", "Accountant", 0),
+    ("Fajar Nugroho", "Accountant", 0),
+]
+PYTHON_CVS = sum(1 for _, _, mentions in APPLICANTS if mentions)
+
+
+def write_cv(path, name: str, mentions: int):
+    text = (
+        f"{name}\n"
+        "Summary\n"
+        f"Engineer with {' '.join(['Python'] * mentions) or 'ledger'} experience.\n"
+        "Skills\n"
+        f"{'Python, ' if mentions else ''}SQL, Excel\n"
+    )
+    document = pymupdf.open()
+    document.new_page().insert_text((72, 72), text, fontsize=10)
+    document.save(str(path))
+    document.close()
+
+
+@pytest.fixture(scope="module")
+def service_url(tmp_path_factory):
+    root = tmp_path_factory.mktemp("search_service")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("DATABASE_URL", f"sqlite:///{root / 'ats.db'}")
+        monkeypatch.setenv("ATS_CACHE_DIR", str(root / "cache"))
+        monkeypatch.setenv("ATS_PROFILE_INGEST", "0")
+
+        init_database()
+        with DatabaseConfig().get_session_maker()() as session:
+            for i, (name, role, mentions) in enumerate(APPLICANTS):
+                cv_path = root / f"cv{i}.pdf"
+                write_cv(cv_path, name, mentions)
+                first_name, last_name = name.split(' ', 1)
+                applicant = ApplicantProfile(first_name=first_name, last_name=last_name,
+                                             date_of_birth=date(1990 + i, 1, 1), phone_number="0812000000")
+                session.add(applicant)
+                session.flush()
+                session.add(ApplicationDetail(applicant_id=applicant.applicant_id, application_role=role, cv_path=str(cv_path)))
+            session.commit()
+
+        service = SearchService(DataService(), max_workers=2, queue_size=8)
+        SearchRequestHandler.service = service
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SearchRequestHandler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://127.0.0.1:{server.server_address[1]}"
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.shutdown()
+
+
+def call(url: str, payload=None):
+    """(status, decoded JSON body) of a GET, or of a POST when payload is given"""
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def search(service_url: str, **request):
+    request.setdefault('keywords', ['python'])
+    request.setdefault('top_n', 10)
+    return call(f"{service_url}/search", request)
+
+
+def test_search_returns_total_and_first_page(service_url):
+    status, body = search(service_url, limit=2)
+
+    assert status == 200
+    assert body['total'] == PYTHON_CVS
+    assert len(body['candidates']) == 2
+    assert [c['first_name'] for c in body['candidates']] == ["Ana", "Budi"]
+    assert body['search_id']
+
+
+def test_search_without_limit_returns_whole_ranking(service_url):
+    status, body = search(service_url)
+
+    assert status == 200
+    assert len(body['candidates']) == body['total'] == PYTHON_CVS
+
+
+def test_page_continues_the_ranking(service_url):
+    _, whole = search(service_url)
+    _, first = search(service_url, limit=2)
+
+    status, rest = call(f"{service_url}/page?search_id={first['search_id']}&offset=2&limit=10")
+
+    assert status == 200
+    ids = [c['application_id'] for c in first['candidates'] + rest]
+    assert ids == [c['application_id'] for c in whole['candidates']]
+
+
+def test_page_keeps_its_ranking_after_other_searches(service_url):
+    _, first = search(service_url, limit=1)
+    search(service_url, keywords=['excel'])
+
+    status, rest = call(f"{service_url}/page?search_id={first['search_id']}&offset=1&limit=10")
+
+    assert status == 200
+    assert len(rest) == PYTHON_CVS - 1
+
+
+def test_page_of_unknown_search_is_404(service_url):
+    status, body = call(f"{service_url}/page?search_id=missing&offset=0&limit=5")
+
+    assert status == 404
+    assert 'error' in body
+
+
+@pytest.mark.parametrize("query", ["offset=0&limit=5", "search_id=x&limit=-1", "search_id=x&offset=a&limit=5"])
+def test_bad_page_request_is_400(service_url, query):
+    status, _ = call(f"{service_url}/page?{query}")
+
+    assert status == 400
+
+
+@pytest.mark.parametrize("request_body", [
+    {'filters': {'city': 'Bandung'}},
+    {'algorithm': 'nope'},
+    {'keywords': 'python'},
+])
+def test_bad_search_request_is_400(service_url, request_body):
+    status, body = search(service_url, **request_body)
+
+    assert status == 400
+    assert 'error' in body
+
+
+def test_search_with_role_filter(service_url):
+    status, body = search(service_url, filters={'role': 'Backend Developer'})
+
+    assert status == 200
+    assert [c['first_name'] for c in body['candidates']] == ["Citra", "Dewi"]
+
+
+def test_candidate_details(service_url):
+    _, found = search(service_url, limit=1)
+    application_id = found['candidates'][0]['application_id']
+
+    status, details = call(f"{service_url}/applications/{application_id}/details")
+
+    assert status == 200
+    assert set(details) == set(PROFILE_SECTIONS)
+    assert "Python" in details['skills']
+
+
+def test_remote_data_service_pages(service_url):
+    remote = RemoteDataService(service_url)
+
+    candidates, _, _ = remote.search_candidates(['python'], 10, 'BM', limit=3)
+    rest = remote.get_candidates_page(3, 10)
+
+    assert remote.get_ranked_count() == PYTHON_CVS
+    assert len(candidates) == 3
+    assert [c['first_name'] for c in candidates + rest] == ["Ana", "Budi", "Citra", "Dewi"]
@@ -0,0 +1,19 @@
+import base64
+import fitz
+
+
+def render_pdf_page(pdf_document, page_num: int) -> str:
+    """Base64 PNG of one PDF page"""
+    page = pdf_document.load_page(page_num)
+
+    # Convert page to image with high quality
+    mat = fitz.Matrix(2.0, 2.0)  # 2x zoom for better quality
+    pix = page.get_pixmap(matrix=mat)
+
+    # Convert to base64 for display in Flet
+    return base64.b64encode(pix.tobytes("png")).decode()
+
+
+def render_first_page(pdf_path: str) -> str:
+    with fitz.open(pdf_path) as pdf_document:
+        return render_pdf_page(pdf_document, 0) if len(pdf_document) else None
@@ -0,0 +1,55 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+# a single worker keeps prefetching in the background of user-triggered work instead of
+# competing with it; Python threads have no priorities of their own
+PREFETCH_WORKERS = 1
+
+
+class Prefetcher:
+    """ Keyed background tasks whose results can be picked up later
+
+    cancel_all() starts a new generation: queued tasks are cancelled, running ones finish
+    but their results are dropped, and get() only returns tasks of the current generation.
+    """
+
+    def __init__(self, max_workers: int = PREFETCH_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch')
+        self.tasks: Dict[Hashable, Future] = {}
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def _run(self, generation: int, func: Callable, *args):
+        if generation != self.generation:
+            return None
+        return func(*args)
+
+    def submit(self, key: Hashable, func: Callable, *args) -> Future:
+        with self.lock:
+            future = self.tasks.get(key)
+            if future is None:
+                future = self.executor.submit(self._run, self.generation, func, *args)
+                self.tasks[key] = future
+            return future
+
+    def get(self, key: Hashable) -> Optional[Future]:
+        """ The task for key, unless it was cancelled or failed """
+        with self.lock:
+            future = self.tasks.get(key)
+        if future is None or future.cancelled():
+            return None
+        if future.done() and future.exception() is not None:
+            return None
+        return future
+
+    def cancel_all(self):
+        with self.lock:
+            self.generation += 1
+            for future in self.tasks.values():
+                future.cancel()
+            self.tasks.clear()
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,77 @@
+import cProfile
+import functools
+import itertools
+import os
+import random
+import threading
+import time
+import tracemalloc
+
+# Hooks are off unless ATS_PROFILE_HOOKS_DIR points at a writable directory.
+# ATS_PROFILE_HOOKS_SAMPLE_RATE (0..1, default 0.01) is the fraction of calls captured.
+PROFILE_DIR_ENV = 'ATS_PROFILE_HOOKS_DIR'
+SAMPLE_RATE_ENV = 'ATS_PROFILE_HOOKS_SAMPLE_RATE'
+DEFAULT_SAMPLE_RATE = 0.01
+TOP_ALLOCATIONS = 25
+TRACEMALLOC_FRAMES = 10
+
+# cProfile and tracemalloc are process-wide resources, so only one capture runs at a time;
+# calls that arrive while a capture is in progress simply run unprofiled.
+_capture_lock = threading.Lock()
+_capture_counter = itertools.count()
+
+
+def _sample_rate() -> float:
+    try:
+        return min(1.0, max(0.0, float(os.getenv(SAMPLE_RATE_ENV, DEFAULT_SAMPLE_RATE))))
+    except ValueError:
+        return DEFAULT_SAMPLE_RATE
+
+
+def _write_capture(directory: str, name: str, profiler: cProfile.Profile, snapshot, elapsed: float):
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"{name}-{int(time.time() * 1000)}-{os.getpid()}-{next(_capture_counter)}")
+
+    profiler.dump_stats(base + ".prof")
+
+    with open(base + ".alloc.txt", 'w', encoding='utf-8') as f:
+        f.write(f"# {name}: {elapsed * 1000:.2f} ms, top {TOP_ALLOCATIONS} allocations by line\n")
+        for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+            f.write(f"{stat}\n")
+
+
+def profile_hook(name: str):
+    """ Capture a cProfile dump and a tracemalloc snapshot for a sample of calls """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            directory = os.getenv(PROFILE_DIR_ENV)
+            if not directory or random.random() >= _sample_rate():
+                return func(*args, **kwargs)
+            if not _capture_lock.acquire(blocking=False):
+                return func(*args, **kwargs)
+
+            try:
+                started_tracing = not tracemalloc.is_tracing()
+                if started_tracing:
+                    tracemalloc.start(TRACEMALLOC_FRAMES)
+
+                profiler = cProfile.Profile()
+                start = time.perf_counter()
+                profiler.enable()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    profiler.disable()
+                    elapsed = time.perf_counter() - start
+                    snapshot = tracemalloc.take_snapshot()
+                    if started_tracing:
+                        tracemalloc.stop()
+                    try:
+                        _write_capture(directory, name, profiler, snapshot, elapsed)
+                    except OSError as e:
+                        print(f"Failed to write profile capture for {name}: {e}")
+            finally:
+                _capture_lock.release()
+        return wrapper
+    return decorator
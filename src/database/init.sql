@@ -2,8 +2,14 @@ SET NAMES 'utf8mb4' COLLATE 'utf8mb4_unicode_ci';
 
 SET FOREIGN_KEY_CHECKS = 0;
 
+DROP TABLE IF EXISTS CVEducation;
+DROP TABLE IF EXISTS CVJobHistory;
+DROP TABLE IF EXISTS CVSummary;
+DROP TABLE IF EXISTS CVSkill;
+DROP TABLE IF EXISTS CVProfile;
 DROP TABLE IF EXISTS ApplicationDetail;
 DROP TABLE IF EXISTS ApplicantProfile;
+DROP TABLE IF EXISTS SchemaMigration;
 
 SET FOREIGN_KEY_CHECKS = 1;
 
@@ -13,7 +19,10 @@ CREATE TABLE ApplicantProfile (
     last_name VARCHAR(50),
     date_of_birth DATE,
     address VARCHAR(255),
-    phone_number VARCHAR(20)
+    phone_number VARCHAR(20),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    full_name VARCHAR(101) GENERATED ALWAYS AS (CONCAT_WS(' ', first_name, last_name)) STORED,
+    FULLTEXT INDEX ix_ApplicantProfile_full_name (full_name) WITH PARSER ngram
 )ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 CREATE TABLE ApplicationDetail (
@@ -21,9 +30,61 @@ CREATE TABLE ApplicationDetail (
     applicant_id INT NOT NULL,
     application_role VARCHAR(100),
     cv_path TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX ix_ApplicationDetail_applicant_id (applicant_id),
+    INDEX ix_ApplicationDetail_created_at (created_at),
     FOREIGN KEY (applicant_id) REFERENCES ApplicantProfile(applicant_id)
 )ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- structured CV profiles, filled by the profile ingest of the app (see db/controller/profile_ingest.py)
+CREATE TABLE CVProfile (
+    detail_id INT PRIMARY KEY,
+    extractor_version INT NOT NULL,
+    cv_signature VARCHAR(64) NOT NULL,
+    extracted_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (detail_id) REFERENCES ApplicationDetail(detail_id)
+)ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE CVSkill (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    detail_id INT NOT NULL,
+    ordinal INT NOT NULL,
+    skill VARCHAR(255) NOT NULL,
+    INDEX ix_CVSkill_detail_id (detail_id),
+    FOREIGN KEY (detail_id) REFERENCES CVProfile(detail_id)
+)ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE CVSummary (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    detail_id INT NOT NULL,
+    ordinal INT NOT NULL,
+    text TEXT NOT NULL,
+    INDEX ix_CVSummary_detail_id (detail_id),
+    FOREIGN KEY (detail_id) REFERENCES CVProfile(detail_id)
+)ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE CVJobHistory (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    detail_id INT NOT NULL,
+    ordinal INT NOT NULL,
+    position VARCHAR(255) NOT NULL,
+    company VARCHAR(255),
+    period VARCHAR(100),
+    INDEX ix_CVJobHistory_detail_id (detail_id),
+    FOREIGN KEY (detail_id) REFERENCES CVProfile(detail_id)
+)ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE CVEducation (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    detail_id INT NOT NULL,
+    ordinal INT NOT NULL,
+    degree VARCHAR(255) NOT NULL,
+    institution VARCHAR(255),
+    period VARCHAR(100),
+    INDEX ix_CVEducation_detail_id (detail_id),
+    FOREIGN KEY (detail_id) REFERENCES CVProfile(detail_id)
+)ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 INSERT INTO ApplicantProfile (applicant_id, first_name, last_name, date_of_birth, address, phone_number) VALUES
 -- Mohammad Nugraha Eka Prawira
 (1, 'Moh4mm4d', 'Nu9r4h4', '2003-06-14', 'Jl. Kenanga No. 12, Jakarta', '081234567891'),